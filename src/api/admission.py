@@ -0,0 +1,268 @@
+"""
+Admission Control for the Gambler's Ruin API
+
+This module decides whether and when a simulation request runs, based on its
+predicted cost (see ``src.simulation.cost_model``):
+(a) Requests predicted to take longer than the latency budget are rejected
+    before they run, with suggestions for a cheaper way to get the answer
+(b) Each client has a budget of compute seconds that refills over time;
+    requests beyond it are rejected with the time until they would fit, and
+    requests larger than a full budget are rejected as if over the latency budget
+(c) Admitted requests wait for one of a fixed number of run slots, shortest
+    predicted job first; a job's priority improves with the time it has
+    waited (aging), so long jobs are not starved
+(d) Observed run times correct the cost model as requests finish
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.simulation.cost_model import CostModel, calibrate
+
+
+class AdmissionError(Exception):
+    """
+    A request that is not admitted.
+
+    Args:
+        message: Error message
+        status: HTTP status code for the response
+        details: Extra fields for the response (cost, suggestions, retry_after)
+    """
+
+    def __init__(self, message: str, status: int, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.status = status
+        self.details = details or {}
+
+    def payload(self) -> Dict[str, Any]:
+        return {'error': str(self), **self.details}
+
+
+class ClientBudget:
+    """
+    Token bucket of compute seconds for one client.
+
+    Args:
+        capacity: Maximum stored seconds
+        refill_rate: Seconds added per second of wall-clock time
+    """
+
+    def __init__(self, capacity: float, refill_rate: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.updated = time.time()
+
+    def available(self) -> float:
+        """Refill and return the seconds currently available."""
+        now = time.time()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+        return self.tokens
+
+
+class Scheduler:
+    """
+    Admits simulation requests by predicted cost and runs them in priority order.
+
+    Args:
+        slots: Number of simulations run at once
+        max_seconds: Latency budget; longer predicted runs are rejected
+        aging: Seconds of priority gained per second waited
+        client_capacity: Compute seconds a client can use in a burst
+        client_refill_rate: Compute seconds per second each client regains
+        cost_model: Cost model to predict and learn from (a new one by default)
+    """
+
+    def __init__(self, slots: int = 4, max_seconds: float = 30.0, aging: float = 1.0,
+                 client_capacity: float = 120.0, client_refill_rate: float = 1.0,
+                 cost_model: Optional[CostModel] = None):
+        if slots < 1:
+            raise ValueError("Number of slots must be at least 1")
+        self.slots = slots
+        self.max_seconds = max_seconds
+        self.aging = aging
+        self.client_capacity = client_capacity
+        self.client_refill_rate = client_refill_rate
+        self.cost_model = cost_model or CostModel()
+
+        self._clients: Dict[str, ClientBudget] = {}
+        self._queue: List = []
+        self._running: Dict[int, float] = {}
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+    def _budget(self, client: str) -> ClientBudget:
+        if client not in self._clients:
+            self._clients[client] = ClientBudget(self.client_capacity, self.client_refill_rate)
+        return self._clients[client]
+
+    def queue_seconds(self, predicted_seconds: float) -> float:
+        """
+        Estimate how long a new job would wait for a slot.
+
+        Counts the remaining work of running jobs and of queued jobs that
+        would run first, spread over the slots.
+
+        Args:
+            predicted_seconds: Predicted run time of the new job
+
+        Returns:
+            Estimated wait in seconds
+        """
+        now = time.time()
+        with self._condition:
+            if len(self._running) < self.slots and not self._queue:
+                return 0.0
+            key = predicted_seconds + self.aging * now
+            ahead = sum(predicted for (priority, _, predicted) in self._queue if priority <= key)
+            running = sum(max(0.0, end - now) for end in self._running.values())
+        return (ahead + running) / self.slots
+
+    def check(self, client: str, estimate: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Decide whether a request would be admitted, without running it.
+
+        Args:
+            client: Client identifier
+            estimate: Cost estimate with predicted_seconds
+
+        Returns:
+            Dict with admitted, reason (None when admitted), client_budget_seconds,
+            queue_seconds and retry_after (seconds until the request fits the
+            client budget; None when it is admitted or waiting would not help)
+        """
+        with self._condition:
+            return self._decide(client, estimate['predicted_seconds'])
+
+    def _decide(self, client: str, predicted: float) -> Dict[str, Any]:
+        # Callers hold the condition's lock, so a decision and its charge are atomic
+        available = self._budget(client).available()
+        decision = {
+            'admitted': True,
+            'reason': None,
+            'client_budget_seconds': available,
+            'queue_seconds': self.queue_seconds(predicted),
+            'retry_after': None
+        }
+        if predicted > self.max_seconds:
+            decision.update(admitted=False,
+                            reason=f"Predicted run time {predicted:.1f}s exceeds the {self.max_seconds:.0f}s budget")
+        elif predicted > self.client_capacity:
+            # Waiting never helps: the budget refills only up to its capacity
+            decision.update(admitted=False,
+                            reason=f"Predicted run time {predicted:.1f}s exceeds the "
+                                   f"{self.client_capacity:.0f}s client compute budget")
+        elif predicted > available:
+            decision.update(admitted=False, reason="Client compute budget exhausted",
+                            retry_after=(predicted - available) / self.client_refill_rate)
+        return decision
+
+    @contextmanager
+    def admit(self, client: str, estimate: Dict[str, Any]) -> Iterator[None]:
+        """
+        Admit a request, wait for its turn and hold a slot while it runs.
+
+        The predicted cost is charged to the client on admission and corrected
+        to the observed run time afterwards, which also updates the cost model.
+
+        Args:
+            client: Client identifier
+            estimate: Cost estimate with predicted_seconds
+
+        Raises:
+            AdmissionError: If the request is over the latency or client budget
+        """
+        predicted = estimate['predicted_seconds']
+        ticket = next(self._counter)
+        with self._condition:
+            decision = self._decide(client, predicted)
+            if not decision['admitted']:
+                status = 429 if decision['retry_after'] is not None else 400
+                raise AdmissionError(decision['reason'], status,
+                                     {'cost': estimate, 'retry_after': decision['retry_after']})
+
+            self._budget(client).tokens -= predicted
+            # Waiting w seconds lowers the priority key by aging * w relative to newer jobs
+            entry = (predicted + self.aging * time.time(), ticket, predicted)
+            heapq.heappush(self._queue, entry)
+            try:
+                while self._queue[0] != entry or len(self._running) >= self.slots:
+                    self._condition.wait()
+            except BaseException:
+                # Leave the queue without blocking the jobs behind this one
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._budget(client).tokens += predicted
+                self._condition.notify_all()
+                raise
+            heapq.heappop(self._queue)
+            self._running[ticket] = time.time() + predicted
+            # The next job in the queue may fit into another free slot
+            self._condition.notify_all()
+
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            seconds = time.time() - start_time
+            with self._condition:
+                del self._running[ticket]
+                self._budget(client).tokens -= seconds - predicted
+                self._condition.notify_all()
+            self.cost_model.observe(estimate, seconds)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Describe the scheduler state.
+
+        Returns:
+            Dict with slots, running, queued, max_seconds, the times per unit of
+            work and the learned corrections
+        """
+        with self._condition:
+            running, queued = len(self._running), len(self._queue)
+        return {
+            'slots': self.slots,
+            'running': running,
+            'queued': queued,
+            'max_seconds': self.max_seconds,
+            'seconds_per_step': self.cost_model.seconds_per_step,
+            'corrections': self.cost_model.corrections()
+        }
+
+
+_scheduler: Optional[Scheduler] = None
+
+
+def get_scheduler() -> Scheduler:
+    """
+    Get the process-wide scheduler.
+
+    Settings come from the SCHEDULER_SLOTS (default: CPU count),
+    MAX_REQUEST_SECONDS (30), SCHEDULER_AGING (1.0), CLIENT_BUDGET_SECONDS
+    (120) and CLIENT_REFILL_RATE (1.0) environment variables. The cost model
+    is calibrated on this machine when the scheduler is created, unless
+    COST_CALIBRATION is 0.
+
+    Returns:
+        The shared Scheduler
+    """
+    global _scheduler
+    if _scheduler is None:
+        seconds_per_step = calibrate() if os.environ.get('COST_CALIBRATION', '1') != '0' else None
+        _scheduler = Scheduler(
+            slots=int(os.environ.get('SCHEDULER_SLOTS', os.cpu_count() or 4)),
+            max_seconds=float(os.environ.get('MAX_REQUEST_SECONDS', 30)),
+            aging=float(os.environ.get('SCHEDULER_AGING', 1.0)),
+            client_capacity=float(os.environ.get('CLIENT_BUDGET_SECONDS', 120)),
+            client_refill_rate=float(os.environ.get('CLIENT_REFILL_RATE', 1.0)),
+            cost_model=CostModel(seconds_per_step=seconds_per_step)
+        )
+    return _scheduler
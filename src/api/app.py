@@ -6,10 +6,14 @@ This module sets up the Flask application for the Gambler's Ruin API.
 
 from flask import Flask, jsonify
 from flask_cors import CORS
+import atexit
 import os
 
 # Import routes
 from src.api.routes import api_bp
+from src.api.admission import get_scheduler
+from src.simulation.lookup_tables import get_table
+from src.utils.experiment_store import get_store
 
 # Create Flask application
 app = Flask(__name__)
@@ -20,6 +24,12 @@ CORS(app)
 # Register blueprints
 app.register_blueprint(api_bp, url_prefix='/api')
 
+# Memory-map the precomputed lookup tables, if they have been built
+get_table()
+
+# Calibrate the cost model before the first request
+get_scheduler()
+
 # Error handling
 @app.errorhandler(404)
 def not_found(error):
@@ -30,6 +40,15 @@ def server_error(error):
     return jsonify({'error': 'Server error'}), 500
 
 
+def shutdown():
+    """Write the experiment store's buffered records before the app exits."""
+    get_store().close()
+
+
+# Also runs when a WSGI server imports the app instead of running this module
+atexit.register(shutdown)
+
+
 if __name__ == '__main__':
     # Get port from environment or use default
     port = int(os.environ.get('PORT', 5000))
@@ -4,28 +4,426 @@ API Routes for Gambler's Ruin Simulation
 This module defines the API endpoints for the Gambler's Ruin simulation.
 """
 
-from flask import Blueprint, request, jsonify
+import math
+import os
+import tempfile
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pyarrow as pa
+from flask import Blueprint, request, jsonify, send_file
 
 # Import simulation functions
 from src.simulation.basic_simulation import monte_carlo_simulation
 from src.simulation.general_simulation import monte_carlo_general
-from src.simulation.extended_simulation import (
-    run_with_credit,
-    run_with_dynamic_betting,
-    run_with_max_bet,
-    run_full_extension
-)
+from src.simulation.strategy_engine import CreditLine, Rule, TableLimit, build_rules, run_strategy
+from src.simulation.lookup_tables import get_table
+from src.simulation.optimal_strategy import solve_optimal_strategy
+from src.simulation.comparison import compare_strategies
+from src.simulation.incremental import STATS_VERSION, get_stats_store, new_seed, refine, top_up
+from src.simulation.cost_model import expected_steps, solver_steps
+from src.simulation.checkpoint import get_checkpoints, run_checkpointed
+
+from src.utils.experiment_store import SCHEMA, canonical_key, get_store
+from src.utils.helpers import time_execution
+
+from src.api.admission import AdmissionError, get_scheduler
+from src.api.serialization import ARROW, negotiate, respond
 
 # Import validation functions
 from src.api.validation import (
     validate_basic_params,
+    validate_checkpoint_params,
     validate_general_params,
-    validate_extended_params
+    validate_extended_params,
+    validate_experiment_query,
+    validate_optimal_params,
+    validate_comparison_params,
+    validate_refine_params
 )
 
 # Create blueprint
 api_bp = Blueprint('api', __name__)
 
+# Cost model backend of each engine's independent (use_cache: false) runs
+_BACKENDS = {'basic': 'python_basic', 'general': 'python', 'extended': 'vectorized'}
+
+# Shard function (see src.simulation.distributed) of each engine's checkpointed runs
+_SHARD_FUNCTIONS = {'basic': 'basic', 'general': 'general', 'extended': 'strategy'}
+
+
+def _lookup_table(params: Dict[str, Any], data: Dict[str, Any], j: int) -> Optional[Dict[str, Any]]:
+    """
+    Answer a simulation request from the precomputed lookup table.
+    
+    The table answer is used only when its error bound is no wider than the
+    95% interval of a simulation with the requested number of trials.
+    
+    Args:
+        params: Validated simulation parameters
+        data: Raw request data; ``use_table: false`` skips the table
+        j: Effective bet size
+        
+    Returns:
+        Dict with the table result, or None if the table cannot answer
+    """
+    table = get_table()
+    if table is None or not bool(data.get('use_table', True)) or 'units' in params:
+        return None
+    
+    result = table.lookup(params['i'], params['n'], params['p'], params['q'], j)
+    if result is None:
+        return None
+    
+    win_probability = result['win_probability']
+    half_width = 1.96 * math.sqrt(win_probability * (1 - win_probability) / params['trials'])
+    if result['error_bound'] > half_width:
+        return None
+    
+    result['source'] = 'table'
+    return result
+
+
+def _simulation_args(params: Dict[str, Any], rules: Sequence[Rule] = ()) -> Dict[str, Any]:
+    """
+    Build the strategy engine arguments for validated simulation parameters.
+    
+    The basic model is the general model with p = 0.5, q = 2 and j = 1.
+    
+    Args:
+        params: Validated simulation parameters
+        rules: Strategy rules (empty for the basic and general models)
+        
+    Returns:
+        Keyword arguments for ``top_up`` and ``refine``
+    """
+    return {
+        'i': params['i'],
+        'n': params['n'],
+        'p': params.get('p', 0.5),
+        'q': params.get('q', 2.0),
+        'j': params.get('j', 1),
+        'rules': rules,
+        'units': params.get('units'),
+        'bet_rounding': params.get('bet_rounding', 'floor'),
+        'win_rounding': params.get('win_rounding', 'floor')
+    }
+
+
+def _stats_key(engine: str, params: Dict[str, Any]) -> str:
+    """Canonical key of the parameters and kernel version, without the number of trials."""
+    key_params = {key: value for key, value in params.items() if key != 'trials'}
+    return canonical_key(engine, dict(key_params, stats_version=STATS_VERSION))
+
+
+def _client_id() -> str:
+    """
+    Identify the client for its compute budget.
+    
+    Clients are told apart by address. The X-Client-Id header is used only
+    when TRUST_CLIENT_ID_HEADER is 1, for deployments behind a proxy that sets
+    it; otherwise any client could claim a fresh budget with every request.
+    
+    Returns:
+        Client identifier
+    """
+    if os.environ.get('TRUST_CLIENT_ID_HEADER', '0') == '1' and request.headers.get('X-Client-Id'):
+        return request.headers['X-Client-Id']
+    return request.remote_addr or 'anonymous'
+
+
+def _estimate_cost(engine: str, params: Dict[str, Any], rules: Sequence[Rule],
+                   trials: int, backend: str) -> Dict[str, Any]:
+    """
+    Predict the run time of a simulation request.
+    
+    Args:
+        engine: Simulation engine name
+        params: Validated simulation parameters
+        rules: Strategy rules of the request
+        trials: Number of trials that will actually run
+        backend: Key of SECONDS_PER_STEP for the code that runs them
+        
+    Returns:
+        Cost estimate (see ``CostModel.estimate``)
+    """
+    workload = ':'.join([engine, backend] + (['+'.join(rule.describe()['rule'] for rule in rules)] if rules else []))
+    return get_scheduler().cost_model.estimate(workload, backend, trials, _expected_steps(params, rules))
+
+
+def _expected_steps(params: Dict[str, Any], rules: Sequence[Rule]) -> float:
+    """Expected bets per trial of a strategy, with the credit line and maximum bet of its rules."""
+    return expected_steps(
+        params['i'], params['n'], params.get('p', 0.5), params.get('q', 2.0), params.get('j', 1),
+        k=next((rule.k for rule in rules if isinstance(rule, CreditLine)), 0),
+        m=next((rule.m for rule in rules if isinstance(rule, TableLimit)), None)
+    )
+
+
+def _estimate_comparison_cost(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Predict the run time of a strategy comparison.
+    
+    Every strategy runs every trial on the counter-based generator, so the
+    comparison costs the trials of all its strategies.
+    
+    Args:
+        params: Validated comparison parameters
+        
+    Returns:
+        Cost estimate (see ``CostModel.estimate``)
+    """
+    strategies = params['strategies'].values()
+    steps = sum(_expected_steps(params, rules) for rules in strategies) / len(strategies)
+    trials = params['trials'] * len(strategies)
+    return get_scheduler().cost_model.estimate('compare:counter', 'counter', trials, steps)
+
+
+def _estimate_solver_cost(params: Dict[str, Any], method: Optional[str] = None,
+                          units: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Predict the run time of an optimal strategy solve.
+    
+    Args:
+        params: Validated optimal strategy parameters
+        method: Solver method (defaults to the requested one)
+        units: Units per dollar (defaults to the requested ones)
+        
+    Returns:
+        Cost estimate (see ``CostModel.estimate``) of one solve
+    """
+    method = method or params['method']
+    scale = units or params['units'] or 1
+    bets = min(params['m'] or params['n'], params['n']) // params['j'] + 1
+    backend = f'solver_{method}'
+    steps = solver_steps(params['n'] * scale + 1, bets, method)
+    return get_scheduler().cost_model.estimate(f'optimal:{backend}', backend, 1, steps)
+
+
+def _cheaper_methods(engine: str, params: Dict[str, Any], estimate: Dict[str, Any],
+                     stored_trials: int = 0) -> List[Dict[str, Any]]:
+    """
+    Suggest cheaper ways to answer a request that is over the latency budget.
+    
+    Args:
+        engine: Simulation engine name, 'compare' or 'optimal'
+        params: Validated parameters of the request
+        estimate: Cost estimate of the request
+        stored_trials: Trials already stored for these parameters
+        
+    Returns:
+        List of suggestions, each with a 'method'
+    """
+    suggestions = []
+    # A suggestion must fit the latency budget and a full client budget
+    scheduler = get_scheduler()
+    budget = 0.9 * min(scheduler.max_seconds, scheduler.client_capacity)
+    
+    if engine == 'optimal':
+        # The other solver method may be cheaper; a coarser bankroll has fewer states
+        other = 'policy' if params['method'] == 'value' else 'value'
+        cost = _estimate_solver_cost(params, method=other)
+        if cost['predicted_seconds'] <= budget:
+            suggestions.append({'method': f'{other}_iteration', 'params': {'method': other},
+                                'predicted_seconds': cost['predicted_seconds']})
+        units = params['units'] or 1
+        while units > 1:
+            units //= 2
+            cost = _estimate_solver_cost(params, units=units)
+            if cost['predicted_seconds'] <= budget:
+                suggestions.append({'method': 'fewer_units', 'params': {'units': units},
+                                    'predicted_seconds': cost['predicted_seconds']})
+                break
+        return suggestions
+    
+    if estimate['trials'] > 0 and estimate['predicted_seconds'] > 0:
+        # A comparison runs each of its trials once per strategy
+        runs_per_trial = len(params['strategies']) if engine == 'compare' else 1
+        per_trial = runs_per_trial * estimate['predicted_seconds'] / estimate['trials']
+        affordable = int(budget / per_trial)
+        if affordable > 0:
+            suggestions.append({
+                'method': 'fewer_trials',
+                'trials': stored_trials + affordable,
+                'predicted_seconds': affordable * per_trial
+            })
+    
+    # Without credit or dynamic betting the answer is an exact Markov chain solve
+    bet = min(params.get('j', 1), params['m']) if params.get('use_max_bet') else params.get('j', 1)
+    gain = bet * (params.get('q', 2.0) - 1)
+    exact = (engine != 'compare' and not params.get('use_credit') and not params.get('use_dynamic_betting')
+             and 'units' not in params and params['n'] <= 2000 and abs(gain - round(gain)) < 1e-9)
+    if exact:
+        request_params = {'n': params['n'], 'p': params.get('p', 0.5), 'q': params.get('q', 2.0),
+                          'j': bet, 'm': bet, 'i': params['i']}
+        suggestions.append({
+            'method': 'exact',
+            'path': '/api/optimal-strategy',
+            'params': request_params,
+            'note': 'baseline_win_probability[i] is the exact win probability of this request'
+        })
+    
+    return suggestions
+
+
+def _admitted(engine: str, params: Dict[str, Any], data: Dict[str, Any],
+              estimate: Dict[str, Any], stored_trials: int = 0):
+    """
+    Admit a request through the scheduler, or answer a dry run.
+    
+    Args:
+        engine: Simulation engine name, 'compare' or 'optimal'
+        params: Validated parameters of the request
+        data: Raw request data; ``dry_run: true`` only reports the predicted cost
+        estimate: Cost estimate of the request
+        stored_trials: Trials already stored for these parameters
+        
+    Returns:
+        Dry-run result dict, or a context manager that holds a run slot
+        
+    Raises:
+        AdmissionError: If the request is over the latency or client budget
+    """
+    scheduler = get_scheduler()
+    client = _client_id()
+    
+    if bool(data.get('dry_run', False)):
+        decision = scheduler.check(client, estimate)
+        result = {'dry_run': True, 'cost': estimate, **decision}
+        if not decision['admitted']:
+            result['suggestions'] = _cheaper_methods(engine, params, estimate, stored_trials)
+        return result
+    
+    if estimate['trials'] == 0:
+        return nullcontext()
+    
+    decision = scheduler.check(client, estimate)
+    if not decision['admitted'] and decision['retry_after'] is None:
+        raise AdmissionError(decision['reason'], 400, {
+            'cost': estimate,
+            'suggestions': _cheaper_methods(engine, params, estimate, stored_trials)
+        })
+    return scheduler.admit(client, estimate)
+
+
+def _admission_error(e: AdmissionError):
+    """Build the response for a request that was not admitted."""
+    response = jsonify(e.payload())
+    if e.details.get('retry_after') is not None:
+        response.headers['Retry-After'] = str(math.ceil(e.details['retry_after']))
+    return response, e.status
+
+
+def _run_with_store(engine: str, params: Dict[str, Any], data: Dict[str, Any],
+                    func: Callable, **kwargs) -> Dict[str, Any]:
+    """
+    Answer a simulation request from stored trials, topping them up as needed.
+    
+    Trials already simulated for the same parameters are reused and only the
+    missing ones are run, after admission by predicted cost. Runs that add
+    trials are recorded in the experiment store.
+    
+    Args:
+        engine: Simulation engine name
+        params: Validated simulation parameters
+        data: Raw request data; ``use_cache: false`` forces a new independent
+            run, ``checkpoint: true`` a checkpointed one (see
+            ``_run_checkpointed``) and ``dry_run: true`` only reports the
+            predicted cost
+        func: Simulation function for a new independent run
+        **kwargs: Arguments for the simulation function (including ``rules``
+            for the strategy engine)
+        
+    Returns:
+        Dict with the simulation result and whether it came entirely from
+        stored trials, or the dry-run cost report
+        
+    Raises:
+        AdmissionError: If the request is over the latency or client budget
+    """
+    store = get_store()
+    rules = kwargs.get('rules', ())
+    
+    if bool(data.get('checkpoint', False)):
+        return _run_checkpointed(engine, params, data, **kwargs)
+    
+    if not bool(data.get('use_cache', True)):
+        estimate = _estimate_cost(engine, params, rules, params['trials'], _BACKENDS[engine])
+        admission = _admitted(engine, params, data, estimate)
+        if isinstance(admission, dict):
+            return admission
+        seed = new_seed()
+        with admission:
+            result = time_execution(func, seed=seed, **kwargs)
+        execution_time = result.pop('execution_time')
+        store.record(engine, params, result, execution_time, seed=seed)
+        result['seed'] = seed
+        result['cached'] = False
+        return result
+    
+    key = _stats_key(engine, params)
+    stats = get_stats_store().get(key)
+    stored_trials = stats['trials'] if stats else 0
+    estimate = _estimate_cost(engine, params, rules, max(0, params['trials'] - stored_trials), 'counter')
+    admission = _admitted(engine, params, data, estimate, stored_trials)
+    if isinstance(admission, dict):
+        return admission
+    
+    with admission:
+        result = time_execution(top_up, key=key, trials=params['trials'], **_simulation_args(params, rules))
+    execution_time = result.pop('execution_time')
+    if result['trials_added']:
+        store.record(engine, dict(params, trials=result['trials']), result, execution_time,
+                     seed=result['seed'])
+    result['cached'] = result['trials_added'] == 0
+    return result
+
+
+def _run_checkpointed(engine: str, params: Dict[str, Any], data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+    """
+    Run a simulation request as checkpointed seeded shards.
+    
+    The run is identified by its parameters and seed, so repeating the
+    request with the seed of the response after a crash or redeploy resumes
+    it from its last checkpoint instead of starting over.
+    
+    Args:
+        engine: Simulation engine name
+        params: Validated simulation parameters
+        data: Raw request data with ``checkpoint``, and optionally ``seed``
+            and ``shard_size``
+        **kwargs: Arguments for the simulation function
+        
+    Returns:
+        Dict with the simulation result, seed, run_id and resumed_from (trials
+        taken from a checkpoint), or the dry-run cost report
+        
+    Raises:
+        AdmissionError: If the request is over the latency or client budget
+        ValueError: If the seed or shard size is invalid, or the run's
+            checkpoint was made with other parameters
+    """
+    options = validate_checkpoint_params(data)
+    rules = kwargs.get('rules', ())
+    estimate = _estimate_cost(engine, params, rules, params['trials'], _BACKENDS[engine])
+    admission = _admitted(engine, params, data, estimate)
+    if isinstance(admission, dict):
+        return admission
+    
+    seed = options['seed'] if options['seed'] is not None else new_seed()
+    shard_params = {key: value for key, value in kwargs.items() if key not in ('trials', 'seed')}
+    if rules:
+        shard_params['rules'] = [rule.describe() for rule in rules]
+    
+    with admission:
+        result = time_execution(run_checkpointed, _SHARD_FUNCTIONS[engine], shard_params, params['trials'],
+                                seed=seed, shard_size=options['shard_size'])
+    execution_time = result.pop('execution_time')
+    get_store().record(engine, params, result, execution_time, seed=seed)
+    result['seed'] = seed
+    result['cached'] = False
+    return result
+
 
 @api_bp.route('/basic-simulation', methods=['POST'])
 def basic_simulation_endpoint():
@@ -41,12 +439,17 @@ def basic_simulation_endpoint():
     
     # Run simulation
     try:
-        result = monte_carlo_simulation(
+        result = _run_with_store(
+            'basic', params, data, monte_carlo_simulation,
             i=params['i'],
             n=params['n'],
             trials=params.get('trials', 10000)
         )
-        return jsonify(result)
+        return respond(result)
+    except AdmissionError as e:
+        return _admission_error(e)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Simulation error: {str(e)}'}), 500
 
@@ -65,15 +468,28 @@ def general_simulation_endpoint():
     
     # Run simulation
     try:
-        result = monte_carlo_general(
+        # Answer from the lookup table when it is precise enough; a dry run reports the simulation's cost
+        if not bool(data.get('dry_run', False)):
+            result = _lookup_table(params, data, params['j'])
+            if result is not None:
+                return respond(result)
+        
+        result = _run_with_store(
+            'general', params, data, monte_carlo_general,
             i=params['i'],
             n=params['n'],
             p=params['p'],
             q=params['q'],
             j=params['j'],
-            trials=params.get('trials', 10000)
+            trials=params.get('trials', 10000),
+            units=params.get('units'),
+            win_rounding=params.get('win_rounding', 'floor')
         )
-        return jsonify(result)
+        return respond(result)
+    except AdmissionError as e:
+        return _admission_error(e)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Simulation error: {str(e)}'}), 500
 
@@ -90,59 +506,253 @@ def extended_simulation_endpoint():
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     
+    # Build the rule pipeline from the selected extensions
+    rules = build_rules(
+        use_credit=params.get('use_credit', False),
+        use_dynamic_betting=params.get('use_dynamic_betting', False),
+        use_max_bet=params.get('use_max_bet', False),
+        k=params.get('k'),
+        m=params.get('m')
+    )
+    if not rules:
+        return jsonify({'error': 'No extensions selected'}), 400
+    
     # Run simulation
     try:
-        # Determine which extension to run
-        if params.get('use_credit', False) and params.get('use_dynamic_betting', False) and params.get('use_max_bet', False):
-            # All extensions
-            result = run_full_extension(
-                i=params['i'],
-                n=params['n'],
-                p=params['p'],
-                q=params['q'],
-                j=params['j'],
-                k=params['k'],
-                m=params['m'],
-                trials=params.get('trials', 10000)
-            )
-        elif params.get('use_credit', False):
-            # Line of credit only
-            result = run_with_credit(
+        # A maximum bet alone is the general model with a bet of min(j, m), which the table may answer
+        table_model = params['use_max_bet'] and not params['use_credit'] and not params['use_dynamic_betting']
+        if table_model and not bool(data.get('dry_run', False)):
+            result = _lookup_table(params, data, min(params['j'], params['m']))
+            if result is not None:
+                return respond(result)
+        
+        result = _run_with_store(
+            'extended', params, data, run_strategy,
+            i=params['i'],
+            n=params['n'],
+            p=params['p'],
+            q=params['q'],
+            j=params['j'],
+            rules=rules,
+            trials=params.get('trials', 10000),
+            units=params.get('units'),
+            bet_rounding=params.get('bet_rounding', 'floor'),
+            win_rounding=params.get('win_rounding', 'floor')
+        )
+        return respond(result)
+    except AdmissionError as e:
+        return _admission_error(e)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Simulation error: {str(e)}'}), 500
+
+
+@api_bp.route('/compare-strategies', methods=['POST'])
+def compare_strategies_endpoint():
+    """Endpoint for comparing strategies on common random numbers"""
+    # Get request data
+    data = request.get_json()
+    
+    # Validate parameters
+    try:
+        params = validate_comparison_params(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Run comparison
+    try:
+        admission = _admitted('compare', params, data, _estimate_comparison_cost(params))
+        if isinstance(admission, dict):
+            return respond(admission)
+        with admission:
+            result = compare_strategies(
                 i=params['i'],
                 n=params['n'],
                 p=params['p'],
                 q=params['q'],
                 j=params['j'],
-                k=params['k'],
-                trials=params.get('trials', 10000)
+                strategies=params['strategies'],
+                trials=params['trials'],
+                seed=params['seed'],
+                baseline=params['baseline'],
+                units=params.get('units'),
+                bet_rounding=params.get('bet_rounding', 'floor'),
+                win_rounding=params.get('win_rounding', 'floor')
             )
-        elif params.get('use_dynamic_betting', False):
-            # Dynamic betting only
-            result = run_with_dynamic_betting(
-                i=params['i'],
-                n=params['n'],
-                p=params['p'],
-                q=params['q'],
-                j=params['j'],
-                trials=params.get('trials', 10000)
+        return respond(result)
+    except AdmissionError as e:
+        return _admission_error(e)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Simulation error: {str(e)}'}), 500
+
+
+@api_bp.route('/refine', methods=['POST'])
+def refine_endpoint():
+    """Endpoint for adding trials to a stored estimate until a target precision"""
+    # Get request data
+    data = request.get_json()
+    
+    # Validate parameters
+    try:
+        query = validate_refine_params(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    engine, params = query['engine'], query['params']
+    rules = build_rules(
+        use_credit=params.get('use_credit', False),
+        use_dynamic_betting=params.get('use_dynamic_betting', False),
+        use_max_bet=params.get('use_max_bet', False),
+        k=params.get('k'),
+        m=params.get('m')
+    )
+    if engine == 'extended' and not rules:
+        return jsonify({'error': 'No extensions selected'}), 400
+    
+    # Predict the trials the target needs from the stored estimate
+    key = _stats_key(engine, params)
+    stats = get_stats_store().get(key)
+    stored_trials = stats['trials'] if stats else 0
+    win_estimate = (stats['wins'] + 2) / (stats['trials'] + 4) if stats else 0.5
+    needed = min(query['max_trials'],
+                 math.ceil(1.1 * win_estimate * (1 - win_estimate) / query['target_std_error'] ** 2))
+    
+    # Run the missing trials
+    try:
+        cost = _estimate_cost(engine, params, rules, max(0, needed - stored_trials), 'counter')
+        admission = _admitted(engine, params, data, cost, stored_trials)
+        if isinstance(admission, dict):
+            return respond(admission)
+        with admission:
+            result = time_execution(
+                refine,
+                key=key,
+                target_std_error=query['target_std_error'],
+                max_trials=query['max_trials'],
+                **_simulation_args(params, rules)
             )
-        elif params.get('use_max_bet', False):
-            # Maximum bet only
-            result = run_with_max_bet(
-                i=params['i'],
+        execution_time = result.pop('execution_time')
+        if result['trials_added']:
+            get_store().record(engine, dict(params, trials=result['trials']), result, execution_time,
+                               seed=result['seed'])
+        return respond(result)
+    except AdmissionError as e:
+        return _admission_error(e)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Simulation error: {str(e)}'}), 500
+
+
+@api_bp.route('/optimal-strategy', methods=['POST'])
+def optimal_strategy_endpoint():
+    """Endpoint for the optimal betting strategy solver"""
+    # Get request data
+    data = request.get_json()
+    
+    # Validate parameters
+    try:
+        params = validate_optimal_params(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Run solver
+    try:
+        admission = _admitted('optimal', params, data, _estimate_solver_cost(params))
+        if isinstance(admission, dict):
+            return respond(admission)
+        with admission:
+            result = solve_optimal_strategy(
                 n=params['n'],
                 p=params['p'],
                 q=params['q'],
                 j=params['j'],
                 m=params['m'],
-                trials=params.get('trials', 10000)
+                method=params['method'],
+                units=params['units'],
+                win_rounding=params['win_rounding']
             )
-        else:
-            return jsonify({'error': 'No extensions selected'}), 400
-            
-        return jsonify(result)
+        
+        # Summarize the starting amount if one was given
+        if params['i'] is not None:
+            state = params['i'] * (params['units'] or 1)
+            result['optimal_bet'] = result['policy'][state].item()
+            result['optimal_win_probability'] = result['win_probability'][state].item()
+        
+        return respond(result)
+    except AdmissionError as e:
+        return _admission_error(e)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': f'Simulation error: {str(e)}'}), 500
+        return jsonify({'error': f'Solver error: {str(e)}'}), 500
+
+
+@api_bp.route('/experiments', methods=['GET'])
+def experiments_endpoint():
+    """Endpoint for querying recorded simulation runs"""
+    # Validate query parameters
+    try:
+        query = validate_experiment_query(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        runs = get_store().query(**query)
+        if negotiate() == ARROW:
+            return respond(pa.Table.from_pylist(runs, schema=SCHEMA))
+        return respond({'count': len(runs), 'runs': runs})
+    except Exception as e:
+        return jsonify({'error': f'Store error: {str(e)}'}), 500
+
+
+@api_bp.route('/experiments/export', methods=['GET'])
+def experiments_export_endpoint():
+    """Endpoint for downloading all recorded runs as a Parquet file"""
+    # Each export writes its own file, removed once the response is sent
+    fd, path = tempfile.mkstemp(prefix='experiments-', suffix='.parquet')
+    os.close(fd)
+    try:
+        get_store().export_parquet(path)
+        response = send_file(path, mimetype='application/vnd.apache.parquet',
+                             as_attachment=True, download_name='experiments.parquet')
+    except Exception as e:
+        os.remove(path)
+        return jsonify({'error': f'Store error: {str(e)}'}), 500
+    response.call_on_close(lambda: os.remove(path))
+    return response
+
+
+@api_bp.route('/tables', methods=['GET'])
+def tables_endpoint():
+    """Endpoint for lookup table coverage and staleness"""
+    table = get_table()
+    if table is None:
+        return jsonify({'loaded': False})
+    
+    max_age = os.environ.get('TABLE_MAX_AGE')
+    status = table.status(max_age=float(max_age) if max_age else None)
+    status['loaded'] = True
+    return jsonify(status)
+
+
+@api_bp.route('/checkpoints', methods=['GET'])
+def checkpoints_endpoint():
+    """Endpoint for listing checkpointed runs and their progress"""
+    try:
+        runs = get_checkpoints().runs()
+        return respond({'count': len(runs), 'runs': runs})
+    except Exception as e:
+        return jsonify({'error': f'Checkpoint error: {str(e)}'}), 500
+
+
+@api_bp.route('/scheduler', methods=['GET'])
+def scheduler_endpoint():
+    """Endpoint for the admission scheduler state and learned cost corrections"""
+    return jsonify(get_scheduler().status())
 
 
 @api_bp.route('/docs', methods=['GET'])
@@ -174,7 +784,9 @@ def api_docs():
                     'p': 'Probability of winning',
                     'q': 'Payout multiplier',
                     'j': 'Bet size',
-                    'trials': 'Number of simulations to run (default: 10000)'
+                    'trials': 'Number of simulations to run (default: 10000)',
+                    'units': 'Keep the bankroll as whole units, this many per dollar (optional)',
+                    'win_rounding': 'Rounding of fractional winnings: floor (default), ceil or nearest'
                 },
                 'example': {
                     'request': {'i': 10, 'n': 20, 'p': 0.4, 'q': 1.5, 'j': 2, 'trials': 5000},
@@ -196,8 +808,104 @@ def api_docs():
                     'use_credit': 'Enable line of credit (boolean)',
                     'use_dynamic_betting': 'Enable dynamic betting (boolean)',
                     'use_max_bet': 'Enable maximum bet limit (boolean)',
+                    'trials': 'Number of simulations to run (default: 10000)',
+                    'units': 'Keep the bankroll as whole units, this many per dollar (optional)',
+                    'bet_rounding': 'Rounding of fractional bets: floor (default), ceil or nearest',
+                    'win_rounding': 'Rounding of fractional winnings: floor (default), ceil or nearest'
+                }
+            },
+            {
+                'path': '/api/compare-strategies',
+                'method': 'POST',
+                'description': 'Compare strategies on common random numbers',
+                'parameters': {
+                    'i': 'Starting amount (dollars)',
+                    'n': 'Goal amount (dollars)',
+                    'p': 'Probability of winning',
+                    'q': 'Payout multiplier',
+                    'j': 'Bet size',
+                    'k': 'Credit line amount (required if a strategy uses credit)',
+                    'm': 'Maximum bet (required if a strategy uses a maximum bet)',
+                    'strategies': 'List of preset names (general, credit, dynamic_betting, max_bet, full) '
+                                  'or objects with name, extension flags and optionally k and m (default: every preset '
+                                  'whose k and m are given)',
+                    'baseline': 'Strategy the others are compared with (default: the first)',
+                    'seed': 'Seed for the common random numbers (optional)',
                     'trials': 'Number of simulations to run (default: 10000)'
+                },
+                'example': {
+                    'request': {'i': 10, 'n': 20, 'p': 0.47, 'q': 2, 'j': 1, 'm': 4,
+                                'strategies': ['general', 'max_bet', 'dynamic_betting']}
                 }
+            },
+            {
+                'path': '/api/refine',
+                'method': 'POST',
+                'description': 'Add trials to a stored estimate until it reaches a target standard error',
+                'parameters': {
+                    'engine': 'basic, general or extended',
+                    '<engine parameters>': 'The parameters of that engine\'s endpoint, without trials',
+                    'target_std_error': 'Standard error of the win probability to reach',
+                    'max_trials': 'Stop at this many trials (default: 1000000, at most 10000000)'
+                },
+                'example': {
+                    'request': {'engine': 'general', 'i': 10, 'n': 20, 'p': 0.45, 'q': 2, 'j': 1,
+                                'target_std_error': 0.001},
+                    'response': {'win_probability': 0.269, 'trials': 216000, 'trials_added': 206000,
+                                 'std_error': 0.00096, 'target_met': True}
+                }
+            },
+            {
+                'path': '/api/optimal-strategy',
+                'method': 'POST',
+                'description': 'Optimal bet at every bankroll under a maximum bet',
+                'parameters': {
+                    'n': 'Goal amount (dollars, at most 2000)',
+                    'p': 'Probability of winning',
+                    'q': 'Payout multiplier',
+                    'j': 'Bet granularity (bets are multiples of j)',
+                    'm': 'Maximum bet (optional, default: no limit)',
+                    'i': 'Starting amount to summarize (optional)',
+                    'method': "'policy' (default) or 'value' iteration"
+                },
+                'example': {
+                    'request': {'n': 16, 'p': 0.45, 'q': 2, 'j': 1, 'i': 5},
+                    'response': {'optimal_bet': 5, 'optimal_win_probability': 0.2526}
+                }
+            },
+            {
+                'path': '/api/tables',
+                'method': 'GET',
+                'description': 'Coverage and staleness of the precomputed lookup tables'
+            },
+            {
+                'path': '/api/experiments',
+                'method': 'GET',
+                'description': 'Query recorded simulation runs',
+                'parameters': {
+                    'engine': 'Only runs of this engine: basic, general or extended (optional)',
+                    '<column>_min': 'Inclusive lower bound on i, n, p, q, j, k, m, trials, win_probability or recorded_at (optional)',
+                    '<column>_max': 'Inclusive upper bound on the same columns (optional)',
+                    'limit': 'Maximum number of runs, most recent first (default: 1000)'
+                },
+                'example': {
+                    'request': '/api/experiments?engine=general&p_min=0.4&p_max=0.5'
+                }
+            },
+            {
+                'path': '/api/experiments/export',
+                'method': 'GET',
+                'description': 'Download all recorded runs as a Parquet file'
+            },
+            {
+                'path': '/api/checkpoints',
+                'method': 'GET',
+                'description': 'Progress of checkpointed runs (simulation requests with checkpoint: true)'
+            },
+            {
+                'path': '/api/scheduler',
+                'method': 'GET',
+                'description': 'Admission scheduler state and learned cost-model corrections'
             }
         ]
     }
@@ -0,0 +1,245 @@
+"""
+Response Serialization for the Gambler's Ruin API
+
+This module picks the response format from the request's Accept header:
+(a) application/json (the default)
+(b) application/msgpack: MessagePack, with NumPy arrays as raw little-endian buffers
+(c) application/vnd.apache.arrow.stream: Arrow IPC stream; arrays become columns
+(d) application/x-ndarrays: raw little-endian arrays behind a small JSON header
+
+The binary formats write NumPy buffers directly instead of converting each
+element to a Python float. Responses are gzip-compressed when the client
+accepts it.
+
+The x-ndarrays layout is:
+    bytes 0-3    magic b'GRA1'
+    bytes 4-7    header length H (uint32, little-endian)
+    bytes 8-8+H  UTF-8 JSON header, padded with spaces to a multiple of 8 bytes:
+                 {"scalars": {...}, "arrays": [{"name", "dtype", "shape", "offset", "length"}]}
+    then         array data, each array starting at a multiple of 8 bytes;
+                 offsets are relative to the start of the data section
+"""
+
+import gzip
+import json
+import struct
+from typing import Any, Dict, List, Tuple
+
+import msgpack
+import numpy as np
+import pyarrow as pa
+from flask import Response, jsonify, request
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+ARROW = 'application/vnd.apache.arrow.stream'
+NDARRAYS = 'application/x-ndarrays'
+
+FORMATS = [JSON, MSGPACK, ARROW, NDARRAYS]
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+_MAGIC = b'GRA1'
+
+
+def _plain(value: Any) -> Any:
+    """Convert NumPy values inside a payload to plain Python values."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _wire_array(array: np.ndarray) -> np.ndarray:
+    """Little-endian array with a dtype every client can read."""
+    if array.dtype == np.bool_:
+        array = array.astype(np.uint8)
+    elif array.dtype.kind in 'iu' and array.dtype.itemsize == 8:
+        # Browsers read 64-bit integers only as BigInt; use int32 when it fits
+        info = np.iinfo(np.int32)
+        fits = array.size == 0 or (array.min() >= info.min and array.max() <= info.max)
+        array = array.astype(np.int32 if fits else np.float64)
+    elif array.dtype.kind == 'f' and array.dtype.itemsize != 8:
+        array = array.astype(np.float64)
+    return np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+
+
+def _split(payload: Dict[str, Any], prefix: str = '') -> Tuple[Dict[str, Any], List[Tuple[str, np.ndarray]]]:
+    """Separate NumPy arrays (by dotted name) from the rest of a payload."""
+    scalars: Dict[str, Any] = {}
+    arrays: List[Tuple[str, np.ndarray]] = []
+    for key, value in payload.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, np.ndarray):
+            arrays.append((name, _wire_array(value)))
+        elif isinstance(value, dict):
+            nested_scalars, nested_arrays = _split(value, f"{name}.")
+            arrays.extend(nested_arrays)
+            if nested_scalars:
+                scalars[key] = nested_scalars
+        else:
+            scalars[key] = _plain(value)
+    return scalars, arrays
+
+
+def encode_ndarrays(payload: Dict[str, Any]) -> bytes:
+    """
+    Encode a payload in the x-ndarrays layout described in the module docstring.
+
+    Args:
+        payload: Dict of scalars, nested dicts and NumPy arrays
+
+    Returns:
+        Encoded bytes
+    """
+    scalars, arrays = _split(payload)
+    entries = []
+    offset = 0
+    for name, array in arrays:
+        entries.append({'name': name, 'dtype': array.dtype.str, 'shape': list(array.shape),
+                        'offset': offset, 'length': int(array.size)})
+        offset += -(-array.nbytes // 8) * 8
+
+    header = json.dumps({'scalars': scalars, 'arrays': entries}, separators=(',', ':')).encode()
+    header += b' ' * (-(8 + len(header)) % 8)
+
+    parts = [_MAGIC, struct.pack('<I', len(header)), header]
+    for _, array in arrays:
+        data = array.tobytes()
+        parts.append(data + b'\0' * (-len(data) % 8))
+    return b''.join(parts)
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        array = _wire_array(value)
+        return {'__ndarray__': True, 'dtype': array.dtype.str, 'shape': list(array.shape), 'data': array.tobytes()}
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode_msgpack(payload: Any) -> bytes:
+    """
+    Encode a payload as MessagePack; NumPy arrays become maps with raw data.
+
+    Args:
+        payload: Payload to encode
+
+    Returns:
+        Encoded bytes
+    """
+    return msgpack.packb(payload, default=_msgpack_default, use_bin_type=True)
+
+
+def encode_arrow(payload: Any) -> bytes:
+    """
+    Encode a payload as an Arrow IPC stream.
+
+    A pyarrow Table is written as is. For a dict, its NumPy arrays become
+    columns (they must share one length) and the other values are stored as
+    JSON in the schema metadata; a dict without arrays becomes a single row.
+
+    Args:
+        payload: pyarrow Table or dict
+
+    Returns:
+        Encoded bytes
+    """
+    if isinstance(payload, pa.Table):
+        table = payload
+    else:
+        scalars, arrays = _split(payload)
+        if arrays:
+            lengths = {array.size for _, array in arrays}
+            if len(lengths) > 1:
+                raise ValueError("Arrow responses need arrays of one length")
+            table = pa.table({name: array.ravel() for name, array in arrays})
+        else:
+            table = pa.Table.from_pylist([{key: json.dumps(value) if isinstance(value, (dict, list)) else value
+                                           for key, value in scalars.items()}])
+        table = table.replace_schema_metadata({'scalars': json.dumps(scalars)})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def negotiate() -> str:
+    """
+    Pick the response format for the current request.
+
+    Returns:
+        One of FORMATS; JSON when the client has no preference
+    """
+    return request.accept_mimetypes.best_match(FORMATS, default=JSON)
+
+
+def respond(payload: Any, status: int = 200) -> Response:
+    """
+    Build a response in the format the client asked for.
+
+    Every response varies by Accept and Accept-Encoding, compressed or not,
+    so caches never serve one format or encoding for another.
+
+    Args:
+        payload: Dict (may contain NumPy arrays) or, for tabular results, a pyarrow Table
+        status: HTTP status code
+
+    Returns:
+        Flask response
+    """
+    mimetype = negotiate()
+    if mimetype == MSGPACK:
+        body = encode_msgpack(payload.to_pydict() if isinstance(payload, pa.Table) else payload)
+    elif mimetype == ARROW:
+        body = encode_arrow(payload)
+    elif mimetype == NDARRAYS:
+        if isinstance(payload, pa.Table):
+            payload = {name: payload.column(name).to_numpy(zero_copy_only=False)
+                       for name in payload.column_names}
+        body = encode_ndarrays(payload)
+    else:
+        if isinstance(payload, pa.Table):
+            payload = payload.to_pylist()
+        body = None
+
+    if body is None:
+        response = jsonify(_plain(payload))
+        response.status_code = status
+    else:
+        response = Response(body, status=status, mimetype=mimetype)
+
+    response.vary.add('Accept')
+    response.vary.add('Accept-Encoding')
+    return compress(response)
+
+
+def compress(response: Response) -> Response:
+    """
+    Gzip a response body when the client accepts it and it is large enough.
+
+    Args:
+        response: Flask response
+
+    Returns:
+        The same response, compressed if worthwhile
+    """
+    if 'gzip' not in request.accept_encodings or response.direct_passthrough:
+        return response
+
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_SIZE:
+        return response
+
+    response.set_data(gzip.compress(body, compresslevel=5))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
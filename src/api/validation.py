@@ -4,7 +4,11 @@ Parameter Validation for Gambler's Ruin API
 This module provides functions for validating API request parameters.
 """
 
-from typing import Dict, Any
+from typing import Any, Dict, Sequence
+
+from src.simulation.comparison import default_strategies, strategy_rules
+from src.simulation.fixed_point import ROUNDING_POLICIES
+from src.utils.experiment_store import RANGE_COLUMNS
 
 
 def validate_basic_params(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -115,7 +119,7 @@ def validate_general_params(data: Dict[str, Any]) -> Dict[str, Any]:
         raise ValueError("Number of trials cannot exceed 1,000,000")
     
     # Return validated parameters
-    return {
+    params = {
         'i': i,
         'n': n,
         'p': p,
@@ -123,6 +127,104 @@ def validate_general_params(data: Dict[str, Any]) -> Dict[str, Any]:
         'j': j,
         'trials': trials
     }
+    # The general model bets whole units, so only its winnings are rounded
+    params.update(validate_fixed_point_params(data, ('win_rounding',)))
+    return params
+
+
+def validate_fixed_point_params(data: Dict[str, Any],
+                                policies: Sequence[str] = ('bet_rounding', 'win_rounding')) -> Dict[str, Any]:
+    """
+    Validate the optional fixed-point bankroll parameters.
+    
+    Args:
+        data: Request data that may contain units, bet_rounding and win_rounding
+        policies: Rounding policies the model applies; only these are returned
+        
+    Returns:
+        Dict with units and the applied rounding policies, or an empty dict
+        when units is not given
+        
+    Raises:
+        ValueError: If any parameters are invalid, or a rounding policy is
+            given without units
+    """
+    if data.get('units') is None:
+        if any(data.get(key) is not None for key in ('bet_rounding', 'win_rounding')):
+            raise ValueError("Rounding policies (bet_rounding, win_rounding) require units")
+        return {}
+    
+    try:
+        units = int(data['units'])
+    except (ValueError, TypeError):
+        raise ValueError("Units per dollar (units) must be an integer")
+    
+    if units < 1 or units > 10000:
+        raise ValueError("Units per dollar (units) must be between 1 and 10,000")
+    
+    params = {'units': units}
+    for key in policies:
+        policy = data.get(key, 'floor')
+        if policy not in ROUNDING_POLICIES:
+            raise ValueError(f"Rounding policy ({key}) must be one of: {', '.join(ROUNDING_POLICIES)}")
+        params[key] = policy
+    
+    return params
+
+
+def validate_checkpoint_params(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate the options of a checkpointed simulation run.
+
+    Args:
+        data: Request data that may contain seed and shard_size
+
+    Returns:
+        Dict with seed (None to draw a new one) and shard_size
+
+    Raises:
+        ValueError: If any parameters are invalid
+    """
+    try:
+        seed = int(data['seed']) if data.get('seed') is not None else None
+        shard_size = int(data.get('shard_size', 100000))
+    except (ValueError, TypeError):
+        raise ValueError("Seed and shard size must be integers")
+
+    # Seeds are stored in the experiment store's int64 seed column
+    if seed is not None and not 0 <= seed < 2**63:
+        raise ValueError("Seed must be between 0 and 2**63 - 1")
+
+    if shard_size < 1000:
+        raise ValueError("Shard size must be at least 1,000")
+
+    return {'seed': seed, 'shard_size': shard_size}
+
+
+def _extension_amount(value: Any, name: str) -> int:
+    """
+    Validate a credit line amount (k) or maximum bet (m).
+    
+    Args:
+        value: Raw value from the request
+        name: 'k' or 'm'
+        
+    Returns:
+        The amount as a positive integer
+        
+    Raises:
+        ValueError: If the value is not a positive integer
+    """
+    label = 'Credit line amount (k)' if name == 'k' else 'Maximum bet (m)'
+    try:
+        amount = int(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"{label} must be an integer")
+    
+    if amount <= 0:
+        raise ValueError(f"{label} must be greater than 0")
+    
+    return amount
 
 
 def validate_extended_params(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -143,6 +245,7 @@ def validate_extended_params(data: Dict[str, Any]) -> Dict[str, Any]:
     
     # Start with general parameter validation
     params = validate_general_params(data)
+    params.update(validate_fixed_point_params(data))
     
     # Get extension flags
     use_credit = bool(data.get('use_credit', False))
@@ -153,34 +256,261 @@ def validate_extended_params(data: Dict[str, Any]) -> Dict[str, Any]:
     if use_credit:
         if 'k' not in data:
             raise ValueError("Missing required parameter: k (credit line amount)")
-        
-        try:
-            k = int(data['k'])
-        except (ValueError, TypeError):
-            raise ValueError("Credit line amount (k) must be an integer")
-        
-        if k <= 0:
-            raise ValueError("Credit line amount (k) must be greater than 0")
-        
-        params['k'] = k
+        params['k'] = _extension_amount(data['k'], 'k')
     
     if use_max_bet:
         if 'm' not in data:
             raise ValueError("Missing required parameter: m (maximum bet)")
-        
-        try:
-            m = int(data['m'])
-        except (ValueError, TypeError):
-            raise ValueError("Maximum bet (m) must be an integer")
-        
-        if m <= 0:
-            raise ValueError("Maximum bet (m) must be greater than 0")
-        
-        params['m'] = m
+        params['m'] = _extension_amount(data['m'], 'm')
     
     # Add extension flags to params
     params['use_credit'] = use_credit
     params['use_dynamic_betting'] = use_dynamic_betting
     params['use_max_bet'] = use_max_bet
     
-    return params 
\ No newline at end of file
+    return params 
+
+def validate_experiment_query(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate query-string parameters for the experiment store.
+    
+    Ranges are given as ``<column>_min`` and ``<column>_max``, e.g.
+    ``p_min=0.4&p_max=0.5``.
+    
+    Args:
+        args: Query-string parameters
+        
+    Returns:
+        Dict with engine, ranges and limit for ExperimentStore.query
+        
+    Raises:
+        ValueError: If any parameters are invalid
+    """
+    engine = args.get('engine')
+    if engine is not None and engine not in ('basic', 'general', 'extended'):
+        raise ValueError("Engine must be one of: basic, general, extended")
+    
+    ranges = {}
+    for column in RANGE_COLUMNS:
+        bounds = []
+        for suffix in ('_min', '_max'):
+            value = args.get(column + suffix)
+            try:
+                bounds.append(float(value) if value is not None else None)
+            except (ValueError, TypeError):
+                raise ValueError(f"Parameter {column + suffix} must be a number")
+        if bounds != [None, None]:
+            ranges[column] = tuple(bounds)
+    
+    try:
+        limit = int(args.get('limit', 1000))
+    except (ValueError, TypeError):
+        raise ValueError("Parameter limit must be an integer")
+    
+    if limit <= 0:
+        raise ValueError("Parameter limit must be greater than 0")
+    
+    return {
+        'engine': engine,
+        'ranges': ranges,
+        'limit': limit
+    }
+
+
+def validate_optimal_params(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate parameters for the optimal strategy solver.
+    
+    Args:
+        data: Request data containing solver parameters
+        
+    Returns:
+        Dict with validated parameters
+        
+    Raises:
+        ValueError: If any parameters are invalid
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    
+    # Check required parameters
+    required_params = ['n', 'p', 'q', 'j']
+    for param in required_params:
+        if param not in data:
+            raise ValueError(f"Missing required parameter: {param}")
+    
+    # Convert to appropriate types
+    try:
+        n = int(data['n'])
+        p = float(data['p'])
+        q = float(data['q'])
+        j = int(data['j'])
+        m = int(data['m']) if data.get('m') is not None else None
+        i = int(data['i']) if data.get('i') is not None else None
+    except (ValueError, TypeError):
+        raise ValueError("Invalid parameter types")
+    
+    method = data.get('method', 'policy')
+    
+    # Validate parameter ranges
+    if n < 2:
+        raise ValueError("Goal amount (n) must be at least 2")
+    
+    if n > 2000:
+        raise ValueError("Goal amount (n) cannot exceed 2,000 for the solver")
+    
+    if p <= 0 or p >= 1:
+        raise ValueError("Win probability (p) must be between 0 and 1 (exclusive)")
+    
+    if q <= 1:
+        raise ValueError("Payout multiplier (q) must be greater than 1")
+    
+    if j <= 0:
+        raise ValueError("Bet size (j) must be greater than 0")
+    
+    if m is not None and m <= 0:
+        raise ValueError("Maximum bet (m) must be greater than 0")
+    
+    if i is not None and (i <= 0 or i >= n):
+        raise ValueError("Starting amount (i) must be between 0 and n (exclusive)")
+    
+    if method not in ('policy', 'value'):
+        raise ValueError("Method must be 'policy' or 'value'")
+    
+    fixed_point = validate_fixed_point_params(data, ('win_rounding',))
+    if n * fixed_point.get('units', 1) > 2000:
+        raise ValueError("Goal amount in units (n * units) cannot exceed 2,000 for the solver")
+    
+    # Return validated parameters
+    return {
+        'i': i,
+        'n': n,
+        'p': p,
+        'q': q,
+        'j': j,
+        'm': m,
+        'method': method,
+        'units': fixed_point.get('units'),
+        'win_rounding': fixed_point.get('win_rounding', 'floor')
+    }
+
+
+def validate_comparison_params(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate parameters for a common-random-numbers strategy comparison.
+    
+    Args:
+        data: Request data containing comparison parameters
+        
+    Returns:
+        Dict with validated parameters; 'strategies' maps each name to its rules
+        
+    Raises:
+        ValueError: If any parameters are invalid
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    
+    # Start with general parameter validation
+    params = validate_general_params(data)
+    params.update(validate_fixed_point_params(data))
+    
+    # Optional shared extension parameters, which a strategy may override
+    k = _extension_amount(data['k'], 'k') if data.get('k') is not None else None
+    m = _extension_amount(data['m'], 'm') if data.get('m') is not None else None
+    try:
+        seed = int(data['seed']) if data.get('seed') is not None else None
+    except (ValueError, TypeError):
+        raise ValueError("Seed must be an integer")
+    
+    specs = data.get('strategies', default_strategies(k, m))
+    if not isinstance(specs, list) or len(specs) < 2:
+        raise ValueError("Parameter strategies must be a list of at least two strategies")
+    
+    strategies = {}
+    for index, spec in enumerate(specs):
+        if isinstance(spec, str):
+            name = spec
+        elif isinstance(spec, dict):
+            name = str(spec.get('name', f'strategy_{index + 1}'))
+            spec = dict(spec)
+            for key in ('k', 'm'):
+                if spec.get(key) is not None:
+                    try:
+                        spec[key] = _extension_amount(spec[key], key)
+                    except ValueError as e:
+                        raise ValueError(f"Strategy {name}: {e}")
+        else:
+            raise ValueError("Each strategy must be a preset name or an object of extension flags")
+        
+        if name in strategies:
+            raise ValueError(f"Duplicate strategy name: {name}")
+        
+        strategies[name] = strategy_rules(spec, k=k, m=m)
+    
+    baseline = data.get('baseline')
+    if baseline is not None and baseline not in strategies:
+        raise ValueError(f"Unknown baseline strategy: {baseline}")
+    
+    params['strategies'] = strategies
+    params['baseline'] = baseline
+    params['seed'] = seed
+    
+    return params
+
+
+def validate_refine_params(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate parameters for refining a stored estimate to a target precision.
+    
+    Args:
+        data: Request data with 'engine', the engine's simulation parameters,
+            'target_std_error' and optionally 'max_trials'
+        
+    Returns:
+        Dict with 'engine', the engine's validated 'params', 'target_std_error'
+        and 'max_trials'
+        
+    Raises:
+        ValueError: If any parameters are invalid
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    
+    validators = {
+        'basic': validate_basic_params,
+        'general': validate_general_params,
+        'extended': validate_extended_params
+    }
+    engine = data.get('engine')
+    if engine not in validators:
+        raise ValueError(f"Engine must be one of: {', '.join(validators)}")
+    
+    # The number of trials is decided by the target, not the request
+    params = validators[engine]({key: value for key, value in data.items() if key != 'trials'})
+    params.pop('trials', None)
+    
+    if 'target_std_error' not in data:
+        raise ValueError("Missing required parameter: target_std_error")
+    
+    try:
+        target_std_error = float(data['target_std_error'])
+        max_trials = int(data.get('max_trials', 1000000))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid parameter types")
+    
+    if target_std_error <= 0 or target_std_error >= 0.5:
+        raise ValueError("Target standard error must be between 0 and 0.5 (exclusive)")
+    
+    if max_trials <= 0:
+        raise ValueError("Maximum number of trials must be greater than 0")
+    
+    if max_trials > 10000000:
+        raise ValueError("Maximum number of trials cannot exceed 10,000,000")
+    
+    return {
+        'engine': engine,
+        'params': params,
+        'target_std_error': target_std_error,
+        'max_trials': max_trials
+    }
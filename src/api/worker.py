@@ -0,0 +1,64 @@
+"""
+Gambler's Ruin Simulation Worker
+
+This module sets up a small Flask application that runs shards of trials for
+the distributed coordinator (see ``src.simulation.distributed``).
+
+Start a worker with:
+    python -m src.api.worker --port 6001
+"""
+
+import argparse
+import os
+
+from flask import Flask, request, jsonify
+
+from src.simulation.distributed import run_shard
+
+# Create Flask application
+app = Flask(__name__)
+
+
+@app.route('/health', methods=['GET'])
+def health():
+    """Health check used by the coordinator"""
+    return jsonify({'status': 'ok', 'pid': os.getpid()})
+
+
+@app.route('/shard', methods=['POST'])
+def shard():
+    """Run one shard of trials"""
+    data = request.get_json()
+
+    # Validate parameters
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+
+    try:
+        function = str(data['function'])
+        params = dict(data.get('params', {}))
+        trials = int(data['trials'])
+        seed = int(data['seed'])
+    except (KeyError, ValueError, TypeError):
+        return jsonify({'error': 'Shard requires function, params, trials and seed'}), 400
+
+    if trials <= 0:
+        return jsonify({'error': 'Number of trials must be greater than 0'}), 400
+
+    # Run shard
+    try:
+        return jsonify(run_shard(function, params, trials, seed))
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Simulation error: {str(e)}'}), 500
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a simulation worker")
+    parser.add_argument('--host', default='0.0.0.0', help="Host to bind")
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 6001)), help="Port to listen on")
+    args = parser.parse_args()
+
+    # Threaded so health checks are answered while a shard runs
+    app.run(host=args.host, port=args.port, threaded=True)
@@ -12,6 +12,18 @@ from src.simulation.extended_simulation import (
     run_with_max_bet,
     run_full_extension
 )
+from src.simulation.strategy_engine import (
+    Rule,
+    CreditLine,
+    BetProgression,
+    TableLimit,
+    register_rule,
+    rule_from_spec,
+    build_rules,
+    run_strategy
+)
+from src.simulation.optimal_strategy import solve_optimal_strategy
+from src.simulation.comparison import compare_strategies
 
 __all__ = [
     'monte_carlo_simulation',
@@ -19,5 +31,15 @@ __all__ = [
     'run_with_credit',
     'run_with_dynamic_betting',
     'run_with_max_bet',
-    'run_full_extension'
+    'run_full_extension',
+    'Rule',
+    'CreditLine',
+    'BetProgression',
+    'TableLimit',
+    'register_rule',
+    'rule_from_spec',
+    'build_rules',
+    'run_strategy',
+    'solve_optimal_strategy',
+    'compare_strategies'
 ] 
\ No newline at end of file
@@ -10,20 +10,22 @@ This module implements the classic Gambler's Ruin problem where:
 
 import random
 import numpy as np
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
 
 
-def run_single_simulation(i: int, n: int) -> bool:
+def run_single_simulation(i: int, n: int, rng: Optional[random.Random] = None) -> bool:
     """
     Run a single simulation of the Gambler's Ruin problem.
     
     Args:
         i: Starting amount (dollars)
         n: Goal amount (dollars)
+        rng: Optional random number generator (defaults to the random module)
         
     Returns:
         bool: True if the gambler wins (reaches n dollars), False if they go broke
     """
+    draw = (rng or random).random
     current_amount = i
     
     while 0 < current_amount < n:
@@ -31,7 +33,7 @@ def run_single_simulation(i: int, n: int) -> bool:
         bet = 1
         
         # Win with probability 0.5
-        if random.random() < 0.5:
+        if draw() < 0.5:
             current_amount += bet  # Win (double the money)
         else:
             current_amount -= bet  # Lose
@@ -40,7 +42,7 @@ def run_single_simulation(i: int, n: int) -> bool:
     return current_amount >= n
 
 
-def monte_carlo_simulation(i: int, n: int, trials: int = 10000) -> Dict[str, float]:
+def monte_carlo_simulation(i: int, n: int, trials: int = 10000, seed: Optional[int] = None) -> Dict[str, float]:
     """
     Run multiple simulations of the Gambler's Ruin problem to estimate probabilities.
     
@@ -48,18 +50,20 @@ def monte_carlo_simulation(i: int, n: int, trials: int = 10000) -> Dict[str, flo
         i: Starting amount (dollars)
         n: Goal amount (dollars)
         trials: Number of simulations to run
+        seed: Optional seed for the random number generator
         
     Returns:
-        Dict with keys 'win_probability' and 'broke_probability'
+        Dict with keys 'win_probability', 'broke_probability' and 'wins'
     """
     # Validate inputs
     if i <= 0 or n <= i or trials <= 0:
         raise ValueError("Invalid input parameters. Must have 0 < i < n and trials > 0.")
     
+    rng = random.Random(seed) if seed is not None else None
     wins = 0
     
     for _ in range(trials):
-        if run_single_simulation(i, n):
+        if run_single_simulation(i, n, rng):
             wins += 1
     
     win_probability = wins / trials
@@ -67,7 +71,8 @@ def monte_carlo_simulation(i: int, n: int, trials: int = 10000) -> Dict[str, flo
     
     return {
         'win_probability': win_probability,
-        'broke_probability': broke_probability
+        'broke_probability': broke_probability,
+        'wins': wins
     }
 
 
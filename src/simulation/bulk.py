@@ -0,0 +1,436 @@
+"""
+Streaming Bulk Runs for Gambler's Ruin Simulation
+
+This module runs a file of parameter rows offline, without the API:
+(a) Rows are streamed from CSV, JSONL or Parquet files and never loaded whole
+(b) Rows run on a process pool with a bounded number in flight
+(c) Results are written as CSV or JSONL in input order as soon as they are
+    ready, so a partially written output can be resumed
+(d) Rows without a seed get one derived from the run seed and the row number,
+    so a resumed run writes the same results as an uninterrupted one
+(e) With a shard size, each row runs as checkpointed seeded shards
+    (``src.simulation.checkpoint``), so a row interrupted part way resumes
+    from its finished shards
+
+Run it with ``python -m src.simulation`` (see ``src/simulation/__main__.py``).
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import pyarrow.parquet as pq
+
+from src.simulation.basic_simulation import monte_carlo_simulation
+from src.simulation.checkpoint import run_checkpointed
+from src.simulation.distributed import shard_seed
+from src.simulation.general_simulation import monte_carlo_general
+from src.simulation.strategy_engine import build_rules, run_strategy
+
+INPUT_FORMATS = ('csv', 'jsonl', 'parquet')
+OUTPUT_FORMATS = ('csv', 'jsonl')
+
+# Columns added to every output row
+RESULT_COLUMNS = ['win_probability', 'broke_probability', 'seed', 'execution_time', 'error']
+
+# Parameter columns, in the order CSV outputs list them
+INPUT_COLUMNS = ['function', 'i', 'n', 'p', 'q', 'j', 'k', 'm', 'use_credit', 'use_dynamic_betting',
+                 'use_max_bet', 'units', 'bet_rounding', 'win_rounding', 'trials']
+
+_INT_COLUMNS = ('i', 'n', 'j', 'k', 'm', 'trials', 'seed', 'units')
+_FLOAT_COLUMNS = ('p', 'q')
+_BOOL_COLUMNS = ('use_credit', 'use_dynamic_betting', 'use_max_bet')
+_STR_COLUMNS = ('function', 'bet_rounding', 'win_rounding')
+
+
+def file_format(path: str, override: Optional[str] = None) -> str:
+    """
+    Determine a file's format from its extension.
+
+    Args:
+        path: File path
+        override: Explicit format, used instead of the extension
+
+    Returns:
+        'csv', 'jsonl' or 'parquet'
+    """
+    if override:
+        return override
+    extension = os.path.splitext(path)[1].lower()
+    formats = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet', '.pq': 'parquet'}
+    if extension not in formats:
+        raise ValueError(f"Cannot tell the format of {path}; pass it explicitly")
+    return formats[extension]
+
+
+def read_rows(path: str, fmt: Optional[str] = None, batch_size: int = 1024) -> Iterator[Dict[str, Any]]:
+    """
+    Stream parameter rows from a file.
+
+    Args:
+        path: Input file
+        fmt: 'csv', 'jsonl' or 'parquet' (defaults to the extension)
+        batch_size: Rows read at a time from Parquet
+
+    Yields:
+        One dict per row; a JSONL line that is not valid JSON yields a
+        ValueError in its place, so later rows keep their row numbers
+    """
+    fmt = file_format(path, fmt)
+    if fmt == 'csv':
+        with open(path, newline='') as f:
+            yield from csv.DictReader(f)
+    elif fmt == 'jsonl':
+        with open(path) as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield ValueError(f"Invalid JSON on line {number}: {e.msg}")
+    elif fmt == 'parquet':
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Input format must be one of: {', '.join(INPUT_FORMATS)}")
+
+
+def count_rows(path: str, fmt: Optional[str] = None) -> int:
+    """
+    Count the rows of an input file without keeping them.
+
+    Parquet row counts come from the file metadata; text files are scanned once.
+
+    Args:
+        path: Input file
+        fmt: 'csv', 'jsonl' or 'parquet' (defaults to the extension)
+
+    Returns:
+        Number of rows
+    """
+    fmt = file_format(path, fmt)
+    if fmt == 'parquet':
+        return pq.ParquetFile(path).metadata.num_rows
+    return sum(1 for _ in read_rows(path, fmt))
+
+
+def _parse_int(value: Any) -> int:
+    # Exact for large seeds; also accepts '10.0' from spreadsheets
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))
+
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y')
+    return bool(value)
+
+
+def parse_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert the known columns of an input row to their types.
+
+    Empty values are dropped, so CSV rows can leave optional columns blank.
+
+    Args:
+        row: Raw input row
+
+    Returns:
+        Dict of simulation parameters
+
+    Raises:
+        ValueError: If the row is not a mapping or a value has the wrong type
+            (including JSON values such as lists or Infinity for an integer),
+            or is the error ``read_rows`` gave for an unreadable line
+    """
+    if isinstance(row, ValueError):
+        raise row
+    if not isinstance(row, dict):
+        raise ValueError("Row must be an object of columns")
+
+    params = {}
+    for key, value in row.items():
+        if value is None or (isinstance(value, str) and not value.strip()):
+            continue
+        try:
+            if key in _INT_COLUMNS:
+                params[key] = _parse_int(value)
+            elif key in _FLOAT_COLUMNS:
+                params[key] = float(value)
+            elif key in _BOOL_COLUMNS:
+                params[key] = _parse_bool(value)
+            elif key in _STR_COLUMNS:
+                params[key] = str(value).strip()
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Bad value for column {key}: {value!r}")
+    return params
+
+
+def _shard_args(params: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Shard function name and parameters (without trials and seed) of a parsed row."""
+    function = params.get('function', 'general')
+    if function == 'basic':
+        return 'basic', {'i': params['i'], 'n': params['n']}
+
+    args = {'i': params['i'], 'n': params['n'], 'p': params['p'], 'q': params['q'], 'j': params['j'],
+            'units': params.get('units'), 'win_rounding': params.get('win_rounding', 'floor')}
+    if function == 'general':
+        return 'general', args
+    if function == 'extended':
+        rules = build_rules(
+            use_credit=params.get('use_credit', False),
+            use_dynamic_betting=params.get('use_dynamic_betting', False),
+            use_max_bet=params.get('use_max_bet', False),
+            k=params.get('k'),
+            m=params.get('m')
+        )
+        if not rules:
+            raise ValueError("No extensions selected")
+        return 'strategy', dict(args, rules=rules, bet_rounding=params.get('bet_rounding', 'floor'))
+    raise ValueError(f"Unknown function: {function}")
+
+
+def run_row(params: Dict[str, Any], shard_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run the simulation for one parsed row.
+
+    The 'function' column picks 'basic', 'general' (the default) or
+    'extended'; extended rows select their rules with the use_* columns.
+
+    Args:
+        params: Parsed row with function, simulation parameters, trials and seed
+        shard_size: If given, run the row as shards of this many trials,
+            checkpointed by ``get_checkpoints()``; the result is that of
+            ``run_local`` with the row's seed and this shard size
+
+    Returns:
+        Dict with win_probability, broke_probability and execution_time
+    """
+    function, args = _shard_args(params)
+    trials = params.get('trials', 10000)
+    seed = params.get('seed')
+    start_time = time.time()
+
+    if shard_size is not None:
+        if 'rules' in args:
+            args['rules'] = [rule.describe() for rule in args['rules']]
+        result = run_checkpointed(function, args, trials, seed, shard_size)
+    elif function == 'basic':
+        result = monte_carlo_simulation(params['i'], params['n'], trials, seed)
+    elif function == 'general':
+        result = monte_carlo_general(trials=trials, seed=seed, **args)
+    else:
+        result = run_strategy(trials=trials, seed=seed, **args)
+
+    return {
+        'win_probability': result['win_probability'],
+        'broke_probability': result['broke_probability'],
+        'execution_time': time.time() - start_time
+    }
+
+
+def _run_safely(params: Dict[str, Any], shard_size: Optional[int] = None) -> Dict[str, Any]:
+    # Errors are reported in the row instead of stopping the whole run
+    try:
+        return run_row(params, shard_size)
+    except (KeyError, ValueError, TypeError, OverflowError) as e:
+        message = f"Missing column: {e}" if isinstance(e, KeyError) else str(e)
+        return {'error': message.replace('\n', ' ')}
+
+
+def completed_rows(path: str, fmt: Optional[str] = None) -> int:
+    """
+    Count the complete result rows of a partially written output and drop any partial last row.
+
+    Args:
+        path: Output file
+        fmt: 'csv' or 'jsonl' (defaults to the extension)
+
+    Returns:
+        Number of complete result rows (0 if the file does not exist)
+    """
+    fmt = file_format(path, fmt)
+    if not os.path.exists(path):
+        return 0
+
+    lines = 0
+    complete = 0
+    offset = 0
+    with open(path, 'rb+') as f:
+        # Read in blocks so a large output is never loaded whole
+        for block in iter(lambda: f.read(1 << 20), b''):
+            newlines = block.count(b'\n')
+            if newlines:
+                lines += newlines
+                complete = offset + block.rfind(b'\n') + 1
+            offset += len(block)
+        if complete < offset:
+            f.truncate(complete)
+
+    # The CSV header is not a result row
+    return max(lines - 1, 0) if fmt == 'csv' else lines
+
+
+def _csv_header(path: str) -> List[str]:
+    with open(path, newline='') as f:
+        return next(csv.reader(f))
+
+
+class _Writer:
+    """Appends result rows to a CSV or JSONL output."""
+
+    def __init__(self, f: TextIO, fmt: str, fields: Optional[List[str]] = None):
+        self.f = f
+        self.fmt = fmt
+        self.write_header = fields is None
+        self.csv = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore', lineterminator='\n') \
+            if fields is not None else None
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self.fmt == 'jsonl':
+            self.f.write(json.dumps(row) + '\n')
+        else:
+            if self.csv is None:
+                # Every parameter and result column, so rows of mixed functions keep all
+                # their values; other columns are taken from the first row written
+                extra = [key for key in row if key not in INPUT_COLUMNS and key not in RESULT_COLUMNS]
+                fields = INPUT_COLUMNS + extra + RESULT_COLUMNS
+                self.csv = csv.DictWriter(self.f, fieldnames=fields, extrasaction='ignore', lineterminator='\n')
+                if self.write_header:
+                    self.csv.writeheader()
+            self.csv.writerow(row)
+        self.f.flush()
+
+
+def run_bulk(input_path: str, output_path: str, workers: Optional[int] = None,
+             max_in_flight: Optional[int] = None, seed: int = 0, resume: bool = False,
+             input_format: Optional[str] = None, output_format: Optional[str] = None,
+             progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+             progress_interval: float = 5.0, shard_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run every row of a parameter file and write the results in input order.
+
+    Args:
+        input_path: CSV, JSONL or Parquet file of parameter rows
+        output_path: CSV or JSONL file for the results
+        workers: Worker processes (defaults to the number of CPUs)
+        max_in_flight: Rows submitted but not yet written (defaults to 4 per worker)
+        seed: Run seed; rows without a seed column use one derived from it and the row number
+        resume: Continue a partially written output instead of overwriting it
+        input_format: Input format (defaults to the extension)
+        output_format: Output format (defaults to the extension)
+        progress: Called with a progress dict (rows_done, total, rows_per_second, eta_seconds)
+        progress_interval: Seconds between progress calls
+        shard_size: Checkpoint each row every this many trials (see ``run_row``);
+            checkpoints are kept under CHECKPOINT_DIR
+
+    Returns:
+        Dict with rows_done, rows_skipped (already in the output), errors, elapsed and rows_per_second
+    """
+    output_format = file_format(output_path, output_format)
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Output format must be one of: {', '.join(OUTPUT_FORMATS)}")
+
+    if shard_size is not None and shard_size <= 0:
+        raise ValueError("Shard size must be greater than 0")
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 4 * workers
+    total = count_rows(input_path, input_format)
+
+    skip = completed_rows(output_path, output_format) if resume else 0
+    append = resume and os.path.exists(output_path) and os.path.getsize(output_path) > 0
+
+    rows = read_rows(input_path, input_format)
+    pending: deque = deque()
+    done = errors = 0
+    start_time = last_report = time.time()
+
+    def report(final: bool = False) -> None:
+        nonlocal last_report
+        if progress is None or (not final and time.time() - last_report < progress_interval):
+            return
+        last_report = time.time()
+        elapsed = last_report - start_time
+        rate = done / elapsed if elapsed > 0 else 0.0
+        remaining = total - skip - done
+        progress({
+            'rows_done': skip + done,
+            'total': total,
+            'rows_per_second': rate,
+            'eta_seconds': remaining / rate if rate > 0 else None,
+            'errors': errors
+        })
+
+    with open(output_path, 'a' if append else 'w', newline='') as f, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = _Writer(f, output_format, fields=_csv_header(output_path) if append and output_format == 'csv' else None)
+
+        for index, row in enumerate(rows):
+            if index < skip:
+                continue
+
+            try:
+                params = parse_row(row)
+                params.setdefault('seed', shard_seed(seed, index))
+                future = pool.submit(_run_safely, params, shard_size)
+            except ValueError as e:
+                params, future = {}, None
+                row = dict(row if isinstance(row, dict) else {}, error=f"Invalid row: {e}")
+            pending.append((row, params, future))
+
+            # Write finished rows in order once the window is full
+            while len(pending) >= max_in_flight or (pending and (pending[0][2] is None or pending[0][2].done())):
+                errors += _write_next(writer, pending)
+                done += 1
+                report()
+
+        while pending:
+            errors += _write_next(writer, pending)
+            done += 1
+            report()
+
+    report(final=True)
+    elapsed = time.time() - start_time
+    return {
+        'rows_done': done,
+        'rows_skipped': skip,
+        'errors': errors,
+        'elapsed': elapsed,
+        'rows_per_second': done / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def _write_next(writer: _Writer, pending: deque) -> int:
+    row, params, future = pending.popleft()
+    result = future.result() if future is not None else {}
+    output = dict(row)
+    output.update(result)
+    if params.get('seed') is not None:
+        output['seed'] = params['seed']
+    writer.write(output)
+    return 1 if output.get('error') else 0
+
+
+def print_progress(status: Dict[str, Any], stream: TextIO = sys.stderr) -> None:
+    """
+    Print a progress line with throughput and ETA.
+
+    Args:
+        status: Progress dict from ``run_bulk``
+        stream: Where to print
+    """
+    eta = status['eta_seconds']
+    eta_text = f"{eta:.0f}s" if eta is not None else '?'
+    percent = 100 * status['rows_done'] / status['total'] if status['total'] else 100.0
+    print(f"{status['rows_done']}/{status['total']} rows ({percent:.1f}%), "
+          f"{status['rows_per_second']:.1f} rows/s, ETA {eta_text}, {status['errors']} errors",
+          file=stream, flush=True)
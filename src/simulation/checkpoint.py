@@ -0,0 +1,291 @@
+"""
+Checkpoint and Resume for Long-Running Simulations
+
+This module runs a simulation as the same seeded shards as
+``src.simulation.distributed`` and periodically saves the run state to local
+disk, so a run interrupted by a crash or redeploy continues where it left off:
+(a) The state holds the shards completed so far with their win counts, the
+    trials completed, total wins and elapsed time
+(b) Each shard draws from its own stream seeded by (seed, shard index), so the
+    set of completed shards is the whole random number generator position and
+    no generator internals need to be saved
+(c) A resumed run gives exactly the result of an uninterrupted run with the
+    same seed and shard size (``run_local``)
+
+Checkpoints are JSON files written atomically under one directory per run;
+only the most recent ones are kept.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+from src.simulation.distributed import SHARD_FUNCTIONS, plan_shards, run_shard, shard_seed
+
+DEFAULT_CHECKPOINT_DIR = os.path.join('data', 'checkpoints')
+
+# Bumped when the checkpoint layout changes; older checkpoints are ignored
+CHECKPOINT_VERSION = 1
+
+# Fields that must match for a checkpoint to belong to a run
+_RUN_FIELDS = ('function', 'params', 'trials', 'seed', 'shard_size')
+
+
+def run_key(function: str, params: Dict[str, Any], trials: int, seed: int, shard_size: int) -> str:
+    """
+    Identify a run by everything that determines its result.
+
+    Args:
+        function: Name of the simulation function in SHARD_FUNCTIONS
+        params: Simulation parameters (without trials and seed)
+        trials: Total number of trials
+        seed: Seed of the whole run
+        shard_size: Maximum trials per shard
+
+    Returns:
+        Hex digest used as the run id
+    """
+    payload = json.dumps({'function': function, 'params': params, 'trials': trials,
+                          'seed': seed, 'shard_size': shard_size}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+class CheckpointManager:
+    """
+    Saves and loads run state under a local directory.
+
+    Args:
+        root: Directory holding one subdirectory of checkpoints per run
+        interval: Minimum seconds between checkpoints of a run (0 saves after every shard)
+        retention: Number of most recent checkpoints kept per run
+    """
+
+    def __init__(self, root: str, interval: float = 60.0, retention: int = 3):
+        if interval < 0:
+            raise ValueError("Checkpoint interval must not be negative")
+        if retention < 1:
+            raise ValueError("Checkpoint retention must be at least 1")
+        self.root = root
+        self.interval = interval
+        self.retention = retention
+        os.makedirs(root, exist_ok=True)
+
+    def _run_dir(self, run_id: str) -> str:
+        return os.path.join(self.root, run_id)
+
+    def _files(self, run_id: str) -> List[str]:
+        directory = self._run_dir(run_id)
+        if not os.path.isdir(directory):
+            return []
+        names = [name for name in os.listdir(directory) if name.startswith('checkpoint-') and name.endswith('.json')]
+        return [os.path.join(directory, name) for name in sorted(names, reverse=True)]
+
+    def save(self, run_id: str, state: Dict[str, Any]) -> str:
+        """
+        Write a checkpoint atomically and drop the ones beyond the retention.
+
+        Args:
+            run_id: Run identifier
+            state: Run state
+
+        Returns:
+            Path of the checkpoint file
+        """
+        directory = self._run_dir(run_id)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"checkpoint-{state['trials_done']:015d}.json")
+
+        # Write to a temporary file first so a crash never leaves a partial checkpoint
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(dict(state, version=CHECKPOINT_VERSION, saved_at=time.time()), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        for old in self._files(run_id)[self.retention:]:
+            os.remove(old)
+        return path
+
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the most recent readable checkpoint of a run.
+
+        Args:
+            run_id: Run identifier
+
+        Returns:
+            Run state, or None if the run has no usable checkpoint
+        """
+        for path in self._files(run_id):
+            try:
+                with open(path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if state.get('version') == CHECKPOINT_VERSION:
+                return state
+        return None
+
+    def clear(self, run_id: str) -> None:
+        """
+        Remove every checkpoint of a run.
+
+        Args:
+            run_id: Run identifier
+        """
+        for path in self._files(run_id):
+            os.remove(path)
+        try:
+            os.rmdir(self._run_dir(run_id))
+        except OSError:
+            pass
+
+    def runs(self) -> List[Dict[str, Any]]:
+        """
+        Summarize the latest checkpoint of every run.
+
+        Returns:
+            List of dicts with run_id, function, trials, trials_done, complete and saved_at
+        """
+        summaries = []
+        for run_id in sorted(os.listdir(self.root)):
+            state = self.load(run_id) if os.path.isdir(self._run_dir(run_id)) else None
+            if state is not None:
+                summaries.append({
+                    'run_id': run_id,
+                    'function': state['function'],
+                    'trials': state['trials'],
+                    'trials_done': state['trials_done'],
+                    'complete': state['complete'],
+                    'saved_at': state['saved_at']
+                })
+        return summaries
+
+
+def run_checkpointed(function: str, params: Dict[str, Any], trials: int, seed: int = 0,
+                     shard_size: int = 100000, manager: Optional[CheckpointManager] = None,
+                     run_id: Optional[str] = None,
+                     runner: Optional[Callable[[str, Dict[str, Any], int, int], Dict[str, int]]] = None,
+                     parallelism: int = 1) -> Dict[str, Any]:
+    """
+    Run a simulation shard by shard, checkpointing and resuming as needed.
+
+    Args:
+        function: Name of the simulation function in SHARD_FUNCTIONS
+        params: Simulation parameters (without trials and seed)
+        trials: Total number of trials
+        seed: Seed of the whole run
+        shard_size: Maximum trials per shard
+        manager: Where checkpoints are kept (defaults to ``get_checkpoints()``)
+        run_id: Run identifier (defaults to a hash of the run's parameters)
+        runner: Runs one shard, with the signature of ``run_shard`` (defaults to in-process)
+        parallelism: Number of shards run at once
+
+    Returns:
+        Dict with win_probability, broke_probability, wins, trials and shards
+        (as ``run_local``), plus run_id and resumed_from (trials taken from a
+        checkpoint)
+    """
+    if function not in SHARD_FUNCTIONS:
+        raise ValueError(f"Unknown simulation function: {function}")
+    if trials <= 0:
+        raise ValueError("Number of trials must be greater than 0")
+    if shard_size <= 0:
+        raise ValueError("Shard size must be greater than 0")
+
+    manager = manager or get_checkpoints()
+    runner = runner or run_shard
+    run_id = run_id or run_key(function, params, trials, seed, shard_size)
+    shards = plan_shards(trials, shard_size)
+
+    # Compare parameters as they come back from JSON (tuples become lists)
+    params = json.loads(json.dumps(params))
+    config = {'function': function, 'params': params, 'trials': trials, 'seed': seed, 'shard_size': shard_size}
+    state = manager.load(run_id)
+    if state is not None and any(state[field] != config[field] for field in _RUN_FIELDS):
+        raise ValueError(f"Checkpoint for run {run_id} was made with different parameters")
+    if state is None:
+        state = dict(config, completed={}, trials_done=0, wins=0, elapsed=0.0, complete=False)
+
+    resumed_from = state['trials_done']
+    pending = [index for index in range(len(shards)) if str(index) not in state['completed']]
+    lock = threading.Lock()
+    started = time.time() - state['elapsed']
+    last_saved = time.time()
+
+    def record(index: int, wins: int) -> None:
+        nonlocal last_saved
+        with lock:
+            state['completed'][str(index)] = wins
+            state['trials_done'] += shards[index]
+            state['wins'] += wins
+            state['elapsed'] = time.time() - started
+            if time.time() - last_saved >= manager.interval:
+                manager.save(run_id, state)
+                last_saved = time.time()
+
+    def run_one(index: int) -> int:
+        return int(runner(function, params, shards[index], shard_seed(seed, index))['wins'])
+
+    if parallelism <= 1:
+        for index in pending:
+            record(index, run_one(index))
+    elif pending:
+        pool = ThreadPoolExecutor(max_workers=min(parallelism, len(pending)))
+        try:
+            futures = {pool.submit(run_one, index): index for index in pending}
+            for future in as_completed(futures):
+                record(futures[future], future.result())
+        except BaseException:
+            # Stop at the first failed shard instead of running the rest of the queue;
+            # shards already running finish but are not recorded
+            pool.shutdown(wait=True, cancel_futures=True)
+            with lock:
+                manager.save(run_id, state)
+            raise
+        pool.shutdown()
+
+    if not state['complete']:
+        state['complete'] = True
+        state['elapsed'] = time.time() - started
+        manager.save(run_id, state)
+
+    win_probability = state['wins'] / trials
+    return {
+        'win_probability': win_probability,
+        'broke_probability': 1 - win_probability,
+        'wins': state['wins'],
+        'trials': trials,
+        'shards': len(shards),
+        'run_id': run_id,
+        'resumed_from': resumed_from
+    }
+
+
+_checkpoints: Optional[CheckpointManager] = None
+
+
+def get_checkpoints() -> CheckpointManager:
+    """
+    Get the process-wide checkpoint manager.
+
+    The directory, interval and retention come from the CHECKPOINT_DIR
+    (default data/checkpoints), CHECKPOINT_INTERVAL (seconds, default 60) and
+    CHECKPOINT_RETENTION (default 3) environment variables.
+
+    Returns:
+        Shared CheckpointManager instance
+    """
+    global _checkpoints
+    if _checkpoints is None:
+        _checkpoints = CheckpointManager(
+            os.environ.get('CHECKPOINT_DIR', DEFAULT_CHECKPOINT_DIR),
+            interval=float(os.environ.get('CHECKPOINT_INTERVAL', 60)),
+            retention=int(os.environ.get('CHECKPOINT_RETENTION', 3))
+        )
+    return _checkpoints
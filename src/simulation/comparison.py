@@ -0,0 +1,200 @@
+"""
+Common-Random-Numbers Strategy Comparison
+
+This module runs several betting strategies on the same random outcome stream.
+Trial t uses the same uniform random number at step s under every strategy, so
+the strategies see the same sequence of wins and losses for as long as they
+bet at the same p. Their win probabilities are then strongly correlated, and
+the paired difference between two strategies has far less noise than the
+difference of two independent runs.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from src.simulation.strategy_engine import Rule, build_rules, make_params, prepare_kernel
+
+# Named strategies matching the run_with_* functions and the plain general model
+STRATEGY_PRESETS: Dict[str, Dict[str, bool]] = {
+    'general': {},
+    'credit': {'use_credit': True},
+    'dynamic_betting': {'use_dynamic_betting': True},
+    'max_bet': {'use_max_bet': True},
+    'full': {'use_credit': True, 'use_dynamic_betting': True, 'use_max_bet': True}
+}
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _splitmix64(z: np.ndarray) -> np.ndarray:
+    z = z + _GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * _MIX1
+    z = (z ^ (z >> np.uint64(27))) * _MIX2
+    return z ^ (z >> np.uint64(31))
+
+
+def counter_uniforms(seed: int, trial_ids: np.ndarray, step: int) -> np.ndarray:
+    """
+    Counter-based uniform random numbers in [0, 1).
+
+    The number for (seed, trial, step) is a hash of the three, so any strategy
+    can draw it at any time and gets the same value.
+
+    Args:
+        seed: Seed of the comparison
+        trial_ids: Trial indices
+        step: Step (bet) number within each trial
+
+    Returns:
+        Array of uniforms, one per trial id
+    """
+    with np.errstate(over='ignore'):
+        key = _splitmix64(np.uint64(seed % 2**64) ^ (trial_ids.astype(np.uint64) * _MIX2))
+        z = _splitmix64(key ^ (np.uint64(step) * _GOLDEN))
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / 2**53)
+
+
+def _interval(values: np.ndarray, trials: int) -> Dict[str, float]:
+    mean = float(values.mean())
+    std_error = float(values.std(ddof=1) / math.sqrt(trials)) if trials > 1 else 0.0
+    return {
+        'estimate': mean,
+        'std_error': std_error,
+        'ci_low': mean - 1.96 * std_error,
+        'ci_high': mean + 1.96 * std_error
+    }
+
+
+def compare_strategies(i: int, n: int, p: float, q: float, j: int,
+                       strategies: Dict[str, Sequence[Rule]], trials: int = 10000,
+                       seed: Optional[int] = None, baseline: Optional[str] = None,
+                       units: Optional[int] = None, bet_rounding: str = 'floor',
+                       win_rounding: str = 'floor') -> Dict[str, Any]:
+    """
+    Run several strategies on common random numbers and compare them.
+
+    Args:
+        i: Starting amount (dollars)
+        n: Goal amount (dollars)
+        p: Probability of winning
+        q: Payout multiplier
+        j: Initial bet size
+        strategies: Mapping of strategy name to its rules (empty for the general model)
+        trials: Number of simulations to run
+        seed: Optional seed for the common random numbers
+        baseline: Strategy the others are compared with (defaults to the first)
+        units: Keep the bankroll as whole units, this many per dollar (None for float dollars)
+        bet_rounding: Rounding policy for fractional bets in units
+        win_rounding: Rounding policy for fractional winnings in units
+
+    Returns:
+        Dict with 'strategies' (win probability and 95% interval for each) and
+        'differences' (paired difference from the baseline with its 95%
+        interval, and the variance reduction over independent runs)
+    """
+    if not strategies:
+        raise ValueError("At least one strategy is required")
+    if trials <= 1:
+        raise ValueError("Number of trials must be greater than 1")
+
+    names = list(strategies)
+    baseline = baseline if baseline is not None else names[0]
+    if baseline not in strategies:
+        raise ValueError(f"Unknown baseline strategy: {baseline}")
+
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1, np.uint64)[0])
+    params = make_params(i, n, p, q, j, units, bet_rounding, win_rounding)
+
+    def draw(trial_ids: np.ndarray, step: int) -> np.ndarray:
+        return counter_uniforms(seed, trial_ids, step)
+
+    outcomes = {}
+    for name in names:
+        ordered, kernel = prepare_kernel(strategies[name])
+        outcomes[name] = kernel(ordered, params, trials, draw).astype(np.float64)
+
+    results = {}
+    for name in names:
+        interval = _interval(outcomes[name], trials)
+        results[name] = {
+            'win_probability': interval['estimate'],
+            'broke_probability': 1 - interval['estimate'],
+            'ci_low': interval['ci_low'],
+            'ci_high': interval['ci_high']
+        }
+
+    differences = {}
+    base = outcomes[baseline]
+    for name in names:
+        if name == baseline:
+            continue
+        paired = _interval(outcomes[name] - base, trials)
+        independent_variance = outcomes[name].var(ddof=1) + base.var(ddof=1)
+        paired_variance = (outcomes[name] - base).var(ddof=1)
+        differences[name] = {
+            'difference': paired['estimate'],
+            'std_error': paired['std_error'],
+            'ci_low': paired['ci_low'],
+            'ci_high': paired['ci_high'],
+            'variance_reduction': float(independent_variance / paired_variance) if paired_variance > 0 else None
+        }
+
+    return {
+        'baseline': baseline,
+        'trials': trials,
+        'seed': seed,
+        'strategies': results,
+        'differences': differences
+    }
+
+
+def strategy_rules(spec: Union[str, Dict[str, Any]], k: Optional[int] = None,
+                   m: Optional[int] = None) -> List[Rule]:
+    """
+    Build the rules for a preset name or a dict of extension flags.
+
+    Args:
+        spec: Name in STRATEGY_PRESETS, or a dict with use_credit,
+            use_dynamic_betting and use_max_bet flags (and optionally k and m)
+        k: Credit line amount, used unless the spec sets its own
+        m: Maximum bet, used unless the spec sets its own
+
+    Returns:
+        List of rules
+    """
+    if isinstance(spec, str):
+        if spec not in STRATEGY_PRESETS:
+            raise ValueError(f"Unknown strategy: {spec}")
+        flags, k_value, m_value = STRATEGY_PRESETS[spec], k, m
+    else:
+        flags = {key: bool(spec.get(key, False)) for key in ('use_credit', 'use_dynamic_betting', 'use_max_bet')}
+        k_value, m_value = spec.get('k', k), spec.get('m', m)
+
+    if flags.get('use_credit') and k_value is None:
+        raise ValueError("Missing required parameter: k (credit line amount)")
+    if flags.get('use_max_bet') and m_value is None:
+        raise ValueError("Missing required parameter: m (maximum bet)")
+
+    return build_rules(k=k_value, m=m_value, **flags)
+
+
+def default_strategies(k: Optional[int] = None, m: Optional[int] = None) -> List[str]:
+    """
+    List the presets that can run with the given extension parameters.
+
+    Args:
+        k: Credit line amount, if given
+        m: Maximum bet, if given
+
+    Returns:
+        Names in STRATEGY_PRESETS, leaving out those that need a missing k or m
+    """
+    return [
+        name for name, flags in STRATEGY_PRESETS.items()
+        if (k is not None or not flags.get('use_credit')) and (m is not None or not flags.get('use_max_bet'))
+    ]
@@ -0,0 +1,253 @@
+"""
+Cost Model for Gambler's Ruin Simulations
+
+This module predicts how long a simulation will take before it runs:
+(a) The expected number of bets per trial comes from the analytic expected
+    duration of the walk, using the drift and variance of one bet in units of
+    the bet size (exact for the classic game, a diffusion approximation
+    otherwise); a credit line moves the lower barrier down by k
+(b) Each backend has a time per bet, so a prediction is
+    trials * bets per trial * seconds per bet; the optimal strategy solver is
+    predicted the same way from its work per sweep (see ``solver_steps``)
+(c) ``calibrate`` times every backend on a small fixed workload, so the times
+    per bet match the machine before the first request
+(d) A correction factor per workload (engine, backend and rules) is learned
+    online from observed run times, which also absorbs what the formula
+    leaves out, such as the growing bets of dynamic betting
+"""
+
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.simulation.basic_simulation import monte_carlo_simulation
+from src.simulation.general_simulation import monte_carlo_general
+from src.simulation.incremental import simulate_range
+from src.simulation.optimal_strategy import GAUSS_SEIDEL_BLOCK, solve_optimal_strategy
+from src.simulation.strategy_engine import run_strategy
+
+# Seconds per unit of work, measured on a single core with 10,000-trial
+# requests; ``calibrate`` replaces them with this machine's times
+SECONDS_PER_STEP = {
+    'python': 3e-7,          # Python loop (general model), per bet
+    'python_basic': 9e-8,    # Python loop (basic model), per bet
+    'vectorized': 3e-8,      # Strategy engine with a NumPy generator, per bet
+    'counter': 7e-8,         # Strategy engine with counter-based random numbers, per bet
+    'solver_policy': 1e-10,  # Policy iteration, per cubed state of a linear solve
+    'solver_value': 1.5e-8   # Value iteration, per (state, bet) pair of a sweep
+}
+
+# Sweeps a solve takes, fitted to measured solves; the learned corrections refine them.
+# Policy iteration needs more sweeps with more bets, until the bets span most of the
+# bankroll and a few large bets reach the goal
+POLICY_SWEEPS = 10
+POLICY_SWEEPS_PER_BET = 3
+POLICY_SWEEPS_PER_STATE_PER_BET = 0.65
+VALUE_SWEEPS_PER_STATE_PER_BET = 50
+
+# Per-sweep overhead of a Gauss-Seidel block, in (state, bet) pairs
+_BLOCK_OVERHEAD = 2000
+
+
+def expected_steps(i: float, n: float, p: float, q: float, j: float, k: float = 0,
+                   m: Optional[float] = None) -> float:
+    """
+    Expected number of bets in one trial.
+
+    Args:
+        i: Starting amount (dollars)
+        n: Goal amount (dollars)
+        p: Probability of winning
+        q: Payout multiplier
+        j: Bet size
+        k: Credit line amount
+        m: Maximum bet
+
+    Returns:
+        Expected number of bets (at least 1)
+    """
+    bet = min(j, m) if m is not None else j
+    a = (i + k) / bet
+    barrier = (n + k) / bet
+
+    # Drift and variance of the bankroll change of one bet, in bets
+    mu = p * (q - 1) - (1 - p)
+    var = p * (q - 1) ** 2 + (1 - p) - mu ** 2
+    x = 2 * mu / var
+
+    if abs(x * barrier) < 1e-6:
+        # Driftless walk: a (N - a) / variance
+        steps = a * (barrier - a) / var
+    else:
+        # Probability of reaching the goal, written to avoid overflow
+        if x > 0:
+            win = math.expm1(-x * a) / math.expm1(-x * barrier)
+        else:
+            y = -x
+            win = math.exp(y * (a - barrier)) * -math.expm1(-y * a) / -math.expm1(-y * barrier)
+        steps = (barrier * win - a) / mu
+
+    return max(steps, 1.0)
+
+
+def _sweep_work(states: int, bets: int, method: str) -> float:
+    # A linear solve per policy iteration sweep; every (state, bet) pair plus block overhead per value sweep
+    if method == 'policy':
+        return float(states) ** 3
+    return states * (bets + _BLOCK_OVERHEAD / GAUSS_SEIDEL_BLOCK)
+
+
+def solver_steps(states: int, bets: int, method: str, max_iterations: int = 10000) -> float:
+    """
+    Expected work of one optimal strategy solve, in the units of SECONDS_PER_STEP.
+
+    Args:
+        states: Number of bankroll states (n * units + 1)
+        bets: Number of candidate bets per state
+        method: 'policy' or 'value'
+        max_iterations: Maximum number of sweeps
+
+    Returns:
+        Work for backend 'solver_policy' or 'solver_value'
+    """
+    if method == 'policy':
+        sweeps = max(min(POLICY_SWEEPS_PER_BET * bets, POLICY_SWEEPS_PER_STATE_PER_BET * states / max(bets, 1)),
+                     POLICY_SWEEPS)
+    else:
+        sweeps = max(VALUE_SWEEPS_PER_STATE_PER_BET * states / max(bets, 1), 1.0)
+    return min(sweeps, max_iterations) * _sweep_work(states, bets, method)
+
+
+def _timed(run: Callable[[], Any]) -> float:
+    # Best of two runs, so a one-off pause does not skew the calibration
+    times = []
+    for _ in range(2):
+        start_time = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def calibrate() -> Dict[str, float]:
+    """
+    Measure the time per unit of work of every backend on this machine.
+
+    Each trial backend runs the fair game from 10 to 20 (100 bets per trial
+    on average) and the solver a small problem, about half a second in all.
+
+    Returns:
+        Mapping of backend to seconds per unit, like SECONDS_PER_STEP
+    """
+    steps = expected_steps(10, 20, 0.5, 2.0, 1)
+    trial_runs = {
+        'python': (2000, lambda trials: monte_carlo_general(10, 20, 0.5, 2.0, 1, trials, seed=0)),
+        'python_basic': (2000, lambda trials: monte_carlo_simulation(10, 20, trials, seed=0)),
+        'vectorized': (10000, lambda trials: run_strategy(10, 20, 0.5, 2.0, 1, trials=trials, seed=0)),
+        'counter': (10000, lambda trials: simulate_range(10, 20, 0.5, 2.0, 1, (), 0, 0, trials))
+    }
+    measured = {
+        backend: _timed(lambda: run(trials)) / (trials * steps)
+        for backend, (trials, run) in trial_runs.items()
+    }
+
+    for method, n, m in (('policy', 500, 500), ('value', 100, 10)):
+        result = {}
+        seconds = _timed(lambda: result.update(solve_optimal_strategy(n, 0.45, 2.0, 1, m, method=method)))
+        measured[f'solver_{method}'] = seconds / (result['iterations'] * _sweep_work(n + 1, m + 1, method))
+
+    return measured
+
+
+class CostModel:
+    """
+    Predicts run times and learns correction factors from observed runs.
+
+    Args:
+        learning_rate: Weight of each new observation in the running correction
+            (an exponentially weighted mean of log ratios)
+        seconds_per_step: Times per unit of work that replace the defaults in
+            SECONDS_PER_STEP, e.g. from ``calibrate``
+    """
+
+    def __init__(self, learning_rate: float = 0.2, seconds_per_step: Optional[Dict[str, float]] = None):
+        self.learning_rate = learning_rate
+        self.seconds_per_step = dict(SECONDS_PER_STEP, **(seconds_per_step or {}))
+        self._log_corrections: Dict[str, float] = {}
+        self._observations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def correction(self, workload: str) -> float:
+        """
+        Get the learned correction factor of a workload.
+
+        Args:
+            workload: Workload name, e.g. 'extended:counter:credit_line+table_limit'
+
+        Returns:
+            Factor applied to the analytic prediction (1.0 before any observation)
+        """
+        with self._lock:
+            return math.exp(self._log_corrections.get(workload, 0.0))
+
+    def estimate(self, workload: str, backend: str, trials: int, steps_per_trial: float) -> Dict[str, Any]:
+        """
+        Predict the run time of a simulation.
+
+        Args:
+            workload: Workload name whose correction factor applies
+            backend: Key of SECONDS_PER_STEP
+            trials: Number of trials that will actually run (1 for a solve)
+            steps_per_trial: Expected bets per trial (see ``expected_steps``), or
+                the work of a solve (see ``solver_steps``)
+
+        Returns:
+            Dict with workload, backend, trials, steps_per_trial,
+            correction and predicted_seconds
+        """
+        correction = self.correction(workload)
+        return {
+            'workload': workload,
+            'backend': backend,
+            'trials': trials,
+            'steps_per_trial': steps_per_trial,
+            'correction': correction,
+            'predicted_seconds': trials * steps_per_trial * self.seconds_per_step[backend] * correction
+        }
+
+    def observe(self, estimate: Dict[str, Any], seconds: float) -> None:
+        """
+        Update the correction factor of a workload from an observed run time.
+
+        Args:
+            estimate: Prediction returned by ``estimate``
+            seconds: Observed run time
+        """
+        if estimate['trials'] <= 0 or seconds <= 0:
+            return
+        baseline = estimate['predicted_seconds'] / estimate['correction']
+        if baseline <= 0:
+            return
+
+        workload = estimate['workload']
+        ratio = math.log(seconds / baseline)
+        with self._lock:
+            count = self._observations.get(workload, 0)
+            # Plain mean for the first observations, then exponential weighting
+            weight = max(self.learning_rate, 1 / (count + 1))
+            current = self._log_corrections.get(workload, 0.0)
+            self._log_corrections[workload] = current + weight * (ratio - current)
+            self._observations[workload] = count + 1
+
+    def corrections(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get every learned correction factor.
+
+        Returns:
+            Mapping of workload to its correction and number of observations
+        """
+        with self._lock:
+            return {
+                workload: {'correction': math.exp(value), 'observations': self._observations[workload]}
+                for workload, value in self._log_corrections.items()
+            }
@@ -0,0 +1,260 @@
+"""
+Distributed Trial Execution for Gambler's Ruin Simulation
+
+This module splits a simulation into shards of trials and runs them on worker
+processes (see ``src.api.worker``). Every shard gets its own seed derived from
+the request seed and the shard index, so a shard gives the same result on any
+worker and after any number of retries, and the merged win count is exact and
+reproducible.
+"""
+
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import requests
+
+from src.simulation.basic_simulation import monte_carlo_simulation
+from src.simulation.general_simulation import monte_carlo_general
+from src.simulation.strategy_engine import rule_from_spec, run_strategy
+
+
+def _run_strategy_spec(rules: Sequence[Dict] = (), **kwargs) -> Dict[str, float]:
+    return run_strategy(rules=[rule_from_spec(spec) for spec in rules], **kwargs)
+
+
+# Simulation functions a shard can run; each accepts its parameters plus trials and seed
+SHARD_FUNCTIONS = {
+    'basic': monte_carlo_simulation,
+    'general': monte_carlo_general,
+    'strategy': _run_strategy_spec
+}
+
+
+def shard_seed(seed: int, index: int) -> int:
+    """
+    Derive the seed of one shard from the request seed.
+
+    Args:
+        seed: Seed of the whole request
+        index: Shard index
+
+    Returns:
+        Independent 64-bit seed for the shard
+    """
+    return int(np.random.SeedSequence(seed, spawn_key=(index,)).generate_state(1, np.uint64)[0])
+
+
+def plan_shards(trials: int, shard_size: int) -> List[int]:
+    """
+    Split a number of trials into shards.
+
+    Args:
+        trials: Total number of trials
+        shard_size: Maximum trials per shard
+
+    Returns:
+        List of trials per shard
+    """
+    full, rest = divmod(trials, shard_size)
+    return [shard_size] * full + ([rest] if rest else [])
+
+
+def run_shard(function: str, params: Dict[str, Any], trials: int, seed: int) -> Dict[str, int]:
+    """
+    Run one shard of trials.
+
+    Args:
+        function: Name of the simulation function in SHARD_FUNCTIONS
+        params: Simulation parameters (without trials and seed)
+        trials: Number of trials in the shard
+        seed: Shard seed
+
+    Returns:
+        Dict with the number of wins and trials
+    """
+    if function not in SHARD_FUNCTIONS:
+        raise ValueError(f"Unknown simulation function: {function}")
+    result = SHARD_FUNCTIONS[function](**params, trials=trials, seed=seed)
+    return {'wins': int(result['wins']), 'trials': trials}
+
+
+class Coordinator:
+    """
+    Splits simulations across registered workers and merges their counts.
+
+    Args:
+        workers: Base URLs of the workers, e.g. 'http://10.0.0.5:6001'
+        shard_size: Maximum trials per shard
+        max_retries: Attempts per shard before the run fails
+        timeout: Per-shard request timeout in seconds
+    """
+
+    def __init__(self, workers: Sequence[str] = (), shard_size: int = 100000,
+                 max_retries: int = 3, timeout: float = 600.0):
+        self.shard_size = shard_size
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._workers: List[str] = []
+        self._failed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._cycle = None
+        for url in workers:
+            self.register(url)
+
+    def register(self, url: str) -> None:
+        """Add a worker."""
+        with self._lock:
+            url = url.rstrip('/')
+            if url not in self._workers:
+                self._workers.append(url)
+            self._failed.pop(url, None)
+            self._cycle = itertools.cycle(list(self._workers))
+
+    def unregister(self, url: str) -> None:
+        """Remove a worker."""
+        with self._lock:
+            url = url.rstrip('/')
+            if url in self._workers:
+                self._workers.remove(url)
+            self._failed.pop(url, None)
+            self._cycle = itertools.cycle(list(self._workers)) if self._workers else None
+
+    @property
+    def workers(self) -> List[str]:
+        with self._lock:
+            return list(self._workers)
+
+    def health(self) -> Dict[str, bool]:
+        """
+        Check which workers respond.
+
+        Returns:
+            Mapping of worker URL to whether it is healthy
+        """
+        status = {}
+        for url in self.workers:
+            try:
+                status[url] = requests.get(f"{url}/health", timeout=5).status_code == 200
+            except requests.RequestException:
+                status[url] = False
+        return status
+
+    def _next_worker(self, exclude: Optional[str] = None) -> str:
+        with self._lock:
+            if not self._workers:
+                raise RuntimeError("No workers registered")
+            # Prefer workers that have not failed, then the least failed ones
+            candidates = sorted(self._workers, key=lambda url: self._failed.get(url, 0))
+            best = self._failed.get(candidates[0], 0)
+            for _ in range(len(self._workers)):
+                url = next(self._cycle)
+                if url != exclude and self._failed.get(url, 0) == best:
+                    return url
+            return candidates[0]
+
+    def _run_remote(self, function: str, params: Dict[str, Any], trials: int, seed: int) -> Dict[str, int]:
+        last_error = None
+        worker = None
+        for _ in range(self.max_retries):
+            worker = self._next_worker(exclude=worker)
+            try:
+                response = requests.post(
+                    f"{worker}/shard",
+                    json={'function': function, 'params': params, 'trials': trials, 'seed': seed},
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                result = response.json()
+                if result.get('trials') != trials:
+                    raise RuntimeError(f"Worker {worker} returned {result.get('trials')} trials, expected {trials}")
+                with self._lock:
+                    self._failed.pop(worker, None)
+                return {'wins': int(result['wins']), 'trials': trials}
+            except (requests.RequestException, RuntimeError, ValueError, KeyError) as e:
+                last_error = e
+                with self._lock:
+                    self._failed[worker] = self._failed.get(worker, 0) + 1
+        raise RuntimeError(f"Shard failed after {self.max_retries} attempts: {last_error}")
+
+    def run(self, function: str, params: Dict[str, Any], trials: int, seed: int = 0,
+            checkpoints=None) -> Dict[str, Any]:
+        """
+        Run a simulation across the workers.
+
+        Args:
+            function: Name of the simulation function in SHARD_FUNCTIONS
+            params: Simulation parameters (without trials and seed); rules for
+                'strategy' are given as ``Rule.describe()`` dicts
+            trials: Total number of trials
+            seed: Seed of the whole run
+            checkpoints: Optional ``CheckpointManager``; completed shards are
+                checkpointed and a restarted coordinator resumes the run
+
+        Returns:
+            Dict with win_probability, broke_probability, wins, trials and shards
+        """
+        if function not in SHARD_FUNCTIONS:
+            raise ValueError(f"Unknown simulation function: {function}")
+        if trials <= 0:
+            raise ValueError("Number of trials must be greater than 0")
+
+        shards = plan_shards(trials, self.shard_size)
+        workers = max(1, len(self.workers))
+
+        if checkpoints is not None:
+            # Imported here because the checkpoint module builds on this one
+            from src.simulation.checkpoint import run_checkpointed
+            return run_checkpointed(function, params, trials, seed, self.shard_size, checkpoints,
+                                    runner=self._run_remote, parallelism=min(len(shards), 4 * workers))
+
+        with ThreadPoolExecutor(max_workers=min(len(shards), 4 * workers)) as pool:
+            results = list(pool.map(
+                lambda item: self._run_remote(function, params, item[1], shard_seed(seed, item[0])),
+                enumerate(shards)
+            ))
+
+        wins = sum(result['wins'] for result in results)
+        win_probability = wins / trials
+
+        return {
+            'win_probability': win_probability,
+            'broke_probability': 1 - win_probability,
+            'wins': wins,
+            'trials': trials,
+            'shards': len(shards)
+        }
+
+
+def run_local(function: str, params: Dict[str, Any], trials: int, seed: int = 0,
+              shard_size: int = 100000) -> Dict[str, Any]:
+    """
+    Run the same shards as ``Coordinator.run`` in this process.
+
+    Gives the identical result to a distributed run with the same seed and
+    shard size, which makes it the reference for checking workers.
+
+    Args:
+        function: Name of the simulation function in SHARD_FUNCTIONS
+        params: Simulation parameters (without trials and seed)
+        trials: Total number of trials
+        seed: Seed of the whole run
+        shard_size: Maximum trials per shard
+
+    Returns:
+        Dict with win_probability, broke_probability, wins, trials and shards
+    """
+    shards = plan_shards(trials, shard_size)
+    wins = sum(run_shard(function, params, size, shard_seed(seed, index))['wins']
+               for index, size in enumerate(shards))
+    win_probability = wins / trials
+
+    return {
+        'win_probability': win_probability,
+        'broke_probability': 1 - win_probability,
+        'wins': wins,
+        'trials': trials,
+        'shards': len(shards)
+    }
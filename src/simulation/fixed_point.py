@@ -0,0 +1,96 @@
+"""
+Fixed-Point Bankroll Support
+
+This module defines how the simulations keep the bankroll as a whole number of
+units (e.g. 100 units per dollar for cents) instead of a float, and how
+fractional bets and winnings are rounded to whole units:
+(a) 'floor' rounds down, so the gambler never receives a fraction of a unit
+(b) 'ceil' rounds up
+(c) 'nearest' rounds to the nearest unit, halves up
+
+A tolerance of 1e-9 units absorbs float error before rounding, so 0.29 * 100
+units rounds to 29 and not 28.
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+ROUNDING_POLICIES = ('floor', 'ceil', 'nearest')
+
+# Float error allowed before rounding, in units
+_TOLERANCE = 1e-9
+
+
+def validate_rounding(policy: str) -> str:
+    """
+    Check that a rounding policy is known.
+
+    Args:
+        policy: Rounding policy name
+
+    Returns:
+        The policy, unchanged
+    """
+    if policy not in ROUNDING_POLICIES:
+        raise ValueError(f"Rounding policy must be one of: {', '.join(ROUNDING_POLICIES)}")
+    return policy
+
+
+def validate_units(units: Optional[int]) -> Optional[int]:
+    """
+    Check a number of units per dollar (None keeps the float bankroll).
+
+    Args:
+        units: Units per dollar
+
+    Returns:
+        The units, unchanged
+    """
+    if units is not None and units < 1:
+        raise ValueError("Units per dollar must be at least 1")
+    return units
+
+
+def quantize(values: np.ndarray, policy: str) -> np.ndarray:
+    """
+    Round amounts in units to whole units.
+
+    Args:
+        values: Amounts in (possibly fractional) units
+        policy: Rounding policy
+
+    Returns:
+        int64 array of whole units
+    """
+    if policy == 'floor':
+        rounded = np.floor(values + _TOLERANCE)
+    elif policy == 'ceil':
+        rounded = np.ceil(values - _TOLERANCE)
+    elif policy == 'nearest':
+        rounded = np.floor(values + 0.5 + _TOLERANCE)
+    else:
+        raise ValueError(f"Rounding policy must be one of: {', '.join(ROUNDING_POLICIES)}")
+    # Bets that grow without bound (dynamic betting) saturate instead of overflowing
+    return np.clip(rounded, -2**62, 2**62).astype(np.int64)
+
+
+def quantize_scalar(value: float, policy: str) -> int:
+    """
+    Round one amount in units to a whole number of units.
+
+    Args:
+        value: Amount in (possibly fractional) units
+        policy: Rounding policy
+
+    Returns:
+        Whole units
+    """
+    if policy == 'floor':
+        return math.floor(value + _TOLERANCE)
+    if policy == 'ceil':
+        return math.ceil(value - _TOLERANCE)
+    if policy == 'nearest':
+        return math.floor(value + 0.5 + _TOLERANCE)
+    raise ValueError(f"Rounding policy must be one of: {', '.join(ROUNDING_POLICIES)}")
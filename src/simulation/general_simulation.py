@@ -11,12 +11,15 @@ This module extends the basic simulation with additional parameters:
 
 import random
 import numpy as np
-from typing import Dict
+from typing import Any, Dict, Optional, Sequence, Tuple
 
+from src.simulation.fixed_point import quantize_scalar, validate_rounding, validate_units
 
-def run_general_simulation(i: int, n: int, p: float, q: float, j: int) -> bool:
+
+def run_general_path(i: int, n: int, p: float, q: float, j: int, rng: Optional[random.Random] = None,
+                     units: Optional[int] = None, win_rounding: str = 'floor') -> Tuple[bool, int, int]:
     """
-    Run a single simulation of the generalized Gambler's Ruin problem.
+    Run a single simulation of the generalized Gambler's Ruin problem and count its bets.
     
     Args:
         i: Starting amount (dollars)
@@ -24,30 +27,75 @@ def run_general_simulation(i: int, n: int, p: float, q: float, j: int) -> bool:
         p: Probability of winning
         q: Payout multiplier
         j: Bet size
+        rng: Optional random number generator (defaults to the random module)
+        units: Keep the bankroll as whole units, this many per dollar (None for float dollars)
+        win_rounding: Rounding policy for fractional winnings in units
         
     Returns:
-        bool: True if the gambler wins (reaches n dollars), False if they go broke
+        Tuple of (reached goal, bets won, bets lost)
     """
+    draw = (rng or random).random
+    if units is not None:
+        # Work in whole units; bets stay whole because i and j are whole dollars
+        i, n, j = i * units, n * units, j * units
     current_amount = i
+    bets_won = 0
+    bets_lost = 0
     
     while 0 < current_amount < n:
         # Place a bet of j dollars
         bet = min(j, current_amount)  # Ensure bet is not larger than current amount
         
         # Win with probability p
-        if random.random() < p:
-            current_amount += bet * (q - 1)  # Win: get back bet plus q-1 times bet
+        if draw() < p:
+            winnings = bet * (q - 1)  # Win: get back bet plus q-1 times bet
+            if units is not None:
+                winnings = quantize_scalar(winnings, win_rounding)
+            current_amount += winnings
+            bets_won += 1
         else:
             current_amount -= bet  # Lose: lose the bet
+            bets_lost += 1
+    
+    # Report whether the gambler reached their goal
+    return current_amount >= n, bets_won, bets_lost
+
+
+def run_general_simulation(i: int, n: int, p: float, q: float, j: int, rng: Optional[random.Random] = None,
+                           units: Optional[int] = None, win_rounding: str = 'floor') -> bool:
+    """
+    Run a single simulation of the generalized Gambler's Ruin problem.
     
-    # Return True if the gambler reached their goal
-    return current_amount >= n
+    Args:
+        i: Starting amount (dollars)
+        n: Goal amount (dollars)
+        p: Probability of winning
+        q: Payout multiplier
+        j: Bet size
+        rng: Optional random number generator (defaults to the random module)
+        units: Keep the bankroll as whole units, this many per dollar (None for float dollars)
+        win_rounding: Rounding policy for fractional winnings in units
+        
+    Returns:
+        bool: True if the gambler wins (reaches n dollars), False if they go broke
+    """
+    return run_general_path(i, n, p, q, j, rng, units, win_rounding)[0]
 
 
-def monte_carlo_general(i: int, n: int, p: float, q: float, j: int, trials: int = 10000) -> Dict[str, float]:
+def monte_carlo_general(i: int, n: int, p: float, q: float, j: int, trials: int = 10000,
+                        seed: Optional[int] = None, sensitivity: bool = False,
+                        nearby_p: Optional[Sequence[float]] = None, units: Optional[int] = None,
+                        win_rounding: str = 'floor') -> Dict[str, Any]:
     """
     Run multiple simulations of the generalized Gambler's Ruin problem to estimate probabilities.
     
+    With ``sensitivity`` the same trials also give a likelihood-ratio (score
+    function) estimate of d(win_probability)/dp. A trial with W bets won and L
+    bets lost has score W/p - L/(1-p), and the mean of win * score is an
+    unbiased estimate of the derivative. Estimates at each of ``nearby_p`` come
+    from reweighting every trial by (p'/p)^W * ((1-p')/(1-p))^L; their
+    effective number of trials shows how far the reweighting can be trusted.
+    
     Args:
         i: Starting amount (dollars)
         n: Goal amount (dollars)
@@ -55,27 +103,74 @@ def monte_carlo_general(i: int, n: int, p: float, q: float, j: int, trials: int
         q: Payout multiplier
         j: Bet size
         trials: Number of simulations to run
+        seed: Optional seed for the random number generator
+        sensitivity: Also estimate the derivative with respect to p
+        nearby_p: Win probabilities to estimate by reweighting (implies sensitivity)
+        units: Keep the bankroll as whole units, this many per dollar (None for float dollars)
+        win_rounding: Rounding policy for fractional winnings in units
         
     Returns:
-        Dict with keys 'win_probability' and 'broke_probability'
+        Dict with keys 'win_probability', 'broke_probability' and 'wins',
+        plus 'sensitivity' when requested
     """
     # Validate inputs
     if i <= 0 or n <= i or p <= 0 or p >= 1 or q <= 1 or j <= 0 or trials <= 0:
         raise ValueError("Invalid input parameters. Must have 0 < i < n, 0 < p < 1, q > 1, j > 0, and trials > 0.")
     
+    nearby_p = list(nearby_p or [])
+    if any(x <= 0 or x >= 1 for x in nearby_p):
+        raise ValueError("Nearby win probabilities must be between 0 and 1 (exclusive)")
+    sensitivity = sensitivity or bool(nearby_p)
+    validate_units(units)
+    validate_rounding(win_rounding)
+    
+    rng = random.Random(seed) if seed is not None else None
     wins = 0
     
-    for _ in range(trials):
-        if run_general_simulation(i, n, p, q, j):
-            wins += 1
+    if sensitivity:
+        outcomes = np.zeros(trials)
+        bets_won = np.zeros(trials)
+        bets_lost = np.zeros(trials)
+        for t in range(trials):
+            won, bets_won[t], bets_lost[t] = run_general_path(i, n, p, q, j, rng, units, win_rounding)
+            outcomes[t] = won
+        wins = int(outcomes.sum())
+    else:
+        for _ in range(trials):
+            if run_general_simulation(i, n, p, q, j, rng, units, win_rounding):
+                wins += 1
     
     win_probability = wins / trials
     broke_probability = 1 - win_probability
     
-    return {
+    result: Dict[str, Any] = {
         'win_probability': win_probability,
-        'broke_probability': broke_probability
+        'broke_probability': broke_probability,
+        'wins': wins
     }
+    
+    if sensitivity:
+        # Likelihood-ratio derivative estimate
+        weighted = outcomes * (bets_won / p - bets_lost / (1 - p))
+        
+        # Reweight the same trials to nearby win probabilities
+        nearby = []
+        for p_new in nearby_p:
+            log_weights = bets_won * np.log(p_new / p) + bets_lost * np.log((1 - p_new) / (1 - p))
+            weights = np.exp(log_weights)
+            nearby.append({
+                'p': p_new,
+                'win_probability': float(np.mean(outcomes * weights)),
+                'effective_trials': float(weights.sum() ** 2 / np.sum(weights ** 2))
+            })
+        
+        result['sensitivity'] = {
+            'dwin_dp': float(weighted.mean()),
+            'dwin_dp_std_error': float(weighted.std(ddof=1) / np.sqrt(trials)) if trials > 1 else None,
+            'nearby': nearby
+        }
+    
+    return result
 
 
 def theoretical_win_probability(i: int, n: int, p: float) -> float:
@@ -0,0 +1,285 @@
+"""
+Incremental Precision Top-Up
+
+This module keeps the sufficient statistics of every simulated parameter set
+so that later requests only pay for the trials they add:
+(a) Each parameter set has its own counter-based random stream, in which trial
+    t always draws the same numbers, so the stream position is just the number
+    of trials simulated so far
+(b) A request for more trials runs only trials [position, trials) and merges
+    their wins into the stored counts; the merged result is exactly what one
+    run of all the trials would give
+(c) ``refine`` keeps adding trials until the standard error of the win
+    probability reaches a target
+
+The statistics (seed, trials, wins) are small JSON files, one per key. Keys
+include ``STATS_VERSION``, so a kernel change starts fresh statistics.
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from src.simulation.comparison import counter_uniforms
+from src.simulation.strategy_engine import Rule, make_params, prepare_kernel
+
+DEFAULT_STATS_DIR = os.path.join('data', 'trial_stats')
+
+# Trials simulated per kernel call, which bounds memory for large top-ups
+BATCH_SIZE = 1000000
+
+# Trials run first when refining a parameter set that has none yet
+INITIAL_TRIALS = 10000
+
+# Bumped when a change to the strategy engine kernels or to the counter-based
+# stream changes the outcome of a trial; it is part of every statistics key,
+# so trials simulated by another version are never merged with new ones
+STATS_VERSION = 1
+
+
+class TrialStatsStore:
+    """
+    Sufficient statistics of simulated trials, keyed by canonical parameters.
+
+    Args:
+        root: Directory holding one JSON file per key
+    """
+
+    def __init__(self, root: str = DEFAULT_STATS_DIR):
+        self.root = root
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, hashlib.sha256(key.encode()).hexdigest()[:32] + '.json')
+
+    def lock(self, key: str) -> threading.Lock:
+        """
+        Get the lock that serializes top-ups of one key.
+
+        Args:
+            key: Canonical parameter key
+
+        Returns:
+            Lock for the key
+        """
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the statistics of a key.
+
+        Args:
+            key: Canonical parameter key
+
+        Returns:
+            Dict with key, seed, trials and wins, or None if nothing is stored
+        """
+        try:
+            with open(self._path(key)) as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return stats if stats.get('key') == key else None
+
+    def put(self, key: str, stats: Dict[str, Any]) -> None:
+        """
+        Save the statistics of a key atomically.
+
+        Args:
+            key: Canonical parameter key
+            stats: Dict with seed, trials and wins
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(dict(stats, key=key, updated_at=time.time()), f)
+        os.replace(tmp_path, path)
+
+
+def simulate_range(i: int, n: int, p: float, q: float, j: int, rules: Sequence[Rule], seed: int,
+                   start: int, count: int, units: Optional[int] = None,
+                   bet_rounding: str = 'floor', win_rounding: str = 'floor') -> int:
+    """
+    Simulate trials [start, start + count) of a counter-based stream.
+
+    Args:
+        i: Starting amount (dollars)
+        n: Goal amount (dollars)
+        p: Probability of winning
+        q: Payout multiplier
+        j: Initial bet size
+        rules: Strategy rules (empty for the general model)
+        seed: Seed of the stream
+        start: Index of the first trial
+        count: Number of trials
+        units: Keep the bankroll as whole units, this many per dollar (None for float dollars)
+        bet_rounding: Rounding policy for fractional bets in units
+        win_rounding: Rounding policy for fractional winnings in units
+
+    Returns:
+        Number of wins
+    """
+    params = make_params(i, n, p, q, j, units, bet_rounding, win_rounding)
+    ordered, kernel = prepare_kernel(rules)
+
+    wins = 0
+    for offset in range(start, start + count, BATCH_SIZE):
+        size = min(BATCH_SIZE, start + count - offset)
+        outcomes = kernel(ordered, params, size,
+                          lambda trial_ids, step: counter_uniforms(seed, trial_ids + offset, step))
+        wins += int(outcomes.sum())
+    return wins
+
+
+def new_seed() -> int:
+    """
+    Draw a fresh seed for a random stream.
+
+    Returns:
+        Non-negative seed below 2**63, so it fits the experiment store's seed column
+    """
+    return int(np.random.SeedSequence().generate_state(1, np.uint64)[0] >> np.uint64(1))
+
+
+def _std_error(wins: int, trials: int) -> float:
+    # Agresti-Coull estimate, so that 0 or all wins do not claim zero error
+    estimate = (wins + 2) / (trials + 4)
+    return math.sqrt(estimate * (1 - estimate) / (trials + 4))
+
+
+def _result(stats: Dict[str, Any], added: int) -> Dict[str, Any]:
+    win_probability = stats['wins'] / stats['trials']
+    return {
+        'win_probability': win_probability,
+        'broke_probability': 1 - win_probability,
+        'trials': stats['trials'],
+        'trials_added': added,
+        'std_error': _std_error(stats['wins'], stats['trials']),
+        'seed': stats['seed']
+    }
+
+
+def top_up(key: str, i: int, n: int, p: float, q: float, j: int, rules: Sequence[Rule] = (),
+           trials: int = 10000, units: Optional[int] = None, bet_rounding: str = 'floor',
+           win_rounding: str = 'floor', store: Optional[TrialStatsStore] = None) -> Dict[str, Any]:
+    """
+    Estimate win probabilities with at least ``trials`` trials, reusing stored ones.
+
+    Args:
+        key: Canonical key of the parameters (everything except trials)
+        i: Starting amount (dollars)
+        n: Goal amount (dollars)
+        p: Probability of winning
+        q: Payout multiplier
+        j: Initial bet size
+        rules: Strategy rules (empty for the general model)
+        trials: Minimum number of trials
+        units: Keep the bankroll as whole units, this many per dollar (None for float dollars)
+        bet_rounding: Rounding policy for fractional bets in units
+        win_rounding: Rounding policy for fractional winnings in units
+        store: Statistics store (defaults to ``get_stats_store()``)
+
+    Returns:
+        Dict with win_probability, broke_probability, trials (all trials the
+        estimate uses, which may exceed the request), trials_added, std_error
+        and the seed of the parameter set's stream
+    """
+    if trials <= 0:
+        raise ValueError("Number of trials must be greater than 0")
+
+    store = store or get_stats_store()
+    with store.lock(key):
+        stats = store.get(key)
+        if stats is None:
+            stats = {'seed': new_seed(), 'trials': 0, 'wins': 0}
+
+        added = max(0, trials - stats['trials'])
+        if added:
+            stats['wins'] += simulate_range(i, n, p, q, j, rules, stats['seed'], stats['trials'], added,
+                                            units, bet_rounding, win_rounding)
+            stats['trials'] += added
+            store.put(key, stats)
+
+    return _result(stats, added)
+
+
+def refine(key: str, i: int, n: int, p: float, q: float, j: int, rules: Sequence[Rule] = (),
+           target_std_error: float = 0.001, max_trials: int = 1000000, units: Optional[int] = None,
+           bet_rounding: str = 'floor', win_rounding: str = 'floor',
+           store: Optional[TrialStatsStore] = None) -> Dict[str, Any]:
+    """
+    Add trials to a stored estimate until its standard error reaches a target.
+
+    Each round sizes the next top-up from the current estimate, so a
+    parameter set that is already precise enough costs nothing.
+
+    Args:
+        key: Canonical key of the parameters (everything except trials)
+        i: Starting amount (dollars)
+        n: Goal amount (dollars)
+        p: Probability of winning
+        q: Payout multiplier
+        j: Initial bet size
+        rules: Strategy rules (empty for the general model)
+        target_std_error: Standard error of the win probability to reach
+        max_trials: Stop once the estimate uses this many trials
+        units: Keep the bankroll as whole units, this many per dollar (None for float dollars)
+        bet_rounding: Rounding policy for fractional bets in units
+        win_rounding: Rounding policy for fractional winnings in units
+        store: Statistics store (defaults to ``get_stats_store()``)
+
+    Returns:
+        Dict as ``top_up`` (trials_added counts every round), plus target_met
+    """
+    if target_std_error <= 0:
+        raise ValueError("Target standard error must be greater than 0")
+    if max_trials <= 0:
+        raise ValueError("Maximum number of trials must be greater than 0")
+
+    store = store or get_stats_store()
+    args = dict(i=i, n=n, p=p, q=q, j=j, rules=rules, units=units,
+                bet_rounding=bet_rounding, win_rounding=win_rounding, store=store)
+
+    stats = store.get(key)
+    trials = stats['trials'] if stats else 0
+    result = top_up(key, trials=max(trials, min(INITIAL_TRIALS, max_trials)), **args)
+    added = result['trials_added']
+
+    while result['std_error'] > target_std_error and result['trials'] < max_trials:
+        # Trials needed at the current estimate, with 10% headroom
+        variance = result['std_error'] ** 2 * result['trials']
+        needed = math.ceil(1.1 * variance / target_std_error ** 2)
+        trials = min(max(needed, result['trials'] + 1), max_trials)
+        result = top_up(key, trials=trials, **args)
+        added += result['trials_added']
+
+    result['trials_added'] = added
+    result['target_met'] = result['std_error'] <= target_std_error
+    return result
+
+
+_stats_store: Optional[TrialStatsStore] = None
+
+
+def get_stats_store() -> TrialStatsStore:
+    """
+    Get the process-wide trial statistics store.
+
+    The location is taken from the TRIAL_STATS_DIR environment variable.
+
+    Returns:
+        The shared TrialStatsStore
+    """
+    global _stats_store
+    if _stats_store is None:
+        _stats_store = TrialStatsStore(os.environ.get('TRIAL_STATS_DIR', DEFAULT_STATS_DIR))
+    return _stats_store
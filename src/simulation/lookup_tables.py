@@ -0,0 +1,305 @@
+"""
+Precomputed Win-Probability Lookup Tables
+
+This module builds win-probability tables for the generalized Gambler's Ruin
+problem over a grid of (p, q, j, n) offline, stores them as .npy files and
+serves them from memory-mapped arrays. Grid points are answered by lookup and
+points between grid values of p and q by bilinear interpolation. Because the
+win probability is non-decreasing in both p and q, the true value lies between
+the smallest and largest surrounding grid values, which gives the error bound.
+
+Build a table with:
+    python -m src.simulation.lookup_tables --out data/tables
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.simulation.strategy_engine import run_strategy
+
+DEFAULT_TABLE_DIR = os.path.join('data', 'tables')
+
+DEFAULT_P_VALUES = [round(x, 2) for x in np.arange(0.30, 0.701, 0.01)]
+DEFAULT_Q_VALUES = [2.0, 3.0]
+DEFAULT_J_VALUES = [1, 2, 5, 10]
+DEFAULT_N_VALUES = [10, 20, 50, 100, 200, 500, 1000, 2000]
+
+# Bumped when a change to the model (``solve_win_probabilities`` or the
+# strategy engine used for Monte Carlo points) changes the table values;
+# tables built with another version are reported as stale
+MODEL_VERSION = 1
+
+
+def solve_win_probabilities(n: int, p: float, q: float, j: int) -> Optional[np.ndarray]:
+    """
+    Solve exactly for the win probability from every starting amount.
+
+    The bankroll stays on whole dollars when every possible bet (1 to j
+    dollars) wins a whole number of dollars; the absorption probabilities of
+    that Markov chain are then found with one linear solve.
+
+    Args:
+        n: Goal amount (dollars)
+        p: Probability of winning
+        q: Payout multiplier
+        j: Bet size
+
+    Returns:
+        Array of length n + 1 indexed by starting amount, or None if the
+        bankroll leaves the whole-dollar lattice
+    """
+    gains = np.arange(1, j + 1) * (q - 1)
+    if not np.allclose(gains, np.round(gains), rtol=0, atol=1e-9):
+        return None
+
+    states = np.arange(1, n)
+    bets = np.minimum(j, states)
+    up = np.minimum(states + np.round(bets * (q - 1)).astype(np.int64), n)
+    down = states - bets
+
+    matrix = np.eye(n + 1)
+    rows = states
+    np.add.at(matrix, (rows, up), -p)
+    np.add.at(matrix, (rows, down), -(1 - p))
+    rhs = np.zeros(n + 1)
+    rhs[n] = 1.0
+
+    return np.clip(np.linalg.solve(matrix, rhs), 0.0, 1.0)
+
+
+def build_tables(out_dir: str = DEFAULT_TABLE_DIR, p_values: Sequence[float] = DEFAULT_P_VALUES,
+                 q_values: Sequence[float] = DEFAULT_Q_VALUES, j_values: Sequence[int] = DEFAULT_J_VALUES,
+                 n_values: Sequence[int] = DEFAULT_N_VALUES, mc_trials: int = 0,
+                 seed: Optional[int] = None) -> Dict:
+    """
+    Build win-probability tables over a parameter grid and write them to disk.
+
+    Grid points that stay on the whole-dollar lattice are solved exactly. Other
+    points are estimated by Monte Carlo with ``mc_trials`` trials per starting
+    amount, or left uncovered (NaN) when ``mc_trials`` is 0.
+
+    Args:
+        out_dir: Directory to write the tables to
+        p_values: Win probabilities of the grid
+        q_values: Payout multipliers of the grid
+        j_values: Bet sizes of the grid
+        n_values: Goal amounts of the grid
+        mc_trials: Monte Carlo trials per starting amount for off-lattice points
+        seed: Optional seed for the Monte Carlo estimates
+
+    Returns:
+        Table metadata
+    """
+    p_values, q_values = sorted(p_values), sorted(q_values)
+    j_values, n_values = sorted(j_values), sorted(n_values)
+    n_max = n_values[-1]
+
+    shape = (len(p_values), len(q_values), len(j_values), len(n_values), n_max + 1)
+    win = np.full(shape, np.nan)
+    std_error = np.full(shape, np.nan)
+    rng = np.random.default_rng(seed)
+
+    for a, p in enumerate(p_values):
+        for b, q in enumerate(q_values):
+            for c, j in enumerate(j_values):
+                for d, n in enumerate(n_values):
+                    exact = solve_win_probabilities(n, p, q, j)
+                    if exact is not None:
+                        win[a, b, c, d, :n + 1] = exact
+                        std_error[a, b, c, d, :n + 1] = 0.0
+                    elif mc_trials > 0:
+                        win[a, b, c, d, 0], win[a, b, c, d, n] = 0.0, 1.0
+                        std_error[a, b, c, d, [0, n]] = 0.0
+                        for i in range(1, n):
+                            estimate = run_strategy(i, n, p, q, j, trials=mc_trials,
+                                                    seed=int(rng.integers(2**63)))['win_probability']
+                            win[a, b, c, d, i] = estimate
+                            std_error[a, b, c, d, i] = np.sqrt(estimate * (1 - estimate) / mc_trials)
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, 'win_probability.npy'), win)
+    np.save(os.path.join(out_dir, 'std_error.npy'), std_error)
+
+    metadata = {
+        'built_at': time.time(),
+        'model_version': MODEL_VERSION,
+        'mc_trials': mc_trials,
+        'p_values': list(p_values),
+        'q_values': list(q_values),
+        'j_values': list(j_values),
+        'n_values': list(n_values)
+    }
+    with open(os.path.join(out_dir, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    return metadata
+
+
+class WinProbabilityTable:
+    """
+    Memory-mapped win-probability tables produced by ``build_tables``.
+
+    Args:
+        table_dir: Directory holding the .npy files and metadata.json
+    """
+
+    def __init__(self, table_dir: str = DEFAULT_TABLE_DIR):
+        self.table_dir = table_dir
+        with open(os.path.join(table_dir, 'metadata.json')) as f:
+            self.metadata = json.load(f)
+
+        self.win = np.load(os.path.join(table_dir, 'win_probability.npy'), mmap_mode='r')
+        self.std_error = np.load(os.path.join(table_dir, 'std_error.npy'), mmap_mode='r')
+        self.p_values = np.array(self.metadata['p_values'])
+        self.q_values = np.array(self.metadata['q_values'])
+        self._j_index = {j: c for c, j in enumerate(self.metadata['j_values'])}
+        self._n_index = {n: d for d, n in enumerate(self.metadata['n_values'])}
+
+    @staticmethod
+    def _bracket(grid: np.ndarray, value: float) -> Optional[List[tuple]]:
+        """Return (index, weight) pairs of the grid values surrounding value."""
+        pos = int(np.searchsorted(grid, value))
+        if pos < grid.size and np.isclose(grid[pos], value, rtol=0, atol=1e-12):
+            return [(pos, 1.0)]
+        if pos == 0 or pos == grid.size:
+            return None
+        low, high = grid[pos - 1], grid[pos]
+        weight = (value - low) / (high - low)
+        return [(pos - 1, 1.0 - weight), (pos, weight)]
+
+    def lookup(self, i: int, n: int, p: float, q: float, j: int) -> Optional[Dict[str, float]]:
+        """
+        Look up or interpolate the win probability.
+
+        Args:
+            i: Starting amount (dollars)
+            n: Goal amount (dollars)
+            p: Probability of winning
+            q: Payout multiplier
+            j: Bet size
+
+        Returns:
+            Dict with win_probability, broke_probability, error_bound and
+            exact_grid_point, or None if the point is not covered
+        """
+        if n not in self._n_index or j not in self._j_index or not 0 <= i <= n:
+            return None
+
+        p_bracket = self._bracket(self.p_values, p)
+        q_bracket = self._bracket(self.q_values, q)
+        if p_bracket is None or q_bracket is None:
+            return None
+
+        c, d = self._j_index[j], self._n_index[n]
+        values, errors, weights = [], [], []
+        for a, wp in p_bracket:
+            for b, wq in q_bracket:
+                values.append(self.win[a, b, c, d, i])
+                errors.append(self.std_error[a, b, c, d, i])
+                weights.append(wp * wq)
+
+        values, errors = np.array(values), np.array(errors)
+        if np.isnan(values).any():
+            return None
+
+        win_probability = float(np.dot(weights, values))
+        # Monotone in p and q: the true value lies within the corner values
+        interpolation_error = max(values.max() - win_probability, win_probability - values.min())
+        error_bound = float(interpolation_error + 1.96 * errors.max())
+
+        return {
+            'win_probability': win_probability,
+            'broke_probability': 1 - win_probability,
+            'error_bound': error_bound,
+            'exact_grid_point': len(values) == 1
+        }
+
+    def status(self, max_age: Optional[float] = None) -> Dict:
+        """
+        Report table coverage and staleness.
+
+        Args:
+            max_age: Age in seconds after which the table counts as stale
+
+        Returns:
+            Dict describing the grid, coverage and staleness
+        """
+        covered = 0
+        total = 0
+        for d, n in enumerate(self.metadata['n_values']):
+            block = self.win[..., d, 1:n]
+            covered += int(np.count_nonzero(~np.isnan(block)))
+            total += block.size
+
+        age = time.time() - self.metadata['built_at']
+        outdated_model = self.metadata['model_version'] != MODEL_VERSION
+
+        return {
+            'table_dir': self.table_dir,
+            'grid': {key: self.metadata[key] for key in ('p_values', 'q_values', 'j_values', 'n_values')},
+            'mc_trials': self.metadata['mc_trials'],
+            'coverage': covered / total if total else 0.0,
+            'built_at': self.metadata['built_at'],
+            'age_seconds': age,
+            'model_version': self.metadata['model_version'],
+            'outdated_model': outdated_model,
+            'stale': outdated_model or (max_age is not None and age > max_age)
+        }
+
+
+_table: Optional[WinProbabilityTable] = None
+
+
+def get_table() -> Optional[WinProbabilityTable]:
+    """
+    Get the process-wide lookup table, memory-mapping it on first use.
+
+    The location is taken from the WIN_TABLE_DIR environment variable.
+
+    Returns:
+        The shared WinProbabilityTable, or None if no table has been built
+    """
+    global _table
+    if _table is None:
+        table_dir = os.environ.get('WIN_TABLE_DIR', DEFAULT_TABLE_DIR)
+        if os.path.exists(os.path.join(table_dir, 'metadata.json')):
+            _table = WinProbabilityTable(table_dir)
+    return _table
+
+
+def _parse_values(text: str, cast=float) -> List:
+    """Parse a comma-separated list or a start:stop:step range."""
+    if ':' in text:
+        start, stop, step = (float(part) for part in text.split(':'))
+        return [cast(round(x, 10)) for x in np.arange(start, stop + step / 2, step)]
+    return [cast(part) for part in text.split(',')]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build win-probability lookup tables")
+    parser.add_argument('--out', default=DEFAULT_TABLE_DIR, help="Output directory")
+    parser.add_argument('--p', default='0.30:0.70:0.01', help="Win probabilities, list or start:stop:step")
+    parser.add_argument('--q', default='2,3', help="Payout multipliers")
+    parser.add_argument('--j', default='1,2,5,10', help="Bet sizes")
+    parser.add_argument('--n', default='10,20,50,100,200,500,1000,2000', help="Goal amounts")
+    parser.add_argument('--mc-trials', type=int, default=0, help="Monte Carlo trials for off-lattice points")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for Monte Carlo estimates")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    metadata = build_tables(
+        out_dir=args.out,
+        p_values=_parse_values(args.p),
+        q_values=_parse_values(args.q),
+        j_values=_parse_values(args.j, int),
+        n_values=_parse_values(args.n, int),
+        mc_trials=args.mc_trials,
+        seed=args.seed
+    )
+    print(f"Built tables in {time.time() - start_time:.1f}s -> {args.out}")
+    print(json.dumps(WinProbabilityTable(args.out).status(), indent=2))
@@ -0,0 +1,173 @@
+"""
+Optimal Betting Strategy Solver
+
+This module finds the bet that maximizes the probability of reaching the goal
+from every bankroll in the generalized Gambler's Ruin problem with a house
+maximum bet:
+(a) Bets are multiples of the bet granularity j, up to the maximum bet m
+(b) With less than one unit of j (or m below j) the gambler bets min(j, m, amount), as in the general model
+(c) A winning bet b returns b * (q - 1)
+
+The bankroll states are whole dollars 0..n, or whole units with a fixed-point
+bankroll where fractional winnings are rounded by policy. Each sweep evaluates
+every (state, bet) pair at once with NumPy. Policy iteration (the default)
+evaluates each policy exactly with one linear solve and usually converges in a
+handful of sweeps. Value iteration runs bounded Gauss-Seidel sweeps that update
+the values in place, block by block from the goal down, so each block already
+sees the new values of the states above it; the reported win probabilities are
+those of the extracted policy, solved exactly.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.simulation.fixed_point import quantize, validate_rounding, validate_units
+
+# States updated together in one vectorized step of a Gauss-Seidel sweep
+GAUSS_SEIDEL_BLOCK = 32
+
+
+def _candidate_bets(n: int, q: float, j: int, m: int, win_rounding: Optional[str] = None):
+    """
+    Build the (bet, state) tables of allowed bets and their successor states.
+
+    Without ``win_rounding`` every allowed bet must win a whole number of
+    units; with it, fractional winnings are rounded by that policy.
+
+    Returns:
+        Tuple (bets, up, down, valid) of arrays with shape (number of bets, n + 1)
+    """
+    states = np.arange(n + 1)
+    multiples = np.arange(j, min(m, n) + 1, j)
+    fallback = np.minimum(min(j, m), states)
+
+    # Row 0 is the general model's bet, used where no multiple of j is allowed
+    bets = np.vstack([fallback, np.broadcast_to(multiples[:, None], (multiples.size, n + 1))])
+    valid = (bets <= states) & (bets > 0)
+    valid[0] &= ~((multiples[:, None] <= states).any(axis=0) if multiples.size else np.zeros(n + 1, bool))
+    valid[:, 0] = False
+    valid[:, n] = False
+
+    gains = bets * (q - 1)
+    if win_rounding is not None:
+        gains = quantize(gains, win_rounding)
+    elif not np.allclose(gains[valid], np.round(gains[valid]), rtol=0, atol=1e-9):
+        raise ValueError("Every allowed bet must win a whole number of dollars (bet * (q - 1) must be an integer); "
+                         "use a fixed-point bankroll (units) to round fractional winnings")
+
+    up = np.minimum(states + np.round(gains).astype(np.int64), n)
+    down = np.maximum(states - bets, 0)
+    return bets, up, down, valid
+
+
+def _evaluate(policy: np.ndarray, up: np.ndarray, down: np.ndarray, p: float, n: int) -> np.ndarray:
+    """Solve exactly for the win probability of a fixed policy (row index per state)."""
+    states = np.arange(1, n)
+    rows = policy[states]
+    matrix = np.eye(n + 1)
+    np.add.at(matrix, (states, up[rows, states]), -p)
+    np.add.at(matrix, (states, down[rows, states]), -(1 - p))
+    rhs = np.zeros(n + 1)
+    rhs[n] = 1.0
+    return np.clip(np.linalg.solve(matrix, rhs), 0.0, 1.0)
+
+
+def solve_optimal_strategy(n: int, p: float, q: float, j: int, m: Optional[int] = None,
+                           method: str = 'policy', tol: float = 1e-10,
+                           max_iterations: int = 10000, units: Optional[int] = None,
+                           win_rounding: str = 'floor') -> Dict[str, Any]:
+    """
+    Find the optimal bet at every bankroll.
+
+    Ties are broken towards the smallest bet, and a bet is only changed when it
+    improves the win probability by more than ``tol``.
+
+    Args:
+        n: Goal amount (dollars)
+        p: Probability of winning
+        q: Payout multiplier
+        j: Bet granularity (dollars)
+        m: Maximum bet (defaults to no limit)
+        method: 'policy' for policy iteration or 'value' for value iteration
+        tol: Convergence tolerance
+        max_iterations: Maximum number of sweeps
+        units: Solve over a fixed-point bankroll with this many units per dollar
+        win_rounding: Rounding policy for fractional winnings in units
+
+    Returns:
+        Dict with NumPy arrays win_probability (per bankroll state), policy
+        (bet in dollars per state, 0 at the absorbing states) and
+        baseline_win_probability (the general model's fixed bet of min(j, m)),
+        plus units, iterations and converged. States are whole dollars 0..n, or whole units 0..n * units
+        with a fixed-point bankroll.
+    """
+    if n < 2 or p <= 0 or p >= 1 or q <= 1 or j <= 0:
+        raise ValueError("Invalid input parameters. Must have n >= 2, 0 < p < 1, q > 1 and j > 0.")
+    if m is None:
+        m = n
+    if m <= 0:
+        raise ValueError("Maximum bet (m) must be greater than 0")
+    if method not in ('policy', 'value'):
+        raise ValueError("Method must be 'policy' or 'value'")
+    validate_units(units)
+    validate_rounding(win_rounding)
+
+    scale = units or 1
+    n, j, m = n * scale, j * scale, m * scale
+    bets, up, down, valid = _candidate_bets(n, q, j, m, win_rounding if units is not None else None)
+    states = np.arange(n + 1)
+
+    # Start from the general model's bet: the fallback row or the first multiple of j
+    policy = np.where(valid[0], 0, 1 if bets.shape[0] > 1 else 0)
+    baseline = _evaluate(policy, up, down, p, n)
+
+    def action_values(values: np.ndarray) -> np.ndarray:
+        candidates = p * values[up] + (1 - p) * values[down]
+        return np.where(valid, candidates, -np.inf)
+
+    converged = False
+    if method == 'policy':
+        values = baseline
+        for iteration in range(1, max_iterations + 1):
+            candidates = action_values(values)
+            best = candidates.argmax(axis=0)
+            current = candidates[policy, states]
+            improve = candidates[best, states] > current + tol
+            if not improve[1:n].any():
+                converged = True
+                break
+            policy = np.where(improve, best, policy)
+            values = _evaluate(policy, up, down, p, n)
+    else:
+        values = np.zeros(n + 1)
+        values[n] = 1.0
+        blocks = [np.arange(max(1, top - GAUSS_SEIDEL_BLOCK), top) for top in range(n, 1, -GAUSS_SEIDEL_BLOCK)]
+        for iteration in range(1, max_iterations + 1):
+            delta = 0.0
+            for block in blocks:
+                candidates = p * values[up[:, block]] + (1 - p) * values[down[:, block]]
+                new_values = np.where(valid[:, block], candidates, -np.inf).max(axis=0)
+                delta = max(delta, float(np.abs(new_values - values[block]).max()))
+                values[block] = new_values
+            if delta < tol:
+                converged = True
+                break
+        # Smallest bet within tolerance of the best one, then its exact win probabilities
+        candidates = action_values(values)
+        ordered = np.where(valid, bets, np.iinfo(np.int64).max)
+        near_best = candidates >= candidates.max(axis=0) - tol
+        policy = np.where(near_best, ordered, np.iinfo(np.int64).max).argmin(axis=0)
+        values = _evaluate(policy, up, down, p, n)
+
+    optimal_bets = bets[policy, states]
+    optimal_bets[0] = optimal_bets[n] = 0
+
+    return {
+        'win_probability': values,
+        'policy': optimal_bets.astype(np.int64) if units is None else optimal_bets / scale,
+        'units': units,
+        'baseline_win_probability': baseline,
+        'iterations': iteration,
+        'converged': converged
+    }
@@ -0,0 +1,399 @@
+"""
+Composable Strategy Engine for the Extended Gambler's Ruin (Problem 3)
+
+This module expresses the realistic extensions as a pipeline of betting rules:
+(a) CreditLine: the gambler may borrow up to k dollars once they hit 0
+(b) BetProgression: the bet grows by a factor of 1/p after each loss
+(c) TableLimit: the house caps every bet at m dollars
+
+Any combination of rules is compiled into one specialized kernel that advances
+every trial at once with NumPy, so each combination runs the same vectorized
+loop instead of a hand-written copy of it.
+
+With ``units`` the bankroll is kept as whole units in int64 arrays (see
+``fixed_point``); the kernel then works in units, and rules scale their dollar
+parameters by ``params['scale']``.
+"""
+
+import functools
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+from src.simulation.fixed_point import quantize, validate_rounding, validate_units
+
+State = Dict[str, np.ndarray]
+Draw = Callable[[np.ndarray, int], np.ndarray]
+
+# Registry of available rules, keyed by rule name
+RULES: Dict[str, Type['Rule']] = {}
+
+
+def register_rule(cls: Type['Rule']) -> Type['Rule']:
+    """
+    Class decorator that makes a rule available by name.
+
+    Args:
+        cls: Rule subclass to register
+
+    Returns:
+        The rule class, unchanged
+    """
+    RULES[cls.name] = cls
+    return cls
+
+
+class Rule:
+    """
+    A single step of the betting pipeline.
+
+    Rules run in ascending ``order``. Subclasses override only the hooks they
+    need; the kernel compiler leaves out hooks that are not overridden. At most
+    one rule in a pipeline may set ``funding`` and replace the way bets are paid
+    for (see ``CashFunding``).
+    """
+
+    name = 'rule'
+    order = 100
+    funding = False
+
+    def init_state(self, state: State, params: Dict) -> None:
+        """Add the per-trial state arrays this rule needs."""
+
+    def stake(self, state: State, bet: np.ndarray, params: Dict) -> np.ndarray:
+        """Adjust the desired bet before it is funded."""
+        return bet
+
+    def settle(self, state: State, won: np.ndarray, params: Dict) -> None:
+        """Update rule state once the outcome of each bet is known."""
+
+    def describe(self) -> Dict:
+        """Return the rule name and its parameters."""
+        return {'rule': self.name}
+
+
+class CashFunding(Rule):
+    """
+    Default funding: bets are paid from the current amount only, and a trial
+    ends once it has 0 dollars or reaches the goal.
+    """
+
+    name = 'cash'
+    funding = True
+
+    def alive(self, state: State, params: Dict) -> np.ndarray:
+        amount = state['amount']
+        return (amount > 0) & (amount < params['n'])
+
+    def fund(self, state: State, bet: np.ndarray, params: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the actual bet and the part of it paid from the current amount."""
+        actual = np.minimum(bet, state['amount'])
+        return actual, actual
+
+    def collect(self, state: State, winnings: np.ndarray, won: np.ndarray, params: Dict) -> np.ndarray:
+        """Return the winnings that are added to the current amount."""
+        return winnings
+
+    def reached_goal(self, state: State, params: Dict) -> np.ndarray:
+        return state['amount'] >= params['n']
+
+
+@register_rule
+class CreditLine(CashFunding):
+    """Line of credit up to k dollars, used once the gambler hits 0."""
+
+    name = 'credit'
+
+    def __init__(self, k: int):
+        if k <= 0:
+            raise ValueError("Credit line amount (k) must be greater than 0")
+        self.k = k
+
+    def init_state(self, state: State, params: Dict) -> None:
+        state['credit'] = np.zeros_like(state['amount'])
+
+    def alive(self, state: State, params: Dict) -> np.ndarray:
+        amount, credit = state['amount'], state['credit']
+        k = self.k * params['scale']
+        return (
+            (amount + credit < params['n'])
+            & (credit <= k)
+            # With no funds left the gambler needs unused credit to keep playing
+            & ((amount > 0) | (credit < k))
+        )
+
+    def fund(self, state: State, bet: np.ndarray, params: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        amount, credit = state['amount'], state['credit']
+        has_cash = amount > 0
+        actual = np.where(has_cash, np.minimum(bet, amount), np.minimum(bet, self.k * params['scale'] - credit))
+        borrowed = np.where(has_cash, 0, actual)
+        state['credit'] = credit + borrowed
+        return actual, actual - borrowed
+
+    def collect(self, state: State, winnings: np.ndarray, won: np.ndarray, params: Dict) -> np.ndarray:
+        # Pay back credit first if any is used
+        credit = state['credit']
+        repayment = np.where(won, np.minimum(winnings, credit), 0)
+        state['credit'] = credit - repayment
+        return winnings - repayment
+
+    def reached_goal(self, state: State, params: Dict) -> np.ndarray:
+        return state['amount'] + state['credit'] >= params['n']
+
+    def describe(self) -> Dict:
+        return {'rule': self.name, 'k': self.k}
+
+
+@register_rule
+class BetProgression(Rule):
+    """Multiply the bet by ``factor`` (1/p by default) for each consecutive loss."""
+
+    name = 'progression'
+    order = 10
+
+    def __init__(self, factor: Optional[float] = None):
+        if factor is not None and factor <= 0:
+            raise ValueError("Bet progression factor must be greater than 0")
+        self.factor = factor
+
+    def init_state(self, state: State, params: Dict) -> None:
+        state['streak'] = np.zeros(state['amount'].size, dtype=np.int64)
+
+    def stake(self, state: State, bet: np.ndarray, params: Dict) -> np.ndarray:
+        factor = self.factor if self.factor is not None else 1 / params['p']
+        with np.errstate(over='ignore'):
+            return bet * np.power(factor, state['streak'])
+
+    def settle(self, state: State, won: np.ndarray, params: Dict) -> None:
+        state['streak'] = np.where(won, 0, state['streak'] + 1)
+
+    def describe(self) -> Dict:
+        return {'rule': self.name, 'factor': self.factor}
+
+
+@register_rule
+class TableLimit(Rule):
+    """House maximum of m dollars per bet."""
+
+    name = 'table_limit'
+    order = 20
+
+    def __init__(self, m: int):
+        if m <= 0:
+            raise ValueError("Maximum bet (m) must be greater than 0")
+        self.m = m
+
+    def stake(self, state: State, bet: np.ndarray, params: Dict) -> np.ndarray:
+        return np.minimum(bet, self.m * params['scale'])
+
+    def describe(self) -> Dict:
+        return {'rule': self.name, 'm': self.m}
+
+
+def rule_from_spec(spec: Dict) -> Rule:
+    """
+    Rebuild a rule from the dict returned by ``Rule.describe``.
+
+    Args:
+        spec: Dict with the rule name under 'rule' and its parameters
+
+    Returns:
+        Rule instance
+    """
+    spec = dict(spec)
+    name = spec.pop('rule', None)
+    if name not in RULES:
+        raise ValueError(f"Unknown rule: {name}")
+    return RULES[name](**spec)
+
+
+def _overrides(cls: Type[Rule], hook: str) -> bool:
+    return getattr(cls, hook) is not getattr(Rule, hook)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_kernel(rule_types: Tuple[Type[Rule], ...]) -> Callable:
+    """
+    Build the vectorized kernel for one combination of rule types.
+
+    The kernel only contains the hooks that the given rules actually override,
+    and kernels are cached so each combination is compiled once.
+
+    Args:
+        rule_types: Rule classes in pipeline order
+
+    Returns:
+        Function ``kernel(rules, params, trials, draw)`` returning a boolean array
+        with the outcome of every trial. ``draw(trial_ids, step)`` returns one
+        uniform random number for each active trial at that step.
+    """
+    funders = [pos for pos, cls in enumerate(rule_types) if cls.funding]
+    if len(funders) > 1:
+        raise ValueError("At most one funding rule (e.g. a credit line) can be used")
+
+    funder_pos = funders[0] if funders else None
+    init_pos = [pos for pos, cls in enumerate(rule_types) if _overrides(cls, 'init_state')]
+    stake_pos = [pos for pos, cls in enumerate(rule_types) if _overrides(cls, 'stake')]
+    settle_pos = [pos for pos, cls in enumerate(rule_types) if _overrides(cls, 'settle')]
+
+    def kernel(rules: Sequence[Rule], params: Dict, trials: int, draw: Draw) -> np.ndarray:
+        funder = rules[funder_pos] if funder_pos is not None else CashFunding()
+        stakers = [rules[pos] for pos in stake_pos]
+        settlers = [rules[pos] for pos in settle_pos]
+
+        fixed = params.get('units') is not None
+        dtype = np.int64 if fixed else np.float64
+        state = {'amount': np.full(trials, params['i'], dtype=dtype), 'trial': np.arange(trials)}
+        for pos in init_pos:
+            rules[pos].init_state(state, params)
+
+        p = params['p']
+        gain = params['q'] - 1
+        outcomes = np.zeros(trials, dtype=bool)
+        step = 0
+
+        while True:
+            # Retire finished trials and compact the state to the active ones
+            alive = funder.alive(state, params)
+            if not alive.all():
+                finished = ~alive
+                outcomes[state['trial'][finished]] = funder.reached_goal(state, params)[finished]
+                state = {key: values[alive] for key, values in state.items()}
+
+            size = state['amount'].size
+            if size == 0:
+                break
+
+            bet = np.full(size, params['j'], dtype=dtype)
+            for rule in stakers:
+                bet = rule.stake(state, bet, params)
+            if fixed:
+                # Whole units, and never less than one unit
+                bet = np.maximum(quantize(bet, params['bet_rounding']), 1)
+
+            actual, cash = funder.fund(state, bet, params)
+
+            # Win with probability p
+            won = draw(state['trial'], step) < p
+            step += 1
+            winnings = actual * gain
+            if fixed:
+                winnings = quantize(winnings, params['win_rounding'])
+            winnings = funder.collect(state, winnings, won, params)
+            state['amount'] = np.where(won, state['amount'] + winnings, state['amount'] - cash)
+
+            for rule in settlers:
+                rule.settle(state, won, params)
+
+        return outcomes
+
+    return kernel
+
+
+def make_params(i: int, n: int, p: float, q: float, j: int, units: Optional[int] = None,
+                bet_rounding: str = 'floor', win_rounding: str = 'floor') -> Dict:
+    """
+    Build the kernel parameters, converting dollar amounts to units if needed.
+
+    Args:
+        i: Starting amount (dollars)
+        n: Goal amount (dollars)
+        p: Probability of winning
+        q: Payout multiplier
+        j: Initial bet size
+        units: Units per dollar for a fixed-point bankroll (None for float dollars)
+        bet_rounding: Rounding policy for fractional bets in units
+        win_rounding: Rounding policy for fractional winnings in units
+
+    Returns:
+        Dict of kernel parameters
+    """
+    validate_units(units)
+    validate_rounding(bet_rounding)
+    validate_rounding(win_rounding)
+    scale = units or 1
+    return {
+        'i': i * scale, 'n': n * scale, 'p': p, 'q': q, 'j': j * scale,
+        'scale': scale, 'units': units, 'bet_rounding': bet_rounding, 'win_rounding': win_rounding
+    }
+
+
+def prepare_kernel(rules: Sequence[Rule]) -> Tuple[List[Rule], Callable]:
+    """
+    Put rules in pipeline order and fetch the compiled kernel for them.
+
+    Args:
+        rules: Rules in any order
+
+    Returns:
+        Tuple of (ordered rules, kernel)
+    """
+    ordered = sorted(rules, key=lambda rule: rule.order)
+    return ordered, compile_kernel(tuple(type(rule) for rule in ordered))
+
+
+def build_rules(use_credit: bool = False, use_dynamic_betting: bool = False, use_max_bet: bool = False,
+                k: Optional[int] = None, m: Optional[int] = None) -> List[Rule]:
+    """
+    Build the rule pipeline for the extension flags used by the API.
+
+    Args:
+        use_credit: Enable line of credit
+        use_dynamic_betting: Enable dynamic betting
+        use_max_bet: Enable maximum bet limit
+        k: Credit line amount
+        m: Maximum bet
+
+    Returns:
+        List of rules
+    """
+    rules: List[Rule] = []
+    if use_credit:
+        rules.append(CreditLine(k))
+    if use_dynamic_betting:
+        rules.append(BetProgression())
+    if use_max_bet:
+        rules.append(TableLimit(m))
+    return rules
+
+
+def run_strategy(i: int, n: int, p: float, q: float, j: int, rules: Sequence[Rule] = (),
+                 trials: int = 10000, seed: Optional[int] = None, units: Optional[int] = None,
+                 bet_rounding: str = 'floor', win_rounding: str = 'floor') -> Dict[str, float]:
+    """
+    Run a simulation of the general model with any combination of rules.
+
+    Args:
+        i: Starting amount (dollars)
+        n: Goal amount (dollars)
+        p: Probability of winning
+        q: Payout multiplier
+        j: Initial bet size
+        rules: Rules to apply; an empty pipeline is the plain general model
+        trials: Number of simulations to run
+        seed: Optional seed for the random number generator
+        units: Keep the bankroll as whole units, this many per dollar (None for float dollars)
+        bet_rounding: Rounding policy for fractional bets in units
+        win_rounding: Rounding policy for fractional winnings in units
+
+    Returns:
+        Dict with win_probability, broke_probability and wins
+    """
+    if trials <= 0:
+        raise ValueError("Number of trials must be greater than 0")
+
+    ordered, kernel = prepare_kernel(rules)
+    params = make_params(i, n, p, q, j, units, bet_rounding, win_rounding)
+
+    rng = np.random.default_rng(seed)
+    outcomes = kernel(ordered, params, trials, lambda trial_ids, step: rng.random(trial_ids.size))
+    wins = int(np.count_nonzero(outcomes))
+
+    win_probability = wins / trials
+    broke_probability = 1 - win_probability
+
+    return {
+        'win_probability': win_probability,
+        'broke_probability': broke_probability,
+        'wins': wins
+    }
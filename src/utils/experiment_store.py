@@ -0,0 +1,296 @@
+"""
+Experiment Store for Gambler's Ruin Simulation
+
+This module keeps a persistent, columnar record of every simulation run so
+results can be queried and analyzed after the response. Records are buffered
+in memory and appended as Parquet part files once enough have accumulated or
+the oldest has waited long enough, and the part files are merged into one
+once there are too many; reads memory-map the part files and push range
+filters down to the Parquet reader.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utils.helpers import confidence_interval
+
+# Columnar schema of a stored run
+SCHEMA = pa.schema([
+    ('run_id', pa.string()),
+    ('recorded_at', pa.float64()),
+    ('engine', pa.string()),
+    ('params_key', pa.string()),
+    ('i', pa.int64()),
+    ('n', pa.int64()),
+    ('p', pa.float64()),
+    ('q', pa.float64()),
+    ('j', pa.int64()),
+    ('k', pa.int64()),
+    ('m', pa.int64()),
+    ('use_credit', pa.bool_()),
+    ('use_dynamic_betting', pa.bool_()),
+    ('use_max_bet', pa.bool_()),
+    ('seed', pa.int64()),
+    ('trials', pa.int64()),
+    ('win_probability', pa.float64()),
+    ('broke_probability', pa.float64()),
+    ('ci_low', pa.float64()),
+    ('ci_high', pa.float64()),
+    ('execution_time', pa.float64()),
+])
+
+# Numeric columns that can be filtered by range in queries
+RANGE_COLUMNS = ('i', 'n', 'p', 'q', 'j', 'k', 'm', 'trials', 'win_probability', 'recorded_at')
+
+DEFAULT_STORE_DIR = os.path.join('data', 'experiments')
+
+
+def canonical_key(engine: str, params: Dict[str, Any]) -> str:
+    """
+    Build a canonical key identifying a simulation request.
+
+    Args:
+        engine: Simulation engine name ('basic', 'general' or 'extended')
+        params: Validated simulation parameters
+
+    Returns:
+        Stable string key for the engine and parameters
+    """
+    return json.dumps({'engine': engine, **params}, sort_keys=True, separators=(',', ':'))
+
+
+class ExperimentStore:
+    """
+    Append-only columnar store of simulation runs.
+
+    Args:
+        root: Directory holding the Parquet part files
+        batch_size: Number of buffered records that triggers a write
+        flush_interval: Seconds a record may stay buffered before it is written
+            (0 leaves writes to ``batch_size``, ``flush`` and ``close``)
+        max_parts: Number of part files at which they are merged into one
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, batch_size: int = 100, flush_interval: float = 30.0,
+                 max_parts: int = 32):
+        if flush_interval < 0:
+            raise ValueError("Flush interval must not be negative")
+        if max_parts < 2:
+            raise ValueError("Maximum number of part files must be at least 2")
+        self.root = root
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_parts = max_parts
+        self._buffer: List[Dict[str, Any]] = []
+        self._batches: List[pa.RecordBatch] = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def _part_files(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.root, 'part-*.parquet')))
+
+    def record(self, engine: str, params: Dict[str, Any], result: Dict[str, float],
+               execution_time: float, seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Record a simulation run.
+
+        Args:
+            engine: Simulation engine name
+            params: Validated simulation parameters
+            result: Simulation result with win_probability and broke_probability
+            execution_time: Wall-clock time of the run in seconds
+            seed: Seed used for the run, if any
+
+        Returns:
+            The stored record
+        """
+        trials = params['trials']
+        ci_low, ci_high = confidence_interval(result['win_probability'], trials)
+        row = {
+            'run_id': uuid.uuid4().hex,
+            'recorded_at': time.time(),
+            'engine': engine,
+            'params_key': canonical_key(engine, params),
+            'i': params['i'],
+            'n': params['n'],
+            'p': params.get('p', 0.5),
+            'q': params.get('q', 2.0),
+            'j': params.get('j', 1),
+            'k': params.get('k'),
+            'm': params.get('m'),
+            'use_credit': params.get('use_credit', False),
+            'use_dynamic_betting': params.get('use_dynamic_betting', False),
+            'use_max_bet': params.get('use_max_bet', False),
+            'seed': seed,
+            'trials': trials,
+            'win_probability': result['win_probability'],
+            'broke_probability': result['broke_probability'],
+            'ci_low': ci_low,
+            'ci_high': ci_high,
+            'execution_time': execution_time,
+        }
+
+        # Converted now rather than at flush: a flush at interpreter exit cannot
+        # import the modules pyarrow loads on its first conversion
+        batch = pa.RecordBatch.from_pylist([row], schema=SCHEMA)
+
+        with self._lock:
+            self._buffer.append(row)
+            self._batches.append(batch)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+            elif self.flush_interval and self._flusher is None and not self._closed.is_set():
+                self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+                self._flusher.start()
+
+        return row
+
+    def flush(self) -> None:
+        """Write all buffered records to a new Parquet part file."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Stop the periodic writes and write the records still buffered."""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def _flush_periodically(self) -> None:
+        # Bounds how long a record stays only in memory when few runs arrive
+        while not self._closed.wait(self.flush_interval):
+            with self._lock:
+                if self._buffer and time.time() - self._buffer[0]['recorded_at'] >= self.flush_interval:
+                    self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        self._write_part(pa.Table.from_batches(self._batches, schema=SCHEMA))
+        self._buffer = []
+        self._batches = []
+        if len(self._part_files()) >= self.max_parts:
+            self._compact_locked()
+
+    def _write_part(self, table: pa.Table) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        name = f"part-{int(time.time() * 1000):015d}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(self.root, f".{name}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(self.root, name))
+        return name
+
+    def compact(self) -> None:
+        """Merge all part files into one, so queries open a single file."""
+        with self._lock:
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        parts = self._part_files()
+        if len(parts) < 2:
+            return
+        # Written before the parts are removed: a crash in between duplicates rows rather than losing them
+        merged = self._write_part(self._read())
+        for path in parts:
+            if os.path.basename(path) != merged:
+                os.remove(path)
+
+    def _read(self, columns: Optional[List[str]] = None, filters: Optional[List[Tuple]] = None) -> pa.Table:
+        tables = [
+            pq.read_table(path, columns=columns, filters=filters or None, memory_map=True)
+            for path in self._part_files()
+        ]
+        if not tables:
+            schema = SCHEMA if columns is None else pa.schema([SCHEMA.field(col) for col in columns])
+            return schema.empty_table()
+        return pa.concat_tables(tables)
+
+    def query(self, engine: Optional[str] = None, ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Query stored runs.
+
+        Args:
+            engine: Only return runs of this engine
+            ranges: Mapping of column name to an inclusive (min, max) range; either bound may be None
+            limit: Maximum number of runs to return (most recent first)
+
+        Returns:
+            List of stored records
+        """
+        filters = []
+        if engine is not None:
+            filters.append(('engine', '=', engine))
+        for column, (low, high) in (ranges or {}).items():
+            if column not in RANGE_COLUMNS:
+                raise ValueError(f"Cannot filter on column: {column}")
+            if low is not None:
+                filters.append((column, '>=', low))
+            if high is not None:
+                filters.append((column, '<=', high))
+
+        def matches(row: Dict[str, Any]) -> bool:
+            for column, op, value in filters:
+                if row[column] is None:
+                    return False
+                if (op == '=' and row[column] != value) or (op == '>=' and row[column] < value) \
+                        or (op == '<=' and row[column] > value):
+                    return False
+            return True
+
+        with self._lock:
+            rows = self._read(filters=filters).to_pylist()
+            rows += [dict(row) for row in self._buffer if matches(row)]
+
+        rows.sort(key=lambda row: row['recorded_at'], reverse=True)
+        return rows[:limit] if limit is not None else rows
+
+    def export_parquet(self, path: str) -> int:
+        """
+        Export every stored run to a single Parquet file.
+
+        Args:
+            path: Destination file
+
+        Returns:
+            Number of exported runs
+        """
+        self.flush()
+        with self._lock:
+            table = self._read()
+        pq.write_table(table, path)
+        return table.num_rows
+
+
+_store: Optional[ExperimentStore] = None
+
+
+def get_store() -> ExperimentStore:
+    """
+    Get the process-wide experiment store.
+
+    The location and the longest time a record stays buffered are taken from
+    the EXPERIMENT_STORE_DIR and EXPERIMENT_FLUSH_INTERVAL (seconds, default 30)
+    environment variables. Whoever owns the process (the API app, the load test)
+    closes the store when it shuts down.
+
+    Returns:
+        The shared ExperimentStore
+    """
+    global _store
+    if _store is None:
+        _store = ExperimentStore(
+            os.environ.get('EXPERIMENT_STORE_DIR', DEFAULT_STORE_DIR),
+            flush_interval=float(os.environ.get('EXPERIMENT_FLUSH_INTERVAL', 30))
+        )
+    return _store
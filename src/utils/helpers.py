@@ -4,8 +4,9 @@ Helper Functions for Gambler's Ruin Simulation
 This module provides utility functions used across the application.
 """
 
+import math
 import time
-from typing import Dict, Callable, Any
+from typing import Dict, Callable, Any, Tuple
 
 
 def time_execution(func: Callable, *args, **kwargs) -> Dict[str, Any]:
@@ -47,4 +48,19 @@ def format_probability(probability: float) -> str:
     Returns:
         Formatted string representing the probability as a percentage
     """
-    return f"{probability * 100:.2f}%" 
\ No newline at end of file
+    return f"{probability * 100:.2f}%" 
+
+def confidence_interval(probability: float, trials: int, z: float = 1.96) -> Tuple[float, float]:
+    """
+    Calculate a normal-approximation confidence interval for an estimated probability.
+    
+    Args:
+        probability: Estimated probability between 0 and 1
+        trials: Number of trials the estimate is based on
+        z: Standard normal quantile (1.96 for a 95% interval)
+        
+    Returns:
+        Tuple of (lower, upper) bounds clipped to [0, 1]
+    """
+    half_width = z * math.sqrt(probability * (1 - probability) / trials)
+    return max(0.0, probability - half_width), min(1.0, probability + half_width)
@@ -0,0 +1,354 @@
+"""
+Load Testing Harness for the Gambler's Ruin API
+
+This module replays a weighted mix of simulation requests against a local API
+instance at a configurable concurrency and arrival rate, and reports
+throughput, latency percentiles, error rates and per-endpoint saturation points
+as JSON and HTML.
+
+Run it with:
+    python -m src.utils.load_test --rate 20 --duration 30 --concurrency 8
+"""
+
+import argparse
+import html
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import requests
+
+DEFAULT_BASE_URL = 'http://localhost:5000/api'
+
+
+def _basic_payload(rng: random.Random) -> Dict[str, Any]:
+    n = rng.choice([10, 20, 50, 100])
+    return {'i': rng.randint(1, n - 1), 'n': n, 'trials': rng.choice([1000, 5000, 10000])}
+
+
+def _general_payload(rng: random.Random) -> Dict[str, Any]:
+    payload = _basic_payload(rng)
+    payload.update({
+        'p': round(rng.uniform(0.40, 0.60), 2),
+        'q': rng.choice([1.5, 2.0, 3.0]),
+        'j': rng.choice([1, 2, 5])
+    })
+    return payload
+
+
+def _extended_payload(rng: random.Random) -> Dict[str, Any]:
+    payload = _general_payload(rng)
+    payload['use_credit'] = rng.random() < 0.5
+    payload['use_dynamic_betting'] = rng.random() < 0.5
+    payload['use_max_bet'] = rng.random() < 0.5 or not (payload['use_credit'] or payload['use_dynamic_betting'])
+    if payload['use_credit']:
+        payload['k'] = rng.choice([5, 10, 20])
+    if payload['use_max_bet']:
+        payload['m'] = rng.choice([2, 5, 10])
+    return payload
+
+
+# Default request mix: endpoint -> (weight, payload generator)
+DEFAULT_MIX: Dict[str, tuple] = {
+    'basic-simulation': (0.3, _basic_payload),
+    'general-simulation': (0.5, _general_payload),
+    'extended-simulation': (0.2, _extended_payload)
+}
+
+
+def _percentile(values: Sequence[float], q: float) -> Optional[float]:
+    return float(np.percentile(values, q)) if len(values) else None
+
+
+def summarize(samples: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    """
+    Summarize request samples into throughput, latency and error statistics.
+
+    Args:
+        samples: One dict per request with endpoint, latency (seconds) and ok
+        elapsed: Wall-clock duration of the run in seconds
+
+    Returns:
+        Dict with overall and per-endpoint statistics (latencies in milliseconds)
+    """
+    def stats(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+        latencies = [s['latency'] * 1000 for s in group if s['ok']]
+        errors = sum(1 for s in group if not s['ok'])
+        return {
+            'requests': len(group),
+            'errors': errors,
+            'error_rate': errors / len(group) if group else 0.0,
+            'throughput': len(latencies) / elapsed if elapsed > 0 else 0.0,
+            'p50_ms': _percentile(latencies, 50),
+            'p95_ms': _percentile(latencies, 95),
+            'p99_ms': _percentile(latencies, 99),
+            'max_ms': max(latencies) if latencies else None
+        }
+
+    endpoints = sorted({s['endpoint'] for s in samples})
+    return {
+        'elapsed_seconds': elapsed,
+        'overall': stats(samples),
+        'endpoints': {e: stats([s for s in samples if s['endpoint'] == e]) for e in endpoints}
+    }
+
+
+def run_load(base_url: str = DEFAULT_BASE_URL, mix: Optional[Dict[str, tuple]] = None,
+             concurrency: int = 8, rate: Optional[float] = None, duration: float = 10.0,
+             extra_payload: Optional[Dict[str, Any]] = None, timeout: float = 60.0,
+             seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Replay a request mix against the API.
+
+    With a ``rate`` requests arrive open-loop as a Poisson process, so queueing
+    shows up as latency once the server saturates. Without a rate each worker
+    sends requests back to back (closed loop). Each worker sends its own
+    ``X-Client-Id``, so when the API trusts that header
+    (TRUST_CLIENT_ID_HEADER=1) its per-client compute budgets do not throttle
+    the whole run as if it came from one client.
+
+    Args:
+        base_url: API base URL
+        mix: Mapping of endpoint to (weight, payload generator)
+        concurrency: Number of concurrent client workers
+        rate: Mean arrival rate in requests per second, or None for closed loop
+        duration: Length of the run in seconds
+        extra_payload: Fields added to every request, e.g. {'use_cache': False}
+        timeout: Per-request timeout in seconds
+        seed: Optional seed for the request mix and arrival times
+
+    Returns:
+        Summary as returned by ``summarize``
+    """
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    endpoints = list(mix)
+    weights = [mix[e][0] for e in endpoints]
+    local = threading.local()
+    client_ids = itertools.count()
+    samples: List[Dict[str, Any]] = []
+    samples_lock = threading.Lock()
+
+    def next_request() -> tuple:
+        endpoint = rng.choices(endpoints, weights)[0]
+        payload = mix[endpoint][1](rng)
+        payload.update(extra_payload or {})
+        return endpoint, payload
+
+    def send(endpoint: str, payload: Dict[str, Any], scheduled: float) -> None:
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+            local.session.headers['X-Client-Id'] = f"load-test-{os.getpid()}-{next(client_ids)}"
+        try:
+            response = local.session.post(f"{base_url}/{endpoint}", json=payload, timeout=timeout)
+            ok = response.status_code == 200
+            error = None if ok else f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            ok, error = False, type(e).__name__
+        # Latency is measured from the scheduled arrival, so client-side queueing counts
+        sample = {'endpoint': endpoint, 'latency': time.perf_counter() - scheduled, 'ok': ok, 'error': error}
+        with samples_lock:
+            samples.append(sample)
+
+    start = time.perf_counter()
+    deadline = start + duration
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if rate:
+            arrival = start
+            while True:
+                arrival += rng.expovariate(rate)
+                if arrival >= deadline:
+                    break
+                time.sleep(max(0.0, arrival - time.perf_counter()))
+                pool.submit(send, *next_request(), arrival)
+        else:
+            def worker() -> None:
+                while time.perf_counter() < deadline:
+                    with samples_lock:
+                        request = next_request()
+                    send(*request, time.perf_counter())
+
+            for _ in range(concurrency):
+                pool.submit(worker)
+
+    return summarize(samples, time.perf_counter() - start)
+
+
+def find_saturation(endpoint: str, rates: Sequence[float], base_url: str = DEFAULT_BASE_URL,
+                    concurrency: int = 8, duration: float = 10.0, slo_p95_ms: float = 1000.0,
+                    extra_payload: Optional[Dict[str, Any]] = None, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Step the arrival rate for one endpoint until it saturates.
+
+    An endpoint counts as saturated at the first rate where achieved throughput
+    falls below 90% of the offered rate, the p95 latency exceeds the SLO, or
+    more than 1% of requests fail.
+
+    Args:
+        endpoint: Endpoint name, e.g. 'general-simulation'
+        rates: Offered rates to try, in increasing order
+        base_url: API base URL
+        concurrency: Number of concurrent client workers
+        duration: Length of each step in seconds
+        slo_p95_ms: p95 latency objective in milliseconds
+        extra_payload: Fields added to every request
+        seed: Optional seed for the request mix
+
+    Returns:
+        Dict with the per-step results and the saturation rate (None if never saturated)
+    """
+    mix = {endpoint: (1.0, DEFAULT_MIX[endpoint][1])}
+    steps = []
+    saturation_rate = None
+
+    for rate in rates:
+        summary = run_load(base_url, mix, concurrency, rate, duration, extra_payload, seed=seed)['overall']
+        summary['offered_rate'] = rate
+        steps.append(summary)
+        p95 = summary['p95_ms']
+        if (summary['throughput'] < 0.9 * rate or summary['error_rate'] > 0.01
+                or p95 is None or p95 > slo_p95_ms):
+            saturation_rate = rate
+            break
+
+    return {'endpoint': endpoint, 'slo_p95_ms': slo_p95_ms, 'saturation_rate': saturation_rate, 'steps': steps}
+
+
+def render_html(report: Dict[str, Any]) -> str:
+    """
+    Render a load test report as a standalone HTML page.
+
+    Args:
+        report: Report with 'config', 'load' and optional 'saturation' sections
+
+    Returns:
+        HTML document
+    """
+    def fmt(value: Any) -> str:
+        if value is None:
+            return '-'
+        return f"{value:.2f}" if isinstance(value, float) else html.escape(str(value))
+
+    columns = ['requests', 'errors', 'error_rate', 'throughput', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+
+    def table(rows: Dict[str, Dict[str, Any]], first: str) -> str:
+        head = ''.join(f"<th>{c}</th>" for c in [first] + columns)
+        body = ''.join(
+            f"<tr><td>{html.escape(name)}</td>" + ''.join(f"<td>{fmt(row.get(c))}</td>" for c in columns) + "</tr>"
+            for name, row in rows.items()
+        )
+        return f"<table><tr>{head}</tr>{body}</table>"
+
+    load = report['load']
+    parts = [
+        "<html><head><meta charset='utf-8'><title>Gambler's Ruin API Load Test</title>",
+        "<style>body{font-family:sans-serif}table{border-collapse:collapse;margin-bottom:1em}"
+        "td,th{border:1px solid #ccc;padding:4px 8px;text-align:right}</style></head><body>",
+        "<h1>Gambler's Ruin API Load Test</h1>",
+        f"<pre>{html.escape(json.dumps(report['config'], indent=2))}</pre>",
+        "<h2>Load</h2>",
+        table({'overall': load['overall'], **load['endpoints']}, 'endpoint')
+    ]
+    for result in report.get('saturation', []):
+        parts.append(f"<h2>Saturation: {html.escape(result['endpoint'])} "
+                     f"(saturates at {fmt(result['saturation_rate'])} req/s)</h2>")
+        parts.append(table({fmt(step['offered_rate']): step for step in result['steps']}, 'offered_rate'))
+    parts.append("</body></html>")
+    return '\n'.join(parts)
+
+
+def serve_in_background(port: int) -> Callable[[], None]:
+    """
+    Start the API app on a local port in a background thread.
+
+    The app trusts the ``X-Client-Id`` header, so each load test worker gets
+    its own compute budget.
+
+    Args:
+        port: Port to listen on
+
+    Returns:
+        Function that shuts the server and the app down
+    """
+    from werkzeug.serving import make_server
+    from src.api.app import app, shutdown as shutdown_app
+
+    os.environ['TRUST_CLIENT_ID_HEADER'] = '1'
+
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def shutdown() -> None:
+        server.shutdown()
+        shutdown_app()
+
+    return shutdown
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test the Gambler's Ruin API")
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help="API base URL")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent client workers")
+    parser.add_argument('--rate', type=float, default=None, help="Arrival rate in req/s (default: closed loop)")
+    parser.add_argument('--duration', type=float, default=10.0, help="Duration of the run in seconds")
+    parser.add_argument('--no-cache', action='store_true', help="Bypass stored trials and lookup tables")
+    parser.add_argument('--saturation', default=None,
+                        help="Comma-separated offered rates to step through for each endpoint")
+    parser.add_argument('--slo-p95-ms', type=float, default=1000.0, help="p95 latency objective in ms")
+    parser.add_argument('--spawn', type=int, default=None, metavar='PORT',
+                        help="Start the API in-process on this port and test it")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for the request mix")
+    parser.add_argument('--json', default='load_test_report.json', help="JSON report path")
+    parser.add_argument('--html', default='load_test_report.html', help="HTML report path")
+    args = parser.parse_args()
+
+    base_url = args.base_url
+    shutdown = None
+    if args.spawn is not None:
+        shutdown = serve_in_background(args.spawn)
+        base_url = f"http://127.0.0.1:{args.spawn}/api"
+
+    extra = {'use_cache': False, 'use_table': False} if args.no_cache else None
+    report: Dict[str, Any] = {
+        'config': {
+            'base_url': base_url,
+            'concurrency': args.concurrency,
+            'rate': args.rate,
+            'duration': args.duration,
+            'no_cache': args.no_cache,
+            'slo_p95_ms': args.slo_p95_ms
+        }
+    }
+
+    try:
+        report['load'] = run_load(base_url, concurrency=args.concurrency, rate=args.rate,
+                                  duration=args.duration, extra_payload=extra, seed=args.seed)
+        if args.saturation:
+            rates = [float(r) for r in args.saturation.split(',')]
+            report['saturation'] = [
+                find_saturation(endpoint, rates, base_url, args.concurrency, args.duration,
+                                args.slo_p95_ms, extra, args.seed)
+                for endpoint in DEFAULT_MIX
+            ]
+    finally:
+        if shutdown is not None:
+            shutdown()
+
+    with open(args.json, 'w') as f:
+        json.dump(report, f, indent=2)
+    with open(args.html, 'w') as f:
+        f.write(render_html(report))
+
+    overall = report['load']['overall']
+    print(f"{overall['requests']} requests, {overall['throughput']:.1f} req/s, "
+          f"p50 {overall['p50_ms']} ms, p95 {overall['p95_ms']} ms, p99 {overall['p99_ms']} ms, "
+          f"error rate {overall['error_rate']:.2%}")
+    print(f"Reports written to {args.json} and {args.html}")
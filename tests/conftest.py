@@ -0,0 +1,29 @@
+"""
+Shared fixtures: an API app whose stores, scheduler and checkpoints live in a temporary directory.
+"""
+
+import pytest
+from flask import Flask
+
+from src.api import admission, routes
+from src.api.admission import Scheduler
+from src.simulation import checkpoint, incremental
+from src.simulation.checkpoint import CheckpointManager
+from src.simulation.incremental import TrialStatsStore
+from src.utils import experiment_store
+from src.utils.experiment_store import ExperimentStore
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """Test client of the API blueprint, without lookup tables."""
+    monkeypatch.setattr(experiment_store, '_store', ExperimentStore(str(tmp_path / 'runs')))
+    monkeypatch.setattr(incremental, '_stats_store', TrialStatsStore(str(tmp_path / 'stats')))
+    monkeypatch.setattr(checkpoint, '_checkpoints', CheckpointManager(str(tmp_path / 'checkpoints'), interval=0))
+    monkeypatch.setattr(admission, '_scheduler', Scheduler(slots=2))
+    monkeypatch.setattr(routes, 'get_table', lambda: None)
+
+    app = Flask(__name__)
+    app.register_blueprint(routes.api_bp, url_prefix='/api')
+    yield app.test_client()
+    experiment_store._store.close()
@@ -0,0 +1,174 @@
+"""
+Tests for admission control: scheduling order, client budgets and the API's admission responses.
+"""
+
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from src.api import admission, routes
+from src.api.admission import AdmissionError, Scheduler
+
+GENERAL = {'i': 5, 'n': 12, 'p': 0.45, 'q': 2.0, 'j': 1, 'trials': 2000}
+
+
+def cost(seconds):
+    return {'predicted_seconds': seconds, 'trials': 1, 'workload': 'test', 'correction': 1.0}
+
+
+def run_in_order(scheduler, jobs, gap=0.0):
+    """Queue jobs of the given predicted seconds behind a running one and return their run order."""
+    order = []
+    release = threading.Event()
+
+    def blocker():
+        with scheduler.admit('blocker', cost(0.1)):
+            release.wait()
+
+    def job(seconds):
+        with scheduler.admit(f'client-{seconds}', cost(seconds)):
+            order.append(seconds)
+
+    threads = [threading.Thread(target=blocker)]
+    threads[0].start()
+    while scheduler.status()['running'] == 0:
+        time.sleep(0.001)
+    for seconds in jobs:
+        threads.append(threading.Thread(target=job, args=(seconds,)))
+        threads[-1].start()
+        while scheduler.status()['queued'] < len(threads) - 1:
+            time.sleep(0.001)
+        time.sleep(gap)
+    release.set()
+    for thread in threads:
+        thread.join()
+    return order
+
+
+def test_shortest_predicted_job_runs_first():
+    scheduler = Scheduler(slots=1, aging=0.0)
+    assert run_in_order(scheduler, [3.0, 1.0, 2.0]) == [1.0, 2.0, 3.0]
+
+
+def test_waiting_jobs_age_ahead_of_newer_short_ones():
+    # At 1000 seconds of priority per second waited, 50 ms of waiting outweighs 4 s of predicted run time
+    scheduler = Scheduler(slots=1, aging=1000.0)
+    assert run_in_order(scheduler, [5.0, 1.0], gap=0.05) == [5.0, 1.0]
+
+
+def test_budget_decisions():
+    scheduler = Scheduler(max_seconds=30, client_capacity=10, client_refill_rate=0.5)
+    assert scheduler.check('a', cost(5))['admitted']
+
+    over_latency = scheduler.check('a', cost(40))
+    assert not over_latency['admitted'] and over_latency['retry_after'] is None
+
+    # More than a full client budget never fits, so waiting is not offered
+    over_capacity = scheduler.check('a', cost(12))
+    assert not over_capacity['admitted'] and over_capacity['retry_after'] is None
+    assert 'client compute budget' in over_capacity['reason']
+
+    with scheduler.admit('a', cost(7)):
+        exhausted = scheduler.check('a', cost(5))
+        assert not exhausted['admitted']
+        assert exhausted['retry_after'] == pytest.approx((5 - 3) / 0.5, abs=0.01)
+        assert scheduler.check('b', cost(5))['admitted']
+
+
+@pytest.mark.parametrize('seconds, status', [(12, 400), (40, 400), (5, 429)])
+def test_admit_rejects_with_status(seconds, status):
+    scheduler = Scheduler(max_seconds=30, client_capacity=10, client_refill_rate=1e-9)
+    scheduler._budget('a').tokens = 4
+    with pytest.raises(AdmissionError) as error:
+        with scheduler.admit('a', cost(seconds)):
+            pass
+    assert error.value.status == status
+
+
+def test_concurrent_admissions_never_overdraw_the_budget():
+    scheduler = Scheduler(slots=50, client_capacity=10, client_refill_rate=1e-9)
+    release = threading.Event()
+    outcomes = []
+    lock = threading.Lock()
+
+    def request():
+        try:
+            with scheduler.admit('a', cost(1)):
+                with lock:
+                    outcomes.append(True)
+                release.wait()
+        except AdmissionError:
+            with lock:
+                outcomes.append(False)
+
+    threads = [threading.Thread(target=request) for _ in range(40)]
+    for thread in threads:
+        thread.start()
+    while len(outcomes) < 40:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert outcomes.count(True) == 10
+
+
+def test_client_id_header_is_trusted_only_when_enabled(monkeypatch):
+    app = Flask(__name__)
+    request = {'headers': {'X-Client-Id': 'fresh'}, 'environ_base': {'REMOTE_ADDR': '10.0.0.1'}}
+    with app.test_request_context(**request):
+        assert routes._client_id() == '10.0.0.1'
+        monkeypatch.setenv('TRUST_CLIENT_ID_HEADER', '1')
+        assert routes._client_id() == 'fresh'
+
+
+def test_rotating_client_ids_share_one_budget(api, monkeypatch):
+    predicted = api.post('/api/general-simulation', json=dict(GENERAL, dry_run=True)).get_json()['cost']
+    scheduler = Scheduler(client_capacity=1.5 * predicted['predicted_seconds'], client_refill_rate=1e-9)
+    monkeypatch.setattr(admission, '_scheduler', scheduler)
+    scheduler._budget('127.0.0.1').tokens = 0.5 * predicted['predicted_seconds']
+
+    response = api.post('/api/general-simulation', json=GENERAL, headers={'X-Client-Id': 'new-id'})
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+
+
+def test_request_over_the_client_budget_gets_suggestions(api, monkeypatch):
+    request = dict(GENERAL, trials=200000)
+    predicted = api.post('/api/general-simulation', json=dict(request, dry_run=True)).get_json()['cost']
+    seconds = predicted['predicted_seconds']
+    monkeypatch.setattr(admission, '_scheduler', Scheduler(max_seconds=10 * seconds, client_capacity=seconds / 2))
+
+    response = api.post('/api/general-simulation', json=request)
+    assert response.status_code == 400
+    assert 'Retry-After' not in response.headers
+    suggestions = {suggestion['method']: suggestion for suggestion in response.get_json()['suggestions']}
+    assert suggestions['fewer_trials']['predicted_seconds'] <= seconds / 2
+    assert suggestions['exact']['path'] == '/api/optimal-strategy'
+
+
+class FakeTable:
+    def __init__(self, error=None):
+        self.error = error
+
+    def lookup(self, i, n, p, q, j):
+        if self.error:
+            raise self.error
+        return {'win_probability': 0.3, 'broke_probability': 0.7, 'error_bound': 0.0}
+
+
+def test_dry_run_skips_the_lookup_table(api, monkeypatch):
+    monkeypatch.setattr(routes, 'get_table', lambda: FakeTable())
+    assert api.post('/api/general-simulation', json=GENERAL).get_json()['source'] == 'table'
+
+    for path, extra in [('general', {}), ('extended', {'use_max_bet': True, 'm': 1})]:
+        result = api.post(f'/api/{path}-simulation', json=dict(GENERAL, dry_run=True, **extra)).get_json()
+        assert result['dry_run'] and 'source' not in result
+
+
+def test_lookup_errors_are_json_errors(api, monkeypatch):
+    monkeypatch.setattr(routes, 'get_table', lambda: FakeTable(OSError('table file missing')))
+    response = api.post('/api/general-simulation', json=GENERAL)
+    assert response.status_code == 500
+    assert response.get_json()['error'] == 'Simulation error: table file missing'
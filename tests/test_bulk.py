@@ -0,0 +1,89 @@
+"""
+Tests for streaming bulk runs: row parsing, bad rows and resuming a partial output.
+"""
+
+import csv
+import json
+
+import pytest
+
+from src.simulation.bulk import completed_rows, count_rows, parse_row, read_rows, run_bulk
+
+ROWS = [
+    {'function': 'basic', 'i': 3, 'n': 6, 'trials': 500},
+    {'function': 'general', 'i': 4, 'n': 10, 'p': 0.45, 'q': 2.0, 'j': 1, 'trials': 500},
+    {'function': 'extended', 'i': 4, 'n': 10, 'p': 0.45, 'q': 2.0, 'j': 1, 'use_max_bet': True, 'm': 1,
+     'trials': 500},
+    {'function': 'general', 'i': 4, 'n': 10, 'p': 0.45, 'q': 1.5, 'j': 1, 'units': 2, 'trials': 500},
+    {'function': 'general', 'i': 2, 'n': 5, 'p': 0.55, 'q': 2.0, 'j': 1, 'trials': 500, 'seed': 11},
+    {'function': 'basic', 'i': 1, 'n': 4, 'trials': 500},
+]
+
+
+def write_jsonl(path, lines):
+    path.write_text(''.join(line + '\n' for line in lines))
+    return str(path)
+
+
+def results(path):
+    """Output rows without their run times."""
+    if str(path).endswith('.csv'):
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+    else:
+        rows = [json.loads(line) for line in open(path)]
+    for row in rows:
+        row.pop('execution_time', None)
+    return rows
+
+
+def test_malformed_line_becomes_an_error_row(tmp_path):
+    lines = [json.dumps(ROWS[0]), '{"function": "basic", "i": 3,', '', json.dumps(ROWS[1])]
+    input_path = write_jsonl(tmp_path / 'in.jsonl', lines)
+
+    rows = list(read_rows(input_path))
+    assert isinstance(rows[1], ValueError)
+    assert count_rows(input_path) == 3
+
+    summary = run_bulk(input_path, str(tmp_path / 'out.jsonl'), workers=1, seed=3)
+    output = results(tmp_path / 'out.jsonl')
+    assert summary['rows_done'] == 3 and summary['errors'] == 1
+    assert list(output[1]) == ['error']
+    assert output[1]['error'].startswith('Invalid row: Invalid JSON on line 2:')
+    assert output[0]['win_probability'] is not None and output[2]['win_probability'] is not None
+
+
+@pytest.mark.parametrize('row, message', [
+    ([1, 2], 'Row must be an object of columns'),
+    ({'i': [1]}, 'Bad value for column i'),
+    ({'n': float('inf')}, 'Bad value for column n'),
+])
+def test_bad_values_are_rejected(row, message):
+    with pytest.raises(ValueError, match=message):
+        parse_row(row)
+
+
+def test_blank_csv_values_are_dropped():
+    assert parse_row({'i': '3', 'n': '10.0', 'p': '0.4', 'k': ' ', 'use_credit': 'yes', 'note': 'x'}) == \
+        {'i': 3, 'n': 10, 'p': 0.4, 'use_credit': True}
+
+
+@pytest.mark.parametrize('output_name', ['out.jsonl', 'out.csv'])
+def test_resumed_run_matches_uninterrupted_run(tmp_path, output_name):
+    lines = [json.dumps(row) for row in ROWS]
+    lines.insert(3, 'not json')
+    input_path = write_jsonl(tmp_path / 'in.jsonl', lines)
+    expected_path = tmp_path / f'expected-{output_name}'
+    run_bulk(input_path, str(expected_path), workers=2, seed=5)
+
+    # Keep three complete rows and half of the fourth, as if the run had been killed
+    output_path = tmp_path / output_name
+    text = expected_path.read_text().splitlines(keepends=True)
+    header = 1 if output_name.endswith('.csv') else 0
+    output_path.write_text(''.join(text[:header + 3]) + text[header + 3][:10])
+
+    summary = run_bulk(input_path, str(output_path), workers=2, seed=5, resume=True)
+    assert summary['rows_skipped'] == 3
+    assert summary['rows_done'] == len(lines) - 3
+    assert completed_rows(str(output_path)) == len(lines)
+    assert results(output_path) == results(expected_path)
@@ -0,0 +1,125 @@
+"""
+Tests for checkpoint and resume.
+"""
+
+import time
+
+import pytest
+
+from src.simulation import checkpoint
+from src.simulation.bulk import run_row
+from src.simulation.checkpoint import CheckpointManager, run_checkpointed
+from src.simulation.distributed import run_local, run_shard
+
+PARAMS = {'i': 5, 'n': 12, 'p': 0.45, 'q': 2.0, 'j': 1}
+TRIALS = 23000
+SHARD_SIZE = 2000
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupting_runner(after: int):
+    """A shard runner that fails once ``after`` shards have run, like a crash."""
+    calls = {'count': 0}
+
+    def runner(function, params, trials, seed):
+        if calls['count'] >= after:
+            raise Interrupted()
+        calls['count'] += 1
+        return run_shard(function, params, trials, seed)
+
+    return runner
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return CheckpointManager(str(tmp_path / 'checkpoints'), interval=0, retention=2)
+
+
+@pytest.mark.parametrize('parallelism', [1, 3])
+def test_resumed_run_matches_uninterrupted_run(manager, parallelism):
+    expected = run_local('general', PARAMS, TRIALS, seed=7, shard_size=SHARD_SIZE)
+
+    with pytest.raises(Interrupted):
+        run_checkpointed('general', PARAMS, TRIALS, seed=7, shard_size=SHARD_SIZE, manager=manager,
+                         runner=interrupting_runner(5), parallelism=parallelism)
+
+    result = run_checkpointed('general', PARAMS, TRIALS, seed=7, shard_size=SHARD_SIZE, manager=manager,
+                              parallelism=parallelism)
+    assert result['resumed_from'] > 0
+    assert result['wins'] == expected['wins']
+    assert result['win_probability'] == expected['win_probability']
+
+
+def test_completed_run_is_not_rerun(manager):
+    first = run_checkpointed('general', PARAMS, TRIALS, seed=7, shard_size=SHARD_SIZE, manager=manager)
+    second = run_checkpointed('general', PARAMS, TRIALS, seed=7, shard_size=SHARD_SIZE, manager=manager,
+                              runner=interrupting_runner(0))
+    assert second['resumed_from'] == TRIALS
+    assert second['wins'] == first['wins']
+
+
+def test_retention_keeps_latest_checkpoints(manager):
+    result = run_checkpointed('general', PARAMS, TRIALS, seed=7, shard_size=SHARD_SIZE, manager=manager)
+    assert len(manager._files(result['run_id'])) == 2
+    assert manager.runs()[0]['complete']
+
+
+def test_checkpoint_from_other_parameters_is_rejected(manager):
+    run_checkpointed('general', PARAMS, TRIALS, seed=7, shard_size=SHARD_SIZE, manager=manager, run_id='run')
+    with pytest.raises(ValueError):
+        run_checkpointed('general', PARAMS, TRIALS, seed=8, shard_size=SHARD_SIZE, manager=manager, run_id='run')
+
+
+def test_failed_shard_cancels_the_queue(manager):
+    calls = {'count': 0}
+
+    def runner(function, params, trials, seed):
+        calls['count'] += 1
+        if calls['count'] == 1:
+            raise Interrupted()
+        time.sleep(0.05)
+        return run_shard(function, params, trials, seed)
+
+    with pytest.raises(Interrupted):
+        run_checkpointed('general', PARAMS, TRIALS, seed=7, shard_size=SHARD_SIZE, manager=CheckpointManager(
+            manager.root, interval=3600), run_id='run', runner=runner, parallelism=2)
+    # Only the shards already running finish; their progress is saved despite the long interval
+    assert calls['count'] <= 3
+    assert manager.load('run') is not None
+
+
+def test_bulk_rows_run_as_checkpointed_shards(manager, monkeypatch):
+    monkeypatch.setattr(checkpoint, '_checkpoints', manager)
+    row = dict(PARAMS, function='general', trials=TRIALS, seed=7)
+    result = run_row(row, shard_size=SHARD_SIZE)
+    assert result['win_probability'] == run_local('general', PARAMS, TRIALS, seed=7, shard_size=SHARD_SIZE)['win_probability']
+
+    extended = dict(row, function='extended', use_max_bet=True, m=1)
+    rules = [{'rule': 'table_limit', 'm': 1}]
+    expected = run_local('strategy', dict(PARAMS, rules=rules), TRIALS, seed=7, shard_size=SHARD_SIZE)
+    assert run_row(extended, shard_size=SHARD_SIZE)['win_probability'] == expected['win_probability']
+    assert len(manager.runs()) == 2
+
+
+def test_api_run_resumes_with_its_seed(api):
+    request = {'i': 5, 'n': 12, 'p': 0.45, 'q': 2.0, 'j': 1, 'trials': TRIALS,
+               'checkpoint': True, 'shard_size': SHARD_SIZE}
+    first = api.post('/api/general-simulation', json=request).get_json()
+    assert first['resumed_from'] == 0 and first['cached'] is False
+
+    again = api.post('/api/general-simulation', json=dict(request, seed=first['seed'])).get_json()
+    assert again['resumed_from'] == TRIALS
+    assert again['wins'] == first['wins']
+
+    runs = api.get('/api/checkpoints').get_json()['runs']
+    assert [run['run_id'] for run in runs] == [first['run_id']]
+    assert runs[0]['complete']
+
+
+def test_api_rejects_bad_checkpoint_options(api):
+    request = {'i': 5, 'n': 12, 'p': 0.45, 'q': 2.0, 'j': 1, 'checkpoint': True}
+    assert api.post('/api/general-simulation', json=dict(request, seed='x')).status_code == 400
+    assert api.post('/api/general-simulation', json=dict(request, shard_size=10)).status_code == 400
@@ -0,0 +1,70 @@
+"""
+Tests for common-random-numbers strategy comparison and its request validation.
+"""
+
+import pytest
+
+from src.api.validation import validate_comparison_params
+from src.simulation.comparison import compare_strategies, default_strategies, strategy_rules
+from src.simulation.lookup_tables import solve_win_probabilities
+from src.simulation.strategy_engine import CreditLine, TableLimit
+
+GAME = dict(i=6, n=12, p=0.45, q=2.0, j=1)
+
+
+def test_general_strategy_matches_exact_solve():
+    result = compare_strategies(strategies={'general': []}, trials=20000, seed=2, **GAME)
+    estimate = result['strategies']['general']
+    exact = solve_win_probabilities(12, 0.45, 2.0, 1)[6]
+    std_error = (estimate['ci_high'] - estimate['ci_low']) / (2 * 1.96)
+    assert abs(estimate['win_probability'] - exact) < 4 * std_error
+
+
+def test_equivalent_strategies_have_no_difference():
+    # A table limit above the bet never binds, so every trial has the same outcome
+    strategies = {'general': [], 'max_bet': [TableLimit(5)]}
+    result = compare_strategies(strategies=strategies, trials=5000, seed=4, **GAME)
+    difference = result['differences']['max_bet']
+    assert difference['difference'] == 0.0
+    assert difference['std_error'] == 0.0
+    assert difference['variance_reduction'] is None
+
+
+def test_paired_differences_are_less_noisy():
+    strategies = {name: strategy_rules(name, k=3, m=2) for name in ('general', 'dynamic_betting', 'full')}
+    result = compare_strategies(strategies=strategies, trials=5000, seed=6, **GAME)
+    for difference in result['differences'].values():
+        assert difference['variance_reduction'] > 1
+
+
+def test_seed_reproduces_the_comparison():
+    strategies = {name: strategy_rules(name, k=3, m=2) for name in ('general', 'full')}
+    first = compare_strategies(strategies=strategies, trials=2000, seed=9, **GAME)
+    assert compare_strategies(strategies=strategies, trials=2000, seed=9, **GAME) == first
+
+
+def test_default_strategies_need_their_parameters():
+    assert default_strategies() == ['general', 'dynamic_betting']
+    assert default_strategies(k=3) == ['general', 'credit', 'dynamic_betting']
+    assert default_strategies(k=3, m=2) == ['general', 'credit', 'dynamic_betting', 'max_bet', 'full']
+
+
+def test_strategy_overrides_shared_parameters():
+    params = validate_comparison_params(dict(GAME, k=3, strategies=[
+        'credit', {'name': 'deep', 'use_credit': True, 'k': '10'}
+    ]))
+    assert params['strategies']['credit'][0].k == 3
+    assert params['strategies']['deep'][0].k == 10
+    assert isinstance(params['strategies']['deep'][0], CreditLine)
+
+
+@pytest.mark.parametrize('spec, message', [
+    ({'name': 'x', 'use_credit': True, 'k': 'abc'}, 'Strategy x: Credit line amount (k) must be an integer'),
+    ({'name': 'x', 'use_credit': True, 'k': 0}, 'Strategy x: Credit line amount (k) must be greater than 0'),
+    ({'name': 'x', 'use_max_bet': True, 'm': [2]}, 'Strategy x: Maximum bet (m) must be an integer'),
+    ({'name': 'x', 'use_max_bet': True}, 'Missing required parameter: m (maximum bet)'),
+])
+def test_invalid_strategy_parameters_are_rejected(spec, message):
+    with pytest.raises(ValueError) as error:
+        validate_comparison_params(dict(GAME, strategies=[spec, 'general']))
+    assert str(error.value) == message
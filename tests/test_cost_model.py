@@ -0,0 +1,51 @@
+"""
+Tests for the cost model's expected walk lengths and learned corrections.
+"""
+
+import pytest
+
+from src.simulation.cost_model import CostModel, expected_steps
+
+
+def classic_duration(i, n, p):
+    """Expected duration of the classic ruin walk with unit bets and even payouts."""
+    if p == 0.5:
+        return i * (n - i)
+    r = (1 - p) / p
+    return i / (1 - 2 * p) - n / (1 - 2 * p) * (1 - r ** i) / (1 - r ** n)
+
+
+@pytest.mark.parametrize('i, n', [(1, 2), (5, 10), (3, 20), (250, 1000)])
+def test_fair_game_takes_i_times_n_minus_i(i, n):
+    assert expected_steps(i, n, 0.5, 2.0, 1) == pytest.approx(i * (n - i))
+
+
+@pytest.mark.parametrize('i, n, p', [(5, 10, 0.45), (10, 20, 0.55), (30, 100, 0.49), (100, 200, 0.3), (2, 50, 0.6)])
+def test_biased_game_is_close_to_classic_duration(i, n, p):
+    # The drift-diffusion formula is within a few percent away from the barriers
+    assert expected_steps(i, n, p, 2.0, 1) == pytest.approx(classic_duration(i, n, p), rel=0.03)
+
+
+def test_bets_credit_and_maximum_bet_rescale_the_walk():
+    # Bets of j walk i / j steps from ruin and n / j from the goal
+    assert expected_steps(10, 40, 0.5, 2.0, 5) == pytest.approx(2 * 6)
+    # The credit line puts ruin k further away, like starting at i + k with a goal of n + k
+    assert expected_steps(5, 10, 0.45, 2.0, 1, k=3) == pytest.approx(expected_steps(8, 13, 0.45, 2.0, 1))
+    # A maximum bet below j bets m instead
+    assert expected_steps(10, 40, 0.5, 2.0, 5, m=1) == pytest.approx(10 * 30)
+
+
+def test_walks_take_at_least_one_bet():
+    assert expected_steps(1, 1000, 0.01, 2.0, 1) >= 1.0
+    assert expected_steps(999, 1000, 0.99, 2.0, 1) >= 1.0
+
+
+def test_corrections_learn_observed_times():
+    model = CostModel(seconds_per_step={'python': 1e-6})
+    estimate = model.estimate('general:python', 'python', 1000, 100)
+    assert estimate['predicted_seconds'] == pytest.approx(0.1)
+
+    model.observe(estimate, 0.2)
+    assert model.correction('general:python') == pytest.approx(2.0)
+    assert model.estimate('general:python', 'python', 1000, 100)['predicted_seconds'] == pytest.approx(0.2)
+    assert model.correction('extended:python') == 1.0
@@ -0,0 +1,100 @@
+"""
+Tests for distributed trial execution, with local worker processes standing
+in for nodes.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+import requests
+
+from src.simulation.checkpoint import CheckpointManager
+from src.simulation.distributed import Coordinator, plan_shards, run_local, shard_seed
+from src.simulation.strategy_engine import CreditLine, TableLimit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARAMS = {'i': 5, 'n': 12, 'p': 0.45, 'q': 2.0, 'j': 1}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_worker(port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'src.api.worker', '--host', '127.0.0.1', '--port', str(port)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"Worker on port {port} did not start")
+
+
+@pytest.fixture(scope='module')
+def workers():
+    processes = {}
+    try:
+        for _ in range(3):
+            port = free_port()
+            processes[f"http://127.0.0.1:{port}"] = start_worker(port)
+        yield processes
+    finally:
+        for process in processes.values():
+            process.terminate()
+            process.wait(timeout=10)
+
+
+def test_plan_shards():
+    assert plan_shards(25, 10) == [10, 10, 5]
+    assert plan_shards(20, 10) == [10, 10]
+
+
+def test_shard_seeds_are_distinct_and_stable():
+    seeds = [shard_seed(42, index) for index in range(100)]
+    assert len(set(seeds)) == 100
+    assert seeds == [shard_seed(42, index) for index in range(100)]
+
+
+@pytest.mark.parametrize('function,params', [
+    ('basic', {'i': 5, 'n': 12}),
+    ('general', PARAMS),
+    ('strategy', dict(PARAMS, rules=[CreditLine(2).describe(), TableLimit(2).describe()]))
+], ids=['basic', 'general', 'strategy'])
+def test_coordinator_matches_run_local(workers, function, params):
+    coordinator = Coordinator(list(workers), shard_size=1500)
+    result = coordinator.run(function, params, 10000, seed=11)
+    expected = run_local(function, params, 10000, seed=11, shard_size=1500)
+    assert result == expected
+
+
+def test_failed_shards_are_retried_on_other_workers(workers):
+    dead = f"http://127.0.0.1:{free_port()}"
+    coordinator = Coordinator([dead] + list(workers), shard_size=1000, max_retries=3, timeout=10)
+    result = coordinator.run('general', PARAMS, 8000, seed=5)
+    assert result == run_local('general', PARAMS, 8000, seed=5, shard_size=1000)
+    assert coordinator.health()[dead] is False
+
+
+def test_run_fails_when_every_attempt_fails():
+    coordinator = Coordinator([f"http://127.0.0.1:{free_port()}"], shard_size=1000, max_retries=2, timeout=5)
+    with pytest.raises(RuntimeError):
+        coordinator.run('general', PARAMS, 2000, seed=5)
+
+
+def test_checkpointed_coordinator_run_matches_run_local(workers, tmp_path):
+    coordinator = Coordinator(list(workers), shard_size=1000)
+    manager = CheckpointManager(str(tmp_path), interval=0)
+    result = coordinator.run('general', PARAMS, 6000, seed=3, checkpoints=manager)
+    assert result['wins'] == run_local('general', PARAMS, 6000, seed=3, shard_size=1000)['wins']
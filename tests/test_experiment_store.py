@@ -0,0 +1,67 @@
+"""
+Tests for the experiment store.
+"""
+
+import pyarrow.parquet as pq
+import pytest
+
+from src.utils.experiment_store import ExperimentStore
+
+
+def record(store, engine='general', p=0.5, trials=1000, win_probability=0.5, **params):
+    params = dict(i=5, n=10, p=p, q=2.0, j=1, trials=trials, **params)
+    result = {'win_probability': win_probability, 'broke_probability': 1 - win_probability}
+    return store.record(engine, params, result, execution_time=0.01, seed=7)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ExperimentStore(str(tmp_path / 'runs'), batch_size=3, flush_interval=0)
+
+
+def test_query_filters_written_and_buffered_runs(store):
+    for p in (0.3, 0.4, 0.5):
+        record(store, p=p)
+    record(store, p=0.45)
+    record(store, engine='basic', p=0.5)
+    assert len(store._part_files()) == 1 and len(store._buffer) == 2
+
+    assert {row['p'] for row in store.query(engine='general')} == {0.3, 0.4, 0.5, 0.45}
+    assert {row['p'] for row in store.query(ranges={'p': (0.4, 0.45)})} == {0.4, 0.45}
+    assert {row['p'] for row in store.query(ranges={'p': (None, 0.4)})} == {0.3, 0.4}
+    assert [row['engine'] for row in store.query(engine='basic', ranges={'p': (0.5, None)})] == ['basic']
+    assert store.query(ranges={'k': (0, None)}) == []
+
+
+def test_query_returns_most_recent_first(store):
+    runs = [record(store, trials=trials) for trials in (100, 200, 300, 400)]
+    latest = store.query(limit=2)
+    assert [row['run_id'] for row in latest] == [run['run_id'] for run in runs[::-1][:2]]
+
+
+def test_query_rejects_unknown_column(store):
+    with pytest.raises(ValueError):
+        store.query(ranges={'engine': (0, 1)})
+
+
+def test_compaction_keeps_every_run(tmp_path):
+    store = ExperimentStore(str(tmp_path / 'runs'), batch_size=1, flush_interval=0, max_parts=4)
+    runs = [record(store, trials=trials) for trials in range(1, 11)]
+    assert len(store._part_files()) < 4
+    assert sorted(row['run_id'] for row in store.query()) == sorted(run['run_id'] for run in runs)
+
+
+def test_close_writes_buffered_runs(tmp_path):
+    root = str(tmp_path / 'runs')
+    store = ExperimentStore(root, batch_size=100, flush_interval=0.05)
+    run = record(store)
+    store.close()
+    assert [row['run_id'] for row in ExperimentStore(root).query()] == [run['run_id']]
+
+
+def test_export_contains_every_run(store, tmp_path):
+    for trials in (100, 200, 300, 400):
+        record(store, trials=trials)
+    path = str(tmp_path / 'export.parquet')
+    assert store.export_parquet(path) == 4
+    assert sorted(pq.read_table(path).column('trials').to_pylist()) == [100, 200, 300, 400]
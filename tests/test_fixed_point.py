@@ -0,0 +1,84 @@
+"""
+Tests for the fixed-point bankroll and its rounding policies.
+"""
+
+import numpy as np
+import pytest
+
+from src.api.validation import validate_extended_params, validate_general_params, validate_fixed_point_params
+from src.simulation.fixed_point import ROUNDING_POLICIES, quantize, quantize_scalar, validate_units
+from src.simulation.general_simulation import monte_carlo_general
+from src.simulation.lookup_tables import solve_win_probabilities
+from src.simulation.optimal_strategy import solve_optimal_strategy
+from src.simulation.strategy_engine import run_strategy
+
+
+@pytest.mark.parametrize('value, floor, ceil, nearest', [
+    (2.0, 2, 2, 2),
+    (2.4, 2, 3, 2),
+    (2.5, 2, 3, 3),
+    (-2.5, -3, -2, -2),
+    (0.29 * 100, 29, 29, 29),
+    (3 - 1e-12, 3, 3, 3),
+    (3 + 1e-12, 3, 3, 3),
+])
+def test_rounding_policies(value, floor, ceil, nearest):
+    expected = {'floor': floor, 'ceil': ceil, 'nearest': nearest}
+    for policy in ROUNDING_POLICIES:
+        assert quantize_scalar(value, policy) == expected[policy]
+        assert quantize(np.array([value]), policy)[0] == expected[policy]
+
+
+def test_array_and_scalar_rounding_agree():
+    values = np.linspace(-5, 5, 1001) * 1.37
+    for policy in ROUNDING_POLICIES:
+        assert quantize(values, policy).tolist() == [quantize_scalar(float(v), policy) for v in values]
+
+
+def test_huge_amounts_saturate():
+    assert quantize(np.array([1e30, -1e30]), 'floor').tolist() == [2**62, -2**62]
+
+
+def test_invalid_policy_and_units_are_rejected():
+    with pytest.raises(ValueError):
+        quantize(np.array([1.0]), 'up')
+    with pytest.raises(ValueError):
+        validate_units(0)
+
+
+@pytest.mark.parametrize('policy, q_effective', [('floor', None), ('ceil', 2.0), ('nearest', 2.0)])
+def test_rounded_winnings_set_the_walk(policy, q_effective):
+    # Winnings of 0.6 dollars round to 0 or 1 whole unit of a dollar
+    general = monte_carlo_general(4, 8, 0.45, 1.6, 1, trials=5000, seed=1, units=1, win_rounding=policy)
+    engine = run_strategy(4, 8, 0.45, 1.6, 1, trials=5000, seed=1, units=1, win_rounding=policy)
+    if q_effective is None:
+        assert general['wins'] == engine['wins'] == 0
+        return
+    exact = solve_win_probabilities(8, 0.45, q_effective, 1)[4]
+    std_error = np.sqrt(exact * (1 - exact) / 5000)
+    assert abs(general['win_probability'] - exact) < 4 * std_error
+    assert abs(engine['win_probability'] - exact) < 4 * std_error
+
+
+def test_units_keep_fractional_payouts_exact():
+    # q = 1.5 wins half a dollar, one whole unit at 2 units per dollar
+    exact = solve_optimal_strategy(10, 0.5, 1.5, 1, m=1, units=2)['baseline_win_probability'][2 * 5]
+    for result in (monte_carlo_general(5, 10, 0.5, 1.5, 1, trials=20000, seed=3, units=2),
+                   run_strategy(5, 10, 0.5, 1.5, 1, trials=20000, seed=3, units=2)):
+        std_error = np.sqrt(exact * (1 - exact) / 20000)
+        assert abs(result['win_probability'] - exact) < 4 * std_error
+
+
+def test_rounding_policies_require_units():
+    with pytest.raises(ValueError, match='require units'):
+        validate_fixed_point_params({'win_rounding': 'ceil'})
+    assert validate_fixed_point_params({}) == {}
+
+
+def test_models_keep_only_the_policies_they_apply():
+    game = {'i': 5, 'n': 10, 'p': 0.45, 'q': 1.5, 'j': 1, 'units': 4, 'bet_rounding': 'ceil'}
+    general = validate_general_params(game)
+    assert general['units'] == 4 and general['win_rounding'] == 'floor' and 'bet_rounding' not in general
+
+    extended = validate_extended_params(dict(game, use_dynamic_betting=True))
+    assert extended['bet_rounding'] == 'ceil' and extended['win_rounding'] == 'floor'
@@ -0,0 +1,86 @@
+"""
+Tests for incremental precision top-ups.
+"""
+
+import pytest
+
+from src.api import routes
+from src.simulation.incremental import STATS_VERSION, TrialStatsStore, refine, simulate_range, top_up
+from src.simulation.lookup_tables import solve_win_probabilities
+from src.simulation.strategy_engine import CreditLine, TableLimit
+
+GENERAL = dict(i=5, n=12, p=0.45, q=2.0, j=1)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TrialStatsStore(str(tmp_path / 'stats'))
+
+
+@pytest.mark.parametrize('rules', [(), (CreditLine(2), TableLimit(2))], ids=['general', 'extended'])
+def test_top_ups_match_a_single_run(store, rules):
+    steps = [1000, 1000, 4500, 12000]
+    for trials in steps:
+        result = top_up('key', rules=rules, trials=trials, store=store, **GENERAL)
+
+    stats = store.get('key')
+    wins = simulate_range(seed=stats['seed'], start=0, count=steps[-1], rules=rules, **GENERAL)
+    assert stats['trials'] == steps[-1]
+    assert stats['wins'] == wins
+    assert result['win_probability'] == wins / steps[-1]
+    assert result['seed'] == stats['seed']
+
+
+def test_top_up_only_runs_missing_trials(store):
+    first = top_up('key', trials=2000, store=store, **GENERAL)
+    second = top_up('key', trials=5000, store=store, **GENERAL)
+    again = top_up('key', trials=3000, store=store, **GENERAL)
+
+    assert first['trials_added'] == 2000
+    assert second['trials_added'] == 3000
+    assert again['trials_added'] == 0
+    assert again['trials'] == 5000
+    assert again['win_probability'] == second['win_probability']
+
+
+def test_keys_have_independent_streams(store):
+    top_up('a', trials=1000, store=store, **GENERAL)
+    top_up('b', trials=1000, store=store, **GENERAL)
+    assert store.get('a')['seed'] != store.get('b')['seed']
+
+
+def test_refine_reaches_target(store):
+    result = refine('key', target_std_error=0.01, max_trials=100000, store=store, **GENERAL)
+    assert result['target_met']
+    assert result['std_error'] <= 0.01
+
+    again = refine('key', target_std_error=0.01, max_trials=100000, store=store, **GENERAL)
+    assert again['trials_added'] == 0
+
+
+def test_refine_stops_at_max_trials(store):
+    result = refine('key', target_std_error=1e-6, max_trials=5000, store=store, **GENERAL)
+    assert result['trials'] == 5000
+    assert not result['target_met']
+
+
+def test_default_requests_run_the_counter_kernel(api):
+    request = dict(GENERAL, trials=20000)
+    cached = api.post('/api/general-simulation', json=request).get_json()
+    independent = api.post('/api/general-simulation', json=dict(request, use_cache=False)).get_json()
+    assert cached['trials_added'] == 20000 and 'trials_added' not in independent
+
+    exact = solve_win_probabilities(12, 0.45, 2.0, 1)[5]
+    std_error = (exact * (1 - exact) / 20000) ** 0.5
+    for result in (cached, independent):
+        assert abs(result['win_probability'] - exact) < 4 * std_error
+
+
+def test_new_stats_version_starts_fresh_statistics(api, monkeypatch):
+    request = dict(GENERAL, trials=2000)
+    api.post('/api/general-simulation', json=request)
+    assert api.post('/api/general-simulation', json=request).get_json()['cached']
+
+    monkeypatch.setattr(routes, 'STATS_VERSION', STATS_VERSION + 1)
+    result = api.post('/api/general-simulation', json=request).get_json()
+    assert not result['cached'] and result['trials_added'] == 2000
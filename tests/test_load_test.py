@@ -0,0 +1,90 @@
+"""
+Tests for the load testing harness, against a stub HTTP server.
+"""
+
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.api.validation import validate_extended_params
+from src.utils.load_test import find_saturation, render_html, run_load, summarize, _extended_payload
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers 200 except on paths containing /fail, and records client ids."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with self.server.lock:
+            self.server.client_ids.add(self.headers.get('X-Client-Id'))
+            self.server.requests += 1
+        status = 500 if '/fail' in self.path else 200
+        body = json.dumps({'ok': status == 200}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.lock = threading.Lock()
+    server.client_ids = set()
+    server.requests = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}/api"
+    server.shutdown()
+
+
+def test_summarize():
+    samples = [{'endpoint': 'a', 'latency': latency / 1000, 'ok': True} for latency in range(1, 101)]
+    samples += [{'endpoint': 'b', 'latency': 5.0, 'ok': False}] * 4
+    summary = summarize(samples, elapsed=2.0)
+
+    assert summary['overall']['requests'] == 104
+    assert summary['overall']['errors'] == 4
+    assert summary['overall']['throughput'] == 50.0
+    assert summary['endpoints']['a']['p50_ms'] == pytest.approx(50.5)
+    assert summary['endpoints']['a']['max_ms'] == pytest.approx(100.0)
+    assert summary['endpoints']['b']['error_rate'] == 1.0
+    assert summary['endpoints']['b']['p95_ms'] is None
+
+
+def test_extended_payloads_are_valid_requests():
+    rng = random.Random(0)
+    for _ in range(200):
+        validate_extended_params(_extended_payload(rng))
+
+
+def test_closed_loop_counts_every_request(stub):
+    server, base_url = stub
+    mix = {'ok': (0.5, lambda rng: {}), 'fail': (0.5, lambda rng: {})}
+    summary = run_load(base_url, mix, concurrency=3, duration=0.3, seed=1)
+
+    assert summary['overall']['requests'] == server.requests
+    assert summary['endpoints']['fail']['errors'] == summary['endpoints']['fail']['requests'] > 0
+    assert summary['endpoints']['ok']['errors'] == 0
+    # One session, and so one client id, per worker
+    assert len(server.client_ids) == 3
+
+
+def test_saturation_stops_at_first_failing_rate(stub):
+    _, base_url = stub
+    result = find_saturation('basic-simulation', [5, 10], base_url=base_url + '/fail', duration=0.3, seed=1)
+    assert result['saturation_rate'] == 5
+    assert len(result['steps']) == 1
+
+
+def test_report_escapes_endpoint_names():
+    load = summarize([{'endpoint': '<b>', 'latency': 0.01, 'ok': True}], elapsed=1.0)
+    page = render_html({'config': {}, 'load': load})
+    assert '&lt;b&gt;' in page and '<b>' not in page
@@ -0,0 +1,75 @@
+"""
+Tests for the precomputed win-probability tables.
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.simulation.lookup_tables import MODEL_VERSION, WinProbabilityTable, build_tables, solve_win_probabilities
+
+
+@pytest.fixture(scope='module')
+def table(tmp_path_factory):
+    out = str(tmp_path_factory.mktemp('tables'))
+    build_tables(out, p_values=[0.4, 0.45, 0.5], q_values=[1.5, 2.0, 4.0], j_values=[1, 2], n_values=[10, 30])
+    return WinProbabilityTable(out)
+
+
+@pytest.mark.parametrize('p', [0.3, 0.45, 0.6])
+def test_solve_matches_classic_formula(p):
+    ratio = (1 - p) / p
+    expected = (1 - ratio ** np.arange(21)) / (1 - ratio ** 20)
+    assert np.allclose(solve_win_probabilities(20, p, 2.0, 1), expected, rtol=0, atol=1e-12)
+
+
+def test_fair_game_is_linear():
+    assert np.allclose(solve_win_probabilities(12, 0.5, 2.0, 1), np.arange(13) / 12, rtol=0, atol=1e-12)
+
+
+def test_off_lattice_payout_is_not_solved():
+    assert solve_win_probabilities(10, 0.5, 1.5, 2) is None
+
+
+def test_grid_point_is_exact(table):
+    result = table.lookup(7, 30, 0.45, 4.0, 2)
+    assert result['exact_grid_point']
+    assert result['error_bound'] == 0.0
+    assert result['win_probability'] == pytest.approx(solve_win_probabilities(30, 0.45, 4.0, 2)[7], abs=1e-12)
+
+
+@pytest.mark.parametrize('p, q', [(0.42, 2.0), (0.45, 3.0), (0.47, 3.0)])
+def test_interpolation_bound_contains_exact_value(table, p, q):
+    for i in (1, 5, 9, 15, 29):
+        result = table.lookup(i, 30, p, q, 1)
+        exact = solve_win_probabilities(30, p, q, 1)[i]
+        assert not result['exact_grid_point']
+        assert abs(result['win_probability'] - exact) <= result['error_bound'] + 1e-12
+
+
+def test_uncovered_points_are_not_answered(table):
+    assert table.lookup(5, 10, 0.35, 2.0, 1) is None   # p below the grid
+    assert table.lookup(5, 10, 0.45, 4.5, 1) is None   # q above the grid
+    assert table.lookup(5, 20, 0.45, 2.0, 1) is None   # n not in the grid
+    assert table.lookup(5, 10, 0.45, 2.0, 3) is None   # j not in the grid
+    assert table.lookup(11, 10, 0.45, 2.0, 1) is None  # i beyond the goal
+    assert table.lookup(5, 10, 0.45, 1.5, 2) is None   # off-lattice without Monte Carlo
+    assert table.lookup(5, 10, 0.45, 1.75, 1) is None  # next to an off-lattice grid point
+
+
+def test_other_model_version_is_stale(table, tmp_path):
+    assert not table.status()['stale']
+
+    out = str(tmp_path)
+    build_tables(out, p_values=[0.5], q_values=[2.0], j_values=[1], n_values=[10])
+    path = os.path.join(out, 'metadata.json')
+    with open(path) as f:
+        metadata = json.load(f)
+    metadata['model_version'] = MODEL_VERSION - 1
+    with open(path, 'w') as f:
+        json.dump(metadata, f)
+
+    status = WinProbabilityTable(out).status()
+    assert status['outdated_model'] and status['stale']
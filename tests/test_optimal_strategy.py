@@ -0,0 +1,66 @@
+"""
+Tests for the optimal betting strategy solver.
+"""
+
+import numpy as np
+import pytest
+
+from src.simulation.lookup_tables import solve_win_probabilities
+from src.simulation.optimal_strategy import solve_optimal_strategy
+
+
+def policy_win_probabilities(bets, n, p, q):
+    """Win probability of a per-state bet in dollars, by one dense linear solve."""
+    matrix = np.eye(n + 1)
+    for state in range(1, n):
+        bet = bets[state]
+        matrix[state, min(state + int(round(bet * (q - 1))), n)] -= p
+        matrix[state, state - bet] -= 1 - p
+    rhs = np.zeros(n + 1)
+    rhs[n] = 1.0
+    return np.linalg.solve(matrix, rhs)
+
+
+@pytest.mark.parametrize('method', ['policy', 'value'])
+@pytest.mark.parametrize('n, p, q, j', [(20, 0.45, 2.0, 1), (30, 0.4, 3.0, 2), (25, 0.55, 2.0, 3)])
+def test_baseline_matches_exact_solve(method, n, p, q, j):
+    result = solve_optimal_strategy(n, p, q, j, method=method)
+    assert np.allclose(result['baseline_win_probability'], solve_win_probabilities(n, p, q, j), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize('method', ['policy', 'value'])
+@pytest.mark.parametrize('n, p, q, j, m', [(20, 0.45, 2.0, 1, None), (40, 0.4, 3.0, 2, 10), (30, 0.6, 2.0, 1, 5)])
+def test_reported_values_are_the_policy_values(method, n, p, q, j, m):
+    result = solve_optimal_strategy(n, p, q, j, m, method=method)
+    assert result['converged']
+    exact = policy_win_probabilities(result['policy'], n, p, q)
+    assert np.allclose(result['win_probability'], exact, rtol=0, atol=1e-12)
+    assert (result['win_probability'] >= result['baseline_win_probability'] - 1e-12).all()
+
+
+@pytest.mark.parametrize('n, p, q, j, m', [(20, 0.45, 2.0, 1, None), (40, 0.4, 3.0, 2, 10), (64, 0.47, 2.0, 1, 8)])
+def test_methods_agree(n, p, q, j, m):
+    policy = solve_optimal_strategy(n, p, q, j, m, method='policy')
+    value = solve_optimal_strategy(n, p, q, j, m, method='value')
+    assert np.allclose(policy['win_probability'], value['win_probability'], rtol=0, atol=1e-8)
+
+
+def test_bold_play_is_optimal_in_a_subfair_game():
+    n, p = 16, 0.4
+    bold = [0] + [min(state, n - state) for state in range(1, n)] + [0]
+    result = solve_optimal_strategy(n, p, 2.0, 1)
+    assert np.allclose(result['win_probability'], policy_win_probabilities(bold, n, p, 2.0), rtol=0, atol=1e-12)
+
+
+def test_timid_play_is_optimal_in_a_superfair_game():
+    result = solve_optimal_strategy(30, 0.6, 2.0, 1)
+    assert (result['policy'][1:30] == 1).all()
+    assert np.allclose(result['win_probability'], solve_win_probabilities(30, 0.6, 2.0, 1), rtol=0, atol=1e-12)
+
+
+def test_fractional_winnings_need_units():
+    with pytest.raises(ValueError):
+        solve_optimal_strategy(20, 0.45, 1.5, 1)
+    result = solve_optimal_strategy(20, 0.45, 1.5, 1, units=2)
+    assert result['win_probability'].shape == (41,)
+    assert result['policy'][0] == result['policy'][40] == 0
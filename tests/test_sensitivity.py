@@ -0,0 +1,47 @@
+"""
+Tests for the likelihood-ratio sensitivity estimates of the general model.
+"""
+
+import numpy as np
+import pytest
+
+from src.simulation.general_simulation import monte_carlo_general
+from src.simulation.lookup_tables import solve_win_probabilities
+
+
+def exact(i, n, p, q, j):
+    return solve_win_probabilities(n, p, q, j)[i]
+
+
+@pytest.mark.parametrize('i, n, p, q, j', [(5, 10, 0.5, 2.0, 1), (6, 12, 0.45, 2.0, 1), (8, 16, 0.4, 3.0, 2)])
+def test_derivative_matches_finite_difference(i, n, p, q, j):
+    h = 1e-6
+    expected = (exact(i, n, p + h, q, j) - exact(i, n, p - h, q, j)) / (2 * h)
+
+    result = monte_carlo_general(i, n, p, q, j, trials=20000, seed=11, sensitivity=True)['sensitivity']
+    assert abs(result['dwin_dp'] - expected) < 4 * result['dwin_dp_std_error']
+
+
+def test_reweighted_estimates_match_exact_solves():
+    i, n, p, q, j = 6, 12, 0.45, 2.0, 1
+    trials = 20000
+    result = monte_carlo_general(i, n, p, q, j, trials=trials, seed=5, nearby_p=[0.43, 0.47])
+
+    for nearby in result['sensitivity']['nearby']:
+        expected = exact(i, n, nearby['p'], q, j)
+        std_error = np.sqrt(expected * (1 - expected) / nearby['effective_trials'])
+        assert 0 < nearby['effective_trials'] <= trials
+        assert abs(nearby['win_probability'] - expected) < 4 * std_error
+
+
+def test_reweighting_to_the_same_p_is_the_plain_estimate():
+    result = monte_carlo_general(5, 10, 0.45, 2.0, 1, trials=2000, seed=3, nearby_p=[0.45])
+    nearby = result['sensitivity']['nearby'][0]
+    assert nearby['win_probability'] == pytest.approx(result['win_probability'], abs=1e-12)
+    assert nearby['effective_trials'] == pytest.approx(2000)
+
+
+def test_sensitivity_does_not_change_the_estimate():
+    plain = monte_carlo_general(5, 10, 0.45, 2.0, 1, trials=2000, seed=3)
+    with_sensitivity = monte_carlo_general(5, 10, 0.45, 2.0, 1, trials=2000, seed=3, sensitivity=True)
+    assert with_sensitivity['wins'] == plain['wins']
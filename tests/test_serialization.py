@@ -0,0 +1,121 @@
+"""
+Tests for response format negotiation, the binary encodings and compression.
+"""
+
+import gzip
+import json
+import struct
+
+import msgpack
+import numpy as np
+import pyarrow as pa
+import pytest
+from flask import Flask
+
+from src.api.serialization import ARROW, MSGPACK, NDARRAYS, encode_ndarrays, respond
+
+PAYLOAD = {
+    'win_probability': np.linspace(0, 1, 5),
+    'policy': np.array([0, 1, 2, 1, 0], dtype=np.int64),
+    'converged': True,
+    'sensitivity': {'dwin_dp': 1.5, 'hits': np.array([True, False, True, False, True])},
+}
+
+
+def decode_ndarrays(body):
+    """Read the x-ndarrays layout independently of the encoder."""
+    assert body[:4] == b'GRA1'
+    (header_length,) = struct.unpack('<I', body[4:8])
+    assert (8 + header_length) % 8 == 0
+    header = json.loads(body[8:8 + header_length])
+    data = body[8 + header_length:]
+    arrays = {}
+    for entry in header['arrays']:
+        assert entry['offset'] % 8 == 0
+        array = np.frombuffer(data, dtype=entry['dtype'], count=entry['length'], offset=entry['offset'])
+        arrays[entry['name']] = array.reshape(entry['shape'])
+    return header['scalars'], arrays
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.route('/small')
+    def small():
+        return respond(PAYLOAD)
+
+    @app.route('/large')
+    def large():
+        return respond({'values': np.arange(2000, dtype=np.float64), 'count': 2000})
+
+    return app.test_client()
+
+
+def test_ndarrays_round_trip():
+    scalars, arrays = decode_ndarrays(encode_ndarrays(PAYLOAD))
+    assert scalars == {'converged': True, 'sensitivity': {'dwin_dp': 1.5}}
+    assert arrays['win_probability'].tolist() == PAYLOAD['win_probability'].tolist()
+    # 64-bit integers are narrowed for browsers, booleans become bytes
+    assert arrays['policy'].dtype == np.dtype('<i4')
+    assert arrays['policy'].tolist() == [0, 1, 2, 1, 0]
+    assert arrays['sensitivity.hits'].dtype == np.dtype('|u1')
+    assert arrays['sensitivity.hits'].tolist() == [1, 0, 1, 0, 1]
+
+
+def test_ndarrays_keep_shapes_and_widen_large_integers():
+    payload = {'grid': np.arange(6, dtype=np.float32).reshape(2, 3), 'big': np.array([2**40], dtype=np.int64)}
+    _, arrays = decode_ndarrays(encode_ndarrays(payload))
+    assert arrays['grid'].dtype == np.dtype('<f8')
+    assert arrays['grid'].tolist() == [[0, 1, 2], [3, 4, 5]]
+    assert arrays['big'].dtype == np.dtype('<f8') and arrays['big'][0] == 2**40
+
+
+@pytest.mark.parametrize('accept, mimetype', [
+    (None, 'application/json'),
+    (MSGPACK, MSGPACK),
+    (ARROW, ARROW),
+    (NDARRAYS, NDARRAYS),
+    (f'{NDARRAYS}, application/json;q=0.5', NDARRAYS),
+    ('text/html', 'application/json'),
+])
+def test_negotiation_and_vary(client, accept, mimetype):
+    response = client.get('/small', headers={'Accept': accept} if accept else {})
+    assert response.mimetype == mimetype
+    assert set(response.vary) == {'Accept', 'Accept-Encoding'}
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_json_and_msgpack_carry_the_same_values(client):
+    as_json = client.get('/small').get_json()
+    assert as_json['policy'] == [0, 1, 2, 1, 0]
+    assert as_json['sensitivity']['hits'] == [True, False, True, False, True]
+
+    as_msgpack = msgpack.unpackb(client.get('/small', headers={'Accept': MSGPACK}).data, raw=False)
+    policy = as_msgpack['policy']
+    assert np.frombuffer(policy['data'], dtype=policy['dtype']).tolist() == as_json['policy']
+    assert as_msgpack['sensitivity']['dwin_dp'] == 1.5
+
+
+def test_arrow_columns_and_scalars(client):
+    body = client.get('/large', headers={'Accept': ARROW}).data
+    table = pa.ipc.open_stream(body).read_all()
+    assert table.column('values').to_pylist() == list(range(2000))
+    assert json.loads(table.schema.metadata[b'scalars']) == {'count': 2000}
+
+
+@pytest.mark.parametrize('accept', [None, NDARRAYS])
+def test_large_bodies_are_compressed_on_request(client, accept):
+    headers = {'Accept': accept} if accept else {}
+    plain = client.get('/large', headers=headers)
+    compressed = client.get('/large', headers=dict(headers, **{'Accept-Encoding': 'gzip'}))
+
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert set(compressed.vary) == {'Accept', 'Accept-Encoding'}
+    assert gzip.decompress(compressed.data) == plain.data
+
+
+def test_small_bodies_are_not_compressed(client):
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
@@ -0,0 +1,107 @@
+"""
+Tests for the composable strategy engine.
+
+Each compiled kernel is checked trial by trial against the loops of the
+original ``run_with_*`` functions, driven by the same counter-based random
+numbers, so any difference in the rule semantics changes an outcome.
+"""
+
+import numpy as np
+import pytest
+
+from src.simulation.comparison import counter_uniforms
+from src.simulation.strategy_engine import (
+    BetProgression,
+    CreditLine,
+    TableLimit,
+    make_params,
+    prepare_kernel,
+    rule_from_spec
+)
+
+SEED = 2024
+TRIALS = 400
+
+
+def _uniform(trial: int, step: int) -> float:
+    return float(counter_uniforms(SEED, np.array([trial]), step)[0])
+
+
+def reference_outcome(trial, i, n, p, q, j, k=None, m=None, dynamic=False):
+    """One trial of the original extension loops (run_full_extension and its special cases)."""
+    current_amount = i
+    credit_used = 0
+    losing_streak = 0
+    step = 0
+    k = k if k is not None else 0
+
+    while current_amount + credit_used < n and credit_used <= k:
+        current_bet = j * (1 / p) ** losing_streak if dynamic and losing_streak > 0 else j
+        if m is not None:
+            current_bet = min(current_bet, m)
+
+        if current_amount > 0:
+            actual_bet = min(current_bet, current_amount)
+        else:
+            actual_bet = min(current_bet, k - credit_used)
+            if actual_bet <= 0:
+                break
+            credit_used += actual_bet
+
+        won = _uniform(trial, step) < p
+        step += 1
+        if won:
+            winnings = actual_bet * (q - 1)
+            if credit_used > 0:
+                repayment = min(winnings, credit_used)
+                credit_used -= repayment
+                winnings -= repayment
+            current_amount += winnings
+            losing_streak = 0
+        else:
+            if current_amount >= actual_bet:
+                current_amount -= actual_bet
+            losing_streak += 1
+
+    return current_amount + credit_used >= n
+
+
+def kernel_outcomes(rules, i, n, p, q, j):
+    ordered, kernel = prepare_kernel(rules)
+    params = make_params(i, n, p, q, j)
+    return kernel(ordered, params, TRIALS, lambda trial_ids, step: counter_uniforms(SEED, trial_ids, step))
+
+
+CASES = [
+    ('general', [], {}),
+    ('credit', [CreditLine(3)], {'k': 3}),
+    ('dynamic_betting', [BetProgression()], {'dynamic': True}),
+    ('max_bet', [TableLimit(2)], {'m': 2}),
+    ('credit_max_bet', [CreditLine(3), TableLimit(2)], {'k': 3, 'm': 2}),
+    ('full', [TableLimit(4), BetProgression(), CreditLine(3)], {'k': 3, 'm': 4, 'dynamic': True})
+]
+
+
+@pytest.mark.parametrize('name,rules,options', CASES, ids=[case[0] for case in CASES])
+@pytest.mark.parametrize('i,n,p,q,j', [(5, 12, 0.45, 2.0, 1), (6, 20, 0.4, 2.5, 3)])
+def test_kernel_matches_original_loops(name, rules, options, i, n, p, q, j):
+    outcomes = kernel_outcomes(rules, i, n, p, q, j)
+    expected = [reference_outcome(t, i, n, p, q, j, **options) for t in range(TRIALS)]
+    assert outcomes.tolist() == expected
+
+
+def test_rule_order_does_not_matter():
+    forward = kernel_outcomes([CreditLine(3), BetProgression(), TableLimit(4)], 5, 12, 0.45, 2.0, 1)
+    backward = kernel_outcomes([TableLimit(4), BetProgression(), CreditLine(3)], 5, 12, 0.45, 2.0, 1)
+    assert np.array_equal(forward, backward)
+
+
+def test_rules_round_trip_through_specs():
+    rules = [CreditLine(3), BetProgression(), TableLimit(4)]
+    rebuilt = [rule_from_spec(rule.describe()) for rule in rules]
+    assert [rule.describe() for rule in rebuilt] == [rule.describe() for rule in rules]
+
+
+def test_two_funding_rules_are_rejected():
+    with pytest.raises(ValueError):
+        prepare_kernel([CreditLine(1), CreditLine(2)])
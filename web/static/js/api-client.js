@@ -140,4 +140,100 @@ async function getApiDocs() {
         }
         throw error;
     }
-} 
\ No newline at end of file
+} 
+// Typed array constructors for the dtypes of application/x-ndarrays responses
+const NDARRAY_TYPES = {
+    '<f8': Float64Array,
+    '<f4': Float32Array,
+    '<i4': Int32Array,
+    '<u4': Uint32Array,
+    '<i2': Int16Array,
+    '<u2': Uint16Array,
+    '|i1': Int8Array,
+    '|u1': Uint8Array
+};
+
+/**
+ * Decode an application/x-ndarrays response body
+ *
+ * Arrays are returned as typed array views on the response buffer (no copy),
+ * placed at their dotted names (e.g. 'sensitivity.nearby') in the result.
+ * @param {ArrayBuffer} buffer - Response body
+ * @returns {Object} - Scalars and typed arrays, with a 'shapes' map of array shapes
+ */
+function decodeNdarrays(buffer) {
+    const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, 4));
+    if (magic !== 'GRA1') {
+        throw new Error('Not an x-ndarrays response');
+    }
+
+    const headerLength = new DataView(buffer).getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+    const dataStart = 8 + headerLength;
+
+    const result = header.scalars;
+    result.shapes = {};
+    for (const entry of header.arrays) {
+        const ArrayType = NDARRAY_TYPES[entry.dtype];
+        if (!ArrayType) {
+            throw new Error(`Unsupported array type: ${entry.dtype}`);
+        }
+
+        // Walk the dotted name, creating nested objects as needed
+        const path = entry.name.split('.');
+        let target = result;
+        for (const key of path.slice(0, -1)) {
+            target = target[key] = target[key] || {};
+        }
+        target[path[path.length - 1]] = new ArrayType(buffer, dataStart + entry.offset, entry.length);
+        result.shapes[entry.name] = entry.shape;
+    }
+    return result;
+}
+
+/**
+ * Call an endpoint and ask for the binary array format
+ *
+ * Falls back to JSON if the server answers with JSON. The browser undoes any
+ * gzip compression before the body reaches this function.
+ * @param {string} path - Endpoint path, e.g. '/optimal-strategy'
+ * @param {Object} params - Request parameters
+ * @returns {Promise<Object>} - Results with typed arrays for array fields
+ */
+async function requestBinary(path, params) {
+    try {
+        const response = await fetch(`${API_BASE_URL}${path}`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'application/x-ndarrays, application/json;q=0.5'
+            },
+            body: JSON.stringify(params)
+        });
+
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({}));
+            throw new Error(errorData.error || `API request failed with status ${response.status}`);
+        }
+
+        if ((response.headers.get('Content-Type') || '').startsWith('application/x-ndarrays')) {
+            return decodeNdarrays(await response.arrayBuffer());
+        }
+        return await response.json();
+    } catch (error) {
+        console.error(`Error in requestBinary(${path}):`, error);
+        if (error.message.includes('NetworkError') || error.message.includes('Failed to fetch')) {
+            throw new Error(`Network error: Could not connect to API server at ${API_BASE_URL}. Make sure the API server is running.`);
+        }
+        throw error;
+    }
+}
+
+/**
+ * Solve for the optimal betting strategy
+ * @param {Object} params - Solver parameters (n, p, q, j and optionally m, i, method, units)
+ * @returns {Promise<Object>} - win_probability and policy as typed arrays
+ */
+async function runOptimalStrategy(params) {
+    return requestBinary('/optimal-strategy', params);
+}
@@ -9,6 +9,7 @@ document.addEventListener('DOMContentLoaded', function() {
     const basicForm = document.getElementById('basic-form');
     const generalForm = document.getElementById('general-form');
     const extendedForm = document.getElementById('extended-form');
+    const optimalForm = document.getElementById('optimal-form');
     
     // Basic simulation form handling
     if (basicForm) {
@@ -185,6 +186,56 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         });
     }
+    
+    // Optimal strategy form handling
+    if (optimalForm) {
+        optimalForm.addEventListener('submit', async function(event) {
+            event.preventDefault();
+            
+            // Show loading state
+            const submitButton = this.querySelector('button[type="submit"]');
+            const originalButtonText = submitButton.textContent;
+            submitButton.textContent = 'Solving...';
+            submitButton.disabled = true;
+            
+            try {
+                // Get form values
+                const i = parseInt(document.getElementById('optimal-i').value);
+                const n = parseInt(document.getElementById('optimal-n').value);
+                const p = parseFloat(document.getElementById('optimal-p').value);
+                const q = parseFloat(document.getElementById('optimal-q').value);
+                const j = parseInt(document.getElementById('optimal-j').value);
+                const mValue = document.getElementById('optimal-m').value;
+                const m = mValue ? parseInt(mValue) : null;
+                
+                // Validate input
+                if (i <= 0 || n <= i || p <= 0 || p >= 1 || q <= 1 || j <= 0 || (m !== null && m <= 0)) {
+                    throw new Error('Invalid input parameters.');
+                }
+                
+                // Solve, receiving the per-bankroll arrays in binary form
+                const result = await runOptimalStrategy({ i, n, p, q, j, m });
+                
+                // Display results
+                document.getElementById('optimal-bet').textContent = result.optimal_bet;
+                document.getElementById('optimal-win-prob').textContent = (result.optimal_win_probability * 100).toFixed(2) + '%';
+                document.getElementById('optimal-baseline-prob').textContent = (result.baseline_win_probability[i] * 100).toFixed(2) + '%';
+                
+                // Show results section
+                document.getElementById('optimal-result').classList.remove('d-none');
+                
+                // Create chart
+                createOptimalStrategyChart('optimal-chart', result);
+            } catch (error) {
+                alert('Error: ' + error.message);
+                console.error(error);
+            } finally {
+                // Restore button state
+                submitButton.textContent = originalButtonText;
+                submitButton.disabled = false;
+            }
+        });
+    }
 });
 
 /**
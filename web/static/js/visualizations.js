@@ -189,4 +189,100 @@ function createParameterSensitivityChart(canvasId, xValues, results, xLabel) {
             }
         }
     });
-} 
\ No newline at end of file
+}
+
+/**
+ * Create a line chart of the optimal strategy across bankrolls
+ * @param {string} canvasId - ID of the canvas element
+ * @param {Object} data - Solver results with win_probability, baseline_win_probability
+ *     and policy (typed arrays from the binary format, or plain arrays from JSON)
+ */
+function createOptimalStrategyChart(canvasId, data) {
+    // Get canvas element
+    const canvas = document.getElementById(canvasId);
+    
+    // Check if a chart already exists on this canvas
+    if (canvas._chart) {
+        canvas._chart.destroy();
+    }
+    
+    // Chart.js needs plain arrays rather than typed array views
+    const winProbabilities = Array.from(data.win_probability, value => value * 100);
+    const baselineProbabilities = Array.from(data.baseline_win_probability, value => value * 100);
+    const bets = Array.from(data.policy);
+    const bankrolls = bets.map((_, state) => state);
+    
+    // Create chart
+    canvas._chart = new Chart(canvas, {
+        type: 'line',
+        data: {
+            labels: bankrolls,
+            datasets: [
+                {
+                    label: 'Optimal Win Probability',
+                    data: winProbabilities,
+                    borderColor: 'rgba(54, 162, 235, 1)',
+                    backgroundColor: 'rgba(54, 162, 235, 0.2)',
+                    pointRadius: 0,
+                    yAxisID: 'y'
+                },
+                {
+                    label: 'Fixed Bet Win Probability',
+                    data: baselineProbabilities,
+                    borderColor: 'rgba(255, 99, 132, 1)',
+                    backgroundColor: 'rgba(255, 99, 132, 0.2)',
+                    pointRadius: 0,
+                    yAxisID: 'y'
+                },
+                {
+                    label: 'Optimal Bet',
+                    data: bets,
+                    borderColor: 'rgba(75, 192, 192, 1)',
+                    backgroundColor: 'rgba(75, 192, 192, 0.2)',
+                    stepped: true,
+                    pointRadius: 0,
+                    yAxisID: 'bet'
+                }
+            ]
+        },
+        options: {
+            responsive: true,
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    max: 100,
+                    title: {
+                        display: true,
+                        text: 'Win Probability (%)'
+                    }
+                },
+                bet: {
+                    position: 'right',
+                    beginAtZero: true,
+                    grid: {
+                        drawOnChartArea: false
+                    },
+                    title: {
+                        display: true,
+                        text: 'Bet'
+                    }
+                },
+                x: {
+                    title: {
+                        display: true,
+                        text: 'Bankroll'
+                    }
+                }
+            },
+            plugins: {
+                legend: {
+                    position: 'top',
+                },
+                title: {
+                    display: true,
+                    text: 'Optimal Strategy by Bankroll'
+                }
+            }
+        }
+    });
+}